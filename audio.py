@@ -0,0 +1,359 @@
+"""Alert playback on a dedicated audio thread
+
+All audio work (mixer start-up, decoding, play, stop and volume) happens
+on an AudioWorker thread that takes commands from a queue, so a slow
+device or a driver hiccup can never freeze the Tk thread. AudioPlayer is
+the Tk-side handle: its calls only queue a command, it keeps the state of
+each channel, and the worker reports sound ends back to the Tk thread.
+
+Each alert is decoded once into memory, so playing it is a single
+Channel.play() with no file I/O or decoding. Decoded PCM can also be
+cached on disk, keyed by a hash of the source file and the mixer format,
+so later launches skip the MP3 decode as well.
+
+Backends: PygameBackend plays through pygame's mixer; DummyBackend plays
+nothing and just reports each sound as busy for its length, for machines
+and tests without sound hardware.
+"""
+import hashlib
+import itertools
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from paths import cache_dir
+
+MIXER_SETTINGS = dict(frequency=44100, size=-16, channels=2, buffer=512)
+# One reserved mixer channel per alert, so a warning never cuts off a timeout
+CHANNELS = ('warning', 'timeout')
+# How often to re-check a channel that is still busy at its expected end
+END_RECHECK = 0.05
+# What DummyBackend pretends each sound lasts, in seconds
+DUMMY_LENGTHS = {'warning': 2.0, 'timeout': 3.0}
+
+
+def default_cache_dir():
+    """Per-user directory for decoded PCM"""
+    return os.path.join(cache_dir(), 'sounds')
+
+
+def file_digest(path):
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SoundBank:
+    """Decodes each sound once and keeps it in memory"""
+
+    def __init__(self, paths, cache_dir=None, on_error=print):
+        from pygame import mixer
+        self.mixer = mixer
+        self.cache_dir = cache_dir
+        self.on_error = on_error
+        self.sounds = {}
+        for name, path in paths.items():
+            if path:
+                self.sounds[name] = self._load(path)
+
+    def __contains__(self, name):
+        return name in self.sounds
+
+    def get(self, name):
+        return self.sounds.get(name)
+
+    def _cache_path(self, path):
+        frequency, size, channels = self.mixer.get_init()
+        return os.path.join(
+            self.cache_dir,
+            f"{file_digest(path)}-{frequency}-{size}-{channels}.pcm"
+        )
+
+    def _load(self, path):
+        if not self.cache_dir:
+            return self.mixer.Sound(path)
+
+        cache_path = self._cache_path(path)
+        try:
+            with open(cache_path, 'rb') as f:
+                return self.mixer.Sound(buffer=f.read())
+        except OSError:
+            pass
+
+        sound = self.mixer.Sound(path)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(sound.get_raw())
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.on_error(f"Sound cache error: {e}")
+        return sound
+
+
+class PygameBackend:
+    """Plays bank sounds through pygame's mixer on reserved channels"""
+
+    def __init__(self, paths, cache_dir=None, on_error=print):
+        from pygame import mixer
+        mixer.init(**MIXER_SETTINGS)
+        self.mixer = mixer
+        self.bank = SoundBank(paths, cache_dir, on_error)
+        mixer.set_reserved(len(CHANNELS))
+        self.channels = {name: mixer.Channel(i) for i, name in enumerate(CHANNELS)}
+
+    @property
+    def names(self):
+        return frozenset(self.bank.sounds)
+
+    def play(self, channel, name):
+        """Start a sound; returns its length in seconds"""
+        sound = self.bank.get(name)
+        self.channels[channel].play(sound)
+        return sound.get_length()
+
+    def stop(self, channel):
+        self.channels[channel].stop()
+
+    def busy(self, channel):
+        return self.channels[channel].get_busy()
+
+    def set_volume(self, volume):
+        for channel in self.channels.values():
+            channel.set_volume(volume)
+
+    def close(self):
+        self.mixer.quit()
+
+
+class DummyBackend:
+    """Plays nothing; each sound is busy for its DUMMY_LENGTHS entry"""
+
+    def __init__(self, paths, cache_dir=None, lengths=None, clock=time.monotonic, on_error=print):
+        self.names = frozenset(paths)
+        self.lengths = dict(DUMMY_LENGTHS, **(lengths or {}))
+        self.clock = clock
+        self.ends = {}
+        self.volume = 1.0
+        self.played = []
+
+    def play(self, channel, name):
+        length = self.lengths.get(name, 1.0)
+        self.ends[channel] = self.clock() + length
+        self.played.append(name)
+        return length
+
+    def stop(self, channel):
+        self.ends.pop(channel, None)
+
+    def busy(self, channel):
+        end = self.ends.get(channel)
+        return end is not None and self.clock() < end
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def close(self):
+        pass
+
+
+BACKENDS = {'pygame': PygameBackend, 'dummy': DummyBackend}
+
+
+class AudioWorker:
+    """Owns an audio backend on its own thread and runs queued commands
+
+    Commands are tuples: ('play', channel, name, token), ('stop', channel
+    or None), ('volume', level) and ('quit',). `report` is called from the
+    worker thread with ('ready', names) once the backend is up (names is
+    None if it failed), ('ended', channel, token) when a sound finishes
+    or is stopped, and ('error', message) when something goes wrong. A sound's end is checked at its known length and
+    confirmed with busy(), so nothing polls while it plays.
+    """
+
+    def __init__(self, backend_factory, paths, report, cache_dir=None):
+        self.backend_factory = backend_factory
+        self.paths = paths
+        self.report = report
+        self.cache_dir = cache_dir
+        self.queue = queue.Queue()
+        self.backend = None
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='audio', daemon=True)
+        self.thread.start()
+
+    def send(self, *command):
+        self.queue.put(command)
+
+    def close(self, timeout=1.0):
+        self.send('quit')
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _run(self):
+        try:
+            self.backend = self.backend_factory(self.paths, self.cache_dir,
+                                                on_error=lambda message: self.report('error', message))
+        except Exception as e:
+            self.report('error', f"Sound setup error: {e}")
+            self.report('ready', None)
+            return
+        self.report('ready', self.backend.names)
+        playing = {}
+        try:
+            while self._step(playing):
+                pass
+        finally:
+            self.backend.close()
+
+    def _step(self, playing):
+        timeout = None
+        if playing:
+            timeout = max(0.0, min(end for _, end in playing.values()) - time.monotonic())
+        try:
+            command = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            command = None
+        if command is not None:
+            if command[0] == 'quit':
+                return False
+            try:
+                self._run_command(command, playing)
+            except Exception as e:
+                self.report('error', f"Sound error: {e}")
+                if command[0] == 'play':
+                    playing.pop(command[1], None)
+                    self.report('ended', command[1], command[3])
+
+        now = time.monotonic()
+        for channel, (token, end) in list(playing.items()):
+            if end > now:
+                continue
+            if self.backend.busy(channel):
+                playing[channel] = (token, now + END_RECHECK)
+            else:
+                del playing[channel]
+                self.report('ended', channel, token)
+        return True
+
+    def _run_command(self, command, playing):
+        op = command[0]
+        if op == 'play':
+            _, channel, name, token = command
+            previous = playing.pop(channel, None)
+            if previous is not None:
+                self.report('ended', channel, previous[0])
+            length = self.backend.play(channel, name)
+            playing[channel] = (token, time.monotonic() + length)
+        elif op == 'stop':
+            channels = CHANNELS if command[1] is None else (command[1],)
+            for channel in channels:
+                self.backend.stop(channel)
+                stopped = playing.pop(channel, None)
+                if stopped is not None:
+                    self.report('ended', channel, stopped[0])
+        elif op == 'volume':
+            self.backend.set_volume(command[1])
+
+
+class ChannelState:
+    """What the Tk side believes a channel is doing"""
+
+    __slots__ = ('sound', 'token', 'on_end')
+
+    def __init__(self):
+        self.sound = None
+        self.token = None
+        self.on_end = None
+
+
+class AudioPlayer:
+    """Tk-side handle on an AudioWorker; every call returns immediately
+
+    `call(fn, *args)` must run fn on the Tk thread (TkDispatcher.call);
+    the worker's reports reach this object through it, and its errors go
+    to `on_error(message)` there.
+    """
+
+    def __init__(self, backend_factory, paths, call, cache_dir=None, on_ready=None, on_error=print):
+        self.call = call
+        self.on_ready = on_ready
+        self.on_error = on_error
+        self.names = frozenset()
+        self.ready = False
+        self.channels = {name: ChannelState() for name in CHANNELS}
+        self.tokens = itertools.count(1)
+        self.worker = AudioWorker(backend_factory, paths, self._report, cache_dir)
+
+    def start(self):
+        self.worker.start()
+
+    def close(self):
+        self.worker.close()
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def play(self, name, on_end=None):
+        """Queue a sound on its channel; returns False if it is not available"""
+        if name not in self.names:
+            return False
+        channel = name if name in self.channels else CHANNELS[0]
+        self._finish(channel)
+        state = self.channels[channel]
+        state.sound = name
+        state.token = next(self.tokens)
+        state.on_end = on_end
+        self.worker.send('play', channel, name, state.token)
+        return True
+
+    def is_playing(self, channel=None):
+        if channel is None:
+            return any(state.token is not None for state in self.channels.values())
+        state = self.channels.get(channel)
+        return state is not None and state.token is not None
+
+    def stop(self, channel=None):
+        """Stop one channel, or all of them"""
+        for each in CHANNELS if channel is None else (channel,):
+            self._finish(each)
+        self.worker.send('stop', channel)
+
+    def set_volume(self, volume):
+        self.worker.send('volume', volume)
+
+    def _report(self, kind, *args):
+        # Worker thread: hand everything to the Tk thread
+        self.call(self._on_report, kind, args)
+
+    def _on_report(self, kind, args):
+        if kind == 'ready':
+            names = args[0]
+            self.names = names or frozenset()
+            self.ready = names is not None
+            if self.on_ready is not None:
+                self.on_ready(self.ready)
+        elif kind == 'ended':
+            channel, token = args
+            if self.channels[channel].token == token:
+                self._finish(channel)
+        elif kind == 'error':
+            self.on_error(args[0])
+
+    def _finish(self, channel):
+        """Mark a channel idle and report the end of what it was playing"""
+        state = self.channels[channel]
+        if state.token is None:
+            return
+        on_end = state.on_end
+        state.sound = state.token = state.on_end = None
+        if on_end is not None:
+            on_end()
@@ -0,0 +1,18 @@
+"""Percentiles and the one-line latency summary the benchmarks print"""
+
+UNITS = {'ms': 1e3, 'us': 1e6}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(label, samples, width=34, unit='ms', digits=3, end='\n'):
+    """Print p50, p99 and max of `samples` (seconds) after a padded label"""
+    samples = sorted(samples)
+    scale = UNITS[unit]
+    p50 = percentile(samples, 0.5) * scale
+    p99 = percentile(samples, 0.99) * scale
+    print(f"{label:<{width}}p50 {p50:8.{digits}f} {unit}   p99 {p99:8.{digits}f} {unit}   "
+          f"max {samples[-1] * scale:8.{digits}f} {unit}", end=end)
@@ -0,0 +1,123 @@
+"""Trigger-to-audio latency: load-per-play versus the audio worker thread
+
+For each trigger, measures the time from the call until the mixer reports
+the sound as playing, and for the worker how long the call itself holds
+the calling (Tk) thread. The old path is what play_sound used to do
+(music.stop/load/play plus building a Sound to read its length).
+
+    python benchmarks/bench_audio.py [--triggers 50] [--dummy]
+
+--dummy uses SDL's dummy audio driver for machines without a sound card.
+"""
+import argparse
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import summarize  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOUNDS = {name: os.path.join(ROOT, f"{name}.mp3") for name in ("warning", "timeout")}
+
+
+class Reports:
+    """Stands in for the Tk dispatcher: worker reports run when drained"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def call(self, fn, *args):
+        self.queue.put((fn, args))
+
+    def drain(self, block=False):
+        while True:
+            try:
+                fn, args = self.queue.get(block, 5.0)
+            except queue.Empty:
+                return
+            fn(*args)
+            block = False
+
+
+def wait_busy(is_busy, limit=1.0):
+    deadline = time.perf_counter() + limit
+    while not is_busy() and time.perf_counter() < deadline:
+        pass
+
+
+def legacy_trigger(mixer, path):
+    start = time.perf_counter()
+    mixer.music.stop()
+    mixer.music.load(path)
+    mixer.music.play()
+    mixer.Sound(path).get_length()
+    wait_busy(mixer.music.get_busy)
+    elapsed = time.perf_counter() - start
+    mixer.music.stop()
+    return elapsed
+
+
+def worker_trigger(player, reports, name):
+    """(time the play() call held the caller, time until the mixer is busy)"""
+    backend = player.worker.backend
+    start = time.perf_counter()
+    player.play(name)
+    queued = time.perf_counter() - start
+    wait_busy(lambda: backend.busy(name))
+    elapsed = time.perf_counter() - start
+    player.stop()
+    wait_busy(lambda: not backend.busy(name))
+    reports.drain()
+    return queued, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--triggers', type=int, default=50)
+    parser.add_argument('--dummy', action='store_true')
+    args = parser.parse_args()
+    if args.dummy:
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+    from pygame import mixer
+    from audio import MIXER_SETTINGS, AudioPlayer, PygameBackend, SoundBank
+
+    cache_dir = tempfile.mkdtemp(prefix='timer-sound-cache-')
+    try:
+        mixer.init(**MIXER_SETTINGS)
+        for label, cache in (("bank load, no cache", None),
+                             ("bank load, cold PCM cache", cache_dir),
+                             ("bank load, warm PCM cache", cache_dir)):
+            start = time.perf_counter()
+            SoundBank(SOUNDS, cache_dir=cache)
+            print(f"{label:<34}{(time.perf_counter() - start) * 1000:8.2f} ms")
+        legacy = {name: [legacy_trigger(mixer, path) for _ in range(args.triggers)]
+                  for name, path in SOUNDS.items()}
+        mixer.quit()
+
+        reports = Reports()
+        player = AudioPlayer(PygameBackend, SOUNDS, reports.call, cache_dir=cache_dir)
+        player.start()
+        reports.drain(block=True)
+        if not player.ready:
+            print("audio worker could not start")
+            return
+        try:
+            for name in SOUNDS:
+                summarize(f"{name}: load per play", legacy[name])
+                samples = [worker_trigger(player, reports, name) for _ in range(args.triggers)]
+                summarize(f"{name}: worker, caller blocked", [queued for queued, _ in samples])
+                summarize(f"{name}: worker, until playing", [elapsed for _, elapsed in samples])
+        finally:
+            player.close()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
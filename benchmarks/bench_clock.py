@@ -0,0 +1,91 @@
+"""Frame time of the big clock: 80 pt Label versus one canvas text item per character
+
+Counts a 2-hour session down one tick per second in a window laid out
+like the timer's (clock, status line and button row packed in a frame)
+and times each tick's clock update plus the Tk redraw that follows
+(update_idletasks), for the old Label and for GlyphClock.
+
+    python benchmarks/bench_clock.py [--ticks 7200]
+    xvfb-run python benchmarks/bench_clock.py
+
+--headless uses the simulation harness's Tk stand-in, which measures only
+the Python side and counts the Tk calls per tick (no display needed).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import summarize  # noqa: E402
+import glyph_clock  # noqa: E402
+from simulation import EventLoop, VirtualClock, tk_module  # noqa: E402
+from viewmodel import format_clock  # noqa: E402
+
+
+def build_screen(tk, root, make_clock):
+    """The timer's main screen with `make_clock(frame)` as its clock"""
+    frame = tk.Frame(root, bg='black')
+    frame.pack(expand=True, fill='both')
+    clock = make_clock(frame)
+    clock.pack(expand=True, pady=(20, 10))
+    tk.Label(frame, text="Timer running...", fg='#6c757d', bg='black', font=('Arial', 18)).pack(pady=5)
+    buttons = tk.Frame(frame, bg='black')
+    buttons.pack(pady=10)
+    for text in ("➕ Add Time", "🔄 Reset", "⚙ Settings"):
+        tk.Button(buttons, text=text, font=('Arial', 12, 'bold'), padx=15, pady=8).pack(side='left', padx=5)
+    return frame, clock
+
+
+def run(tk, root, loop, make_clock, ticks, headless):
+    frame, clock = build_screen(tk, root, make_clock)
+    clock.config(text=format_clock(ticks))
+    if not headless:
+        root.update()
+    calls_before = loop.widget_calls if loop else 0
+    samples = []
+    for remaining in range(ticks - 1, -1, -1):
+        start = time.perf_counter()
+        clock.config(text=format_clock(remaining))
+        if not headless:
+            root.update_idletasks()
+        samples.append(time.perf_counter() - start)
+    calls = (loop.widget_calls - calls_before) / ticks if loop else None
+    frame.destroy()
+    return samples, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=7200)
+    parser.add_argument('--headless', action='store_true', help="Tk stand-in, no display needed")
+    args = parser.parse_args()
+
+    loop = None
+    if args.headless:
+        loop = EventLoop(VirtualClock())
+        glyph_clock.tk = tk_module(loop)
+    tk = glyph_clock.tk
+    root = tk.Tk()
+    root.geometry("1280x720")
+    root.configure(bg='black')
+
+    def label(frame):
+        return tk.Label(frame, text="00:00", fg='white', bg='black', font=('Arial', 80, 'bold'))
+
+    def glyphs(frame):
+        return glyph_clock.GlyphClock(frame, color='white', bg='black')
+
+    backend = "Tk stand-in (Python side only)" if args.headless else "Tk"
+    print(f"{args.ticks} ticks, {backend}")
+    for name, make_clock in (("80 pt Label", label), ("per-character canvas", glyphs)):
+        samples, calls = run(tk, root, loop, make_clock, args.ticks, args.headless)
+        summarize(name, samples)
+        if calls is not None:
+            print(f"{'':<26}{calls:.2f} Tk calls per tick")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Round trip of control socket requests, through a stand-in Tk thread
+
+Serves the control protocol exactly as a station does (asyncio thread,
+token check, every request handed to the UI thread through a queue and
+answered from there) and times requests from one client connection:
+single top-ups, batches and a fresh connection per request, over TCP
+and, where available, a Unix socket. The UI thread is a plain thread
+draining the queue like TkDispatcher.drain, since there may be no display.
+
+    python benchmarks/bench_control.py [--requests 2000] [--batch 20]
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _stats  # noqa: E402
+from control import ControlConnection, ControlServer, control_request  # noqa: E402
+from session_engine import SessionEngine  # noqa: E402
+
+TOKEN = 'bench-token'
+
+
+class UiThread:
+    """Runs queued calls on one thread, like the Tk loop draining TkDispatcher"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.engine = SessionEngine()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def call(self, fn, *args):
+        future = concurrent.futures.Future()
+        self.queue.put((future, fn, args))
+        return future
+
+    def _run(self):
+        while True:
+            future, fn, args = self.queue.get()
+            future.set_result(fn(*args))
+
+    def run_commands(self, commands):
+        results = []
+        for command in commands:
+            station = command.get('id', 'local')
+            if command['op'] == 'add':
+                self.engine.start(station, command['s'])
+            elif command['op'] == 'extend':
+                self.engine.extend(station, command['s'])
+            elif command['op'] in ('reset', 'lock'):
+                self.engine.reset(station)
+            results.append({'ok': True, 'remaining': self.engine.remaining(station)})
+        return results
+
+
+def summarize(label, samples, per=1):
+    """Round-trip percentiles, then commands per second"""
+    _stats.summarize(label, samples, width=36, end='')
+    print(f"{len(samples) * per / sum(samples):>12.0f} commands/s")
+
+
+async def measure(address, requests, batch):
+    connection = await ControlConnection.open(address, TOKEN)
+    single, batched, fresh = [], [], []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            reply = await connection.request({'op': 'extend', 's': 60})
+            single.append(time.perf_counter() - start)
+            assert reply['ok'], reply
+        commands = [{'op': 'extend', 's': 60, 'id': f"PC{i:02d}"} for i in range(batch)]
+        for _ in range(max(1, requests // batch)):
+            start = time.perf_counter()
+            reply = await connection.request({'batch': commands})
+            batched.append(time.perf_counter() - start)
+            assert reply['ok'], reply
+    finally:
+        connection.close()
+    for _ in range(max(1, requests // 10)):
+        start = time.perf_counter()
+        await control_request(address, TOKEN, {'op': 'status'})
+        fresh.append(time.perf_counter() - start)
+    return single, batched, fresh
+
+
+def bench(label, address, args):
+    ui = UiThread()
+    server = ControlServer(lambda commands: ui.call(ui.run_commands, commands),
+                           TOKEN, address)
+    server.start_thread()
+    if address.endswith(':0'):
+        address = f"127.0.0.1:{server.port}"
+    try:
+        loop = asyncio.new_event_loop()
+        single, batched, fresh = loop.run_until_complete(measure(address, args.requests, args.batch))
+        loop.close()
+    finally:
+        server.close()
+    summarize(f"{label}, one top-up", single)
+    summarize(f"{label}, batch of {args.batch}", batched, args.batch)
+    summarize(f"{label}, new connection each", fresh)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=20)
+    args = parser.parse_args()
+    bench("tcp", "127.0.0.1:0", args)
+    if hasattr(asyncio, 'start_unix_server'):
+        directory = tempfile.mkdtemp(prefix='timer-control-')
+        try:
+            bench("unix", os.path.join(directory, 'control.sock'), args)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Dashboard redraw time with hundreds of stations
+
+Drives the dashboard from a SyntheticFeed on a virtual clock, one second
+per frame, and times each frame's feed poll, canvas update (apply) and,
+with a real display, the Tk redraw that follows (update_idletasks). The
+goal is under 10 ms per redraw at 300 stations.
+
+    python benchmarks/bench_dashboard.py [--stations 300] [--frames 120]
+    xvfb-run python benchmarks/bench_dashboard.py
+
+--headless uses the simulation harness's Tk stand-in, which measures only
+the Python side (no display needed).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import summarize  # noqa: E402
+from config import DEFAULT_CONFIG  # noqa: E402
+import dashboard  # noqa: E402
+from simulation import EventLoop, VirtualClock, tk_module  # noqa: E402
+
+SIZE = (1920, 1080)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stations', type=int, default=300)
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--headless', action='store_true', help="Tk stand-in, no display needed")
+    args = parser.parse_args()
+
+    clock = VirtualClock()
+    if args.headless:
+        dashboard.tk = tk_module(EventLoop(clock))
+    root = dashboard.tk.Tk()
+    root.geometry(f"{SIZE[0]}x{SIZE[1]}")
+    feed = dashboard.SyntheticFeed(args.stations, clock=clock.monotonic)
+    board = dashboard.Dashboard(root, feed, DEFAULT_CONFIG.warning_seconds)
+    if not args.headless:
+        root.update()
+
+    polls, applies, redraws, updates = [], [], [], []
+    board.apply(feed.poll())
+    for _ in range(args.frames):
+        clock.advance(1.0)
+        start = time.perf_counter()
+        rows = feed.poll()
+        polled = time.perf_counter()
+        updates.append(board.apply(rows))
+        applied = time.perf_counter()
+        if not args.headless:
+            root.update_idletasks()
+        drawn = time.perf_counter()
+        polls.append(polled - start)
+        applies.append(applied - polled)
+        redraws.append(drawn - polled)
+
+    backend = "Tk stand-in (Python side only)" if args.headless else "Tk"
+    print(f"{len(board.tiles)} stations on screen, {4 * len(board.tiles)} canvas items, "
+          f"{args.frames} frames, {backend}")
+    print(f"item updates per frame    {sum(updates) / len(updates):.0f}")
+    summarize("feed poll", polls)
+    summarize("apply", applies)
+    if not args.headless:
+        summarize("apply + Tk redraw", redraws)
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
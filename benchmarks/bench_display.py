@@ -0,0 +1,71 @@
+"""Tk calls per display tick: redraw-everything versus DisplayBinder
+
+Replays a 30-minute session one tick per second through both approaches
+against widgets that count their Tk calls:
+
+    python benchmarks/bench_display.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from viewmodel import DisplayBinder, compute_display_state, format_clock  # noqa: E402
+
+WARNING_SECONDS = 300
+SESSION = 30 * 60
+
+
+class CountingWidget:
+    def __init__(self):
+        self.calls = 0
+        self.mapped = False
+
+    def config(self, **kwargs):
+        self.calls += 1
+
+    def pack(self, **kwargs):
+        self.calls += 1
+        self.mapped = True
+
+    def pack_forget(self):
+        self.calls += 1
+        self.mapped = False
+
+    def winfo_ismapped(self):
+        self.calls += 1
+        return self.mapped
+
+
+def legacy_tick(remaining, time_label, status_label, extend_btn):
+    """What update_display used to do on every tick"""
+    time_label.config(text=format_clock(remaining))
+    if remaining > WARNING_SECONDS:
+        status_label.config(text="Timer running...", fg='#6c757d')
+        if not extend_btn.winfo_ismapped():
+            extend_btn.pack(side='left', padx=5)
+    elif remaining > 0:
+        status_label.config(text="Almost done!", fg='#ff9800')
+    else:
+        status_label.config(text="TIME'S UP!", fg='#ff5252')
+
+
+def main():
+    widgets = [CountingWidget() for _ in range(3)]
+    for remaining in range(SESSION, -1, -1):
+        legacy_tick(remaining, *widgets)
+    legacy_calls = sum(w.calls for w in widgets)
+
+    widgets = [CountingWidget() for _ in range(3)]
+    binder = DisplayBinder(*widgets, {'side': 'left', 'padx': 5})
+    for remaining in range(SESSION, -1, -1):
+        binder.apply(compute_display_state(remaining, WARNING_SECONDS, previous=binder.applied))
+
+    ticks = SESSION + 1
+    print(f"{ticks} ticks over a {SESSION // 60}-minute session")
+    print(f"{'redraw everything':<20}{legacy_calls:>8} Tk calls  {legacy_calls / ticks:.2f} per tick")
+    print(f"{'DisplayBinder':<20}{binder.tk_calls:>8} Tk calls  {binder.stats['calls_per_tick']:.2f} per tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Cost of logging an event on the calling thread, and event log throughput
+
+Times emit() as the Tk thread sees it, next to writing and flushing one
+JSON line per event on the caller (what a plain log file would do), then
+how fast the writer thread gets events into rotated gzip archives and
+how fast the query tool streams them back.
+
+The emit loop is a burst far beyond what a station logs (a few events a
+minute); its rare multi-millisecond outliers are garbage collection and
+the writer thread holding the GIL for a switch interval.
+
+    python benchmarks/bench_eventlog.py [--events 200000]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import summarize  # noqa: E402
+import eventlog  # noqa: E402
+
+KINDS = (eventlog.START, eventlog.WARNING, eventlog.WARNING, eventlog.WARNING, eventlog.TIMEOUT,
+         eventlog.LOCK, eventlog.EXTEND, eventlog.PIN_FAILED)
+
+
+def emit_on_caller(directory, count):
+    """Per-call time of emit(), with the writer thread running"""
+    log = eventlog.EventLog(directory, station='PC01', rotate_bytes=1 << 20)
+    log.start()
+    samples = []
+    clock = time.perf_counter
+    started = clock()
+    for i in range(count):
+        start = clock()
+        log.emit(KINDS[i % len(KINDS)], seconds=i % 3600)
+        samples.append(clock() - start)
+    emitted = clock() - started
+    log.close()
+    drained = clock() - started
+    return samples, emitted, drained, log
+
+
+def write_on_caller(path, count):
+    """Per-call time of encoding, writing and flushing a line on the caller"""
+    samples = []
+    clock = time.perf_counter
+    with open(path, 'ab') as f:
+        for i in range(count):
+            start = clock()
+            record = {'ts': round(time.time(), 3), 'kind': KINDS[i % len(KINDS)], 'station': 'PC01',
+                      'seconds': i % 3600}
+            f.write((json.dumps(record, separators=(',', ':')) + '\n').encode())
+            f.flush()
+            samples.append(clock() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=200000)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix='timer-events-')
+    try:
+        samples, emitted, drained, log = emit_on_caller(directory, args.events)
+        summarize("emit() on the caller", samples, unit='us', digits=2)
+        summarize("write + flush on the caller", write_on_caller(os.path.join(directory, 'plain.jsonl'), args.events),
+                  unit='us', digits=2)
+        archives = eventlog.list_archives(directory)
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in archives + [eventlog.CURRENT]
+                   if os.path.exists(os.path.join(directory, name)))
+        print(f"writer: {log.written} events in {log.batches} batches, {log.rotations} rotations, "
+              f"{args.events / drained:,.0f} events/s to disk ({emitted * 1000:.0f} ms emitting, "
+              f"{drained * 1000:.0f} ms until written)")
+        print(f"on disk: {size / 1024:,.0f} KiB, {size / log.written:.1f} bytes per event")
+
+        start = time.perf_counter()
+        total = sum(1 for _ in eventlog.read_events(directory))
+        elapsed = time.perf_counter() - start
+        print(f"query, all events: {total} in {elapsed * 1000:.0f} ms ({total / elapsed:,.0f} events/s)")
+        start = time.perf_counter()
+        timeouts = sum(1 for event in eventlog.read_events(directory) if event['kind'] == eventlog.TIMEOUT)
+        elapsed = time.perf_counter() - start
+        print(f"query, kind filter: {timeouts} timeouts in {elapsed * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Session journal write latency and recovery time
+
+    python benchmarks/bench_journal.py [--records 1000000] [--dir PATH]
+
+Use --dir to benchmark on the station's real disk; fsync cost depends
+heavily on it.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import percentile  # noqa: E402
+import journal  # noqa: E402
+
+
+def bench_writes(path, count, batch_size):
+    writer = journal.SessionJournal(path, batch_size=batch_size, compact_after=count * 2)
+    latencies = []
+    now = time.time()
+    for i in range(count):
+        start = time.perf_counter()
+        writer.append(journal.EXTEND, 60, now + i * 60, i * 60)
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    writer.close()
+    final_flush = time.perf_counter() - start
+    print(f"append, batch {batch_size:>3}: mean {sum(latencies) / count * 1e6:8.1f} us, "
+          f"p99 {percentile(latencies, 0.99) * 1e6:8.1f} us, "
+          f"max {max(latencies) * 1000:6.2f} ms (max includes a batched fsync), "
+          f"final flush {final_flush * 1000:.2f} ms")
+
+
+def build_journal(path, records):
+    now = time.time()
+    chunk = []
+    with open(path, 'wb') as f:
+        for i in range(records):
+            op = journal.START if i % 20 == 0 else journal.EXTEND
+            chunk.append(journal.pack_record(op, 60, now - records + i, now + 3600, 3600))
+            if len(chunk) == 65536:
+                f.write(b''.join(chunk))
+                chunk = []
+        f.write(b''.join(chunk))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--writes', type=int, default=20000)
+    parser.add_argument('--dir', help="directory to write the journals in")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='timer-journal-', dir=args.dir)
+    try:
+        for batch_size in (1, 16, journal.BATCH_SIZE):
+            bench_writes(os.path.join(directory, f'writes-{batch_size}.journal'), args.writes, batch_size)
+
+        path = os.path.join(directory, 'big.journal')
+        build_journal(path, args.records)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"journal with {args.records} records ({size_mb:.1f} MB, {journal.RECORD.size} bytes each)")
+
+        start = time.perf_counter()
+        record = journal.last_record(path)
+        tail = time.perf_counter() - start
+        print(f"recovery from tail record: {tail * 1000:8.3f} ms (remaining {record.remaining():.0f}s)")
+
+        with open(path, 'ab') as f:
+            f.write(b'\0' * 11)
+        start = time.perf_counter()
+        journal.last_record(path)
+        print(f"recovery with a torn tail: {(time.perf_counter() - start) * 1000:8.3f} ms")
+
+        start = time.perf_counter()
+        count = sum(1 for _ in journal.replay(path))
+        print(f"full replay for comparison: {(time.perf_counter() - start) * 1000:8.1f} ms ({count} records)")
+
+        start = time.perf_counter()
+        writer = journal.SessionJournal(path)
+        writer.compact()
+        writer.close()
+        print(f"compaction to {os.path.getsize(path)} bytes: {(time.perf_counter() - start) * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
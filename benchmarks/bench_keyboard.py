@@ -0,0 +1,134 @@
+"""Per-keystroke cost of the keyboard lockdown hooks
+
+Feeds a stream of game-style keystrokes through the hooks with the
+lockdown installed (lock screen, and what every keystroke paid for under
+the old always-on hooks) and removed (a paid session under the lockdown
+policy), and reports the time each key event spends in Python hook code,
+over the cost of an empty dispatch call.
+
+The fake backend runs everywhere, once dropping its listener with the
+hooks (as WindowsHookBackend does) and once keeping it (as the `keyboard`
+package does). With --real the same stream goes through the real
+backends' per-event code: WindowsHookBackend's hook procedure (Windows
+only; once it is unhooked Windows makes no call at all, which the
+benchmark checks rather than times) and the `keyboard` package's dispatch,
+which its OS listener keeps calling after the hooks are gone (Windows, or
+root on Linux).
+
+    python benchmarks/bench_keyboard.py [--keys 200000] [--real]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyboard_policy import (FakeKeyboardBackend, KeyboardLibBackend, KeyboardPolicy,  # noqa: E402
+                             WindowsHookBackend)
+
+GAME_KEYS = ('w', 'a', 's', 'd', 'space', 'shift', 'ctrl', 'e', 'r', 'q', '1', '2', '3', 'tab')
+# Their Windows virtual-key codes, for WindowsHookBackend
+GAME_VIRTUAL_KEYS = (0x57, 0x41, 0x53, 0x44, 0x20, 0xA0, 0xA2, 0x45, 0x52, 0x51, 0x31, 0x32, 0x33, 0x09)
+
+
+def key_stream(count, seed=1):
+    rng = random.Random(seed)
+    events = []
+    while len(events) < count:
+        key = rng.choice(GAME_KEYS)
+        events.append((key, True))
+        events.append((key, False))
+    return events[:count]
+
+
+def time_per_event(dispatch, events):
+    start = time.perf_counter()
+    for name, down in events:
+        dispatch(name, down)
+    return (time.perf_counter() - start) / len(events)
+
+
+def report(label, seconds, baseline):
+    print(f"{label:<56}{max(0.0, seconds - baseline) * 1e9:>10.0f} ns/key")
+
+
+def bench_fake(events, baseline):
+    for persistent, label in ((False, "fake backend"), (True, "fake backend, listener kept")):
+        backend = FakeKeyboardBackend(persistent_listener=persistent)
+        policy = KeyboardPolicy(lambda: backend)
+        policy.apply(True)
+        locked = time_per_event(backend.key_event, events)
+        policy.apply(False)
+        running = time_per_event(backend.key_event, events)
+        report(f"{label}, hooks installed (lock screen)", locked, baseline)
+        report(f"{label}, session running (hooks removed)", running, baseline)
+
+
+def bench_windows_hook(events, baseline):
+    if sys.platform != 'win32':
+        print("WindowsHookBackend: Windows only")
+        return
+    import ctypes
+
+    backend = WindowsHookBackend()
+    policy = KeyboardPolicy(lambda: backend)
+    policy.apply(True)
+    if policy.failed:
+        print("WindowsHookBackend: could not hook here")
+        return
+    structs = {name: backend.event_struct(vkCode=code) for name, code in zip(GAME_KEYS, GAME_VIRTUAL_KEYS)}
+    addresses = {name: ctypes.addressof(struct) for name, struct in structs.items()}
+
+    def dispatch(name, down):
+        backend.hook_event(0, 0x0100 if down else 0x0101, addresses[name])
+
+    locked = time_per_event(dispatch, events)
+    policy.apply(False)
+    report("WindowsHookBackend, hook set (lock screen)", locked, baseline)
+    print(f"{'WindowsHookBackend, session running':<56}{'no hook' if backend.hook is None else 'STILL HOOKED':>10}")
+
+
+def bench_keyboard_lib(events, baseline):
+    try:
+        backend = KeyboardLibBackend()
+        keyboard = backend.keyboard
+        policy = KeyboardPolicy(lambda: backend)
+        policy.apply(True)
+        if policy.failed:
+            print("keyboard package unavailable here")
+            return
+        codes = {name: keyboard.key_to_scan_codes(name)[0] for name in GAME_KEYS}
+    except Exception as e:
+        print(f"keyboard package unavailable here: {e}")
+        return
+    listener = keyboard._listener
+
+    def dispatch(name, down):
+        event_type = keyboard.KEY_DOWN if down else keyboard.KEY_UP
+        listener.direct_callback(keyboard.KeyboardEvent(event_type, codes[name], name))
+
+    locked = time_per_event(dispatch, events)
+    policy.apply(False)
+    running = time_per_event(dispatch, events)
+    report("keyboard, hooks installed (lock screen)", locked, baseline)
+    report("keyboard, session running (listener kept)", running, baseline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keys', type=int, default=200000, help="key events per measurement")
+    parser.add_argument('--real', action='store_true', help="also measure the real backends")
+    args = parser.parse_args()
+    events = key_stream(args.keys)
+    baseline = time_per_event(lambda name, down: True, events)
+    print(f"added per key event over an empty dispatch ({baseline * 1e9:.0f} ns)")
+    bench_fake(events, baseline)
+    if args.real:
+        bench_windows_hook(events, baseline)
+        bench_keyboard_lib(events, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Ledger ingest rate and report latency over millions of rows
+
+Fills a throwaway ledger with `--rows` top-ups spread over last month and
+the months before it, then times the "revenue per station last month"
+report and a raw streaming scan of one station:
+
+    python benchmarks/bench_ledger.py [--rows 10000000] [--stations 300]
+"""
+import argparse
+import datetime
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger import Ledger, price_for_seconds  # noqa: E402
+
+
+def last_month():
+    first = datetime.date.today().replace(day=1)
+    end = first - datetime.timedelta(days=1)
+    return end.replace(day=1), end
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000000)
+    parser.add_argument('--stations', type=int, default=300)
+    parser.add_argument('--months', type=int, default=3, help="months of history ending last month")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    stations = [f"PC{i:03d}" for i in range(args.stations)]
+    start, end = last_month()
+    first_day = start
+    for _ in range(args.months - 1):
+        first_day = (first_day - datetime.timedelta(days=1)).replace(day=1)
+    span_start = datetime.datetime(first_day.year, first_day.month, 1).timestamp()
+    span_end = datetime.datetime(end.year, end.month, end.day, 23, 59, 59).timestamp()
+    step = (span_end - span_start) / args.rows
+
+    directory = tempfile.mkdtemp(prefix='timer-ledger-')
+    try:
+        ledger = Ledger(directory)
+        began = time.perf_counter()
+        timestamp = span_start
+        for _ in range(args.rows):
+            seconds = rng.choice((1500, 3000, 600, 1800))
+            ledger.record(rng.choice(stations), seconds, price_for_seconds(seconds), timestamp)
+            timestamp += step
+        ledger.close()
+        ingest = time.perf_counter() - began
+        print(f"ingested {args.rows} rows in {ingest:.1f} s ({args.rows / ingest:,.0f} rows/s)")
+
+        began = time.perf_counter()
+        reopened = Ledger(directory)
+        totals = reopened.totals(start, end, by='station')
+        report = time.perf_counter() - began
+        revenue = sum(price for _, _, price in totals.values()) / 100
+        top_ups = sum(count for count, _, _ in totals.values())
+        print(f"revenue per station last month ({top_ups} top-ups, {revenue:,.2f} pesos, "
+              f"{len(totals)} stations): {report * 1000:.1f} ms from a cold open")
+
+        began = time.perf_counter()
+        rows = sum(1 for _ in reopened.scan(
+            datetime.datetime(end.year, end.month, end.day).timestamp(), span_end, station=stations[0]
+        ))
+        print(f"raw scan of one station's last day ({rows} rows): {(time.perf_counter() - began) * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Member balance lookup and debit latency with 100k members
+
+Fills a fresh WAL-mode member database, then times random balance
+lookups, debits (update plus movement row in one transaction) and the
+sign-in / bank round trip a station does, against the 1 ms target.
+
+    python benchmarks/bench_members.py [--members 100000] [--ops 5000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import summarize  # noqa: E402
+from members import BANK, MemberStore  # noqa: E402
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=100000)
+    parser.add_argument('--ops', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    directory = tempfile.mkdtemp(prefix='timer-members-')
+    store = MemberStore(os.path.join(directory, 'members.db'))
+    try:
+        start = time.perf_counter()
+        with store._transaction() as db:
+            db.executemany(
+                "INSERT INTO members (member_id, name, balance, updated) VALUES (?, '', ?, 0)",
+                ((f"M{number:06d}", float(rng.randint(3600, 36000))) for number in range(args.members)))
+        print(f"{args.members} members loaded in {time.perf_counter() - start:.2f} s")
+
+        ids = [f"M{rng.randrange(args.members):06d}" for _ in range(args.ops)]
+        summarize("balance lookup", [timed(store.balance, member_id) for member_id in ids])
+        summarize("debit 60 s", [timed(store.debit, member_id, 60, 'PC01') for member_id in ids])
+
+        def round_trip(member_id):
+            seconds = store.withdraw_all(member_id, 'PC01')
+            store.credit(member_id, seconds - 0.5, 'PC01', BANK)
+        summarize("sign in + bank", [timed(round_trip, member_id) for member_id in ids[:args.ops // 5]])
+    finally:
+        store.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
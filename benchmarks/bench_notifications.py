@@ -0,0 +1,93 @@
+"""Event-loop stall while toasts fade: sleep-based fades versus NotificationManager
+
+A probe callback re-arms itself every PROBE_MS; the longest gap between
+two probes is the worst stall the clock would have seen. Needs a display
+(use xvfb-run on a headless machine):
+
+    python benchmarks/bench_notifications.py [--toasts 3]
+"""
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notifications import NotificationManager  # noqa: E402
+
+PROBE_MS = 5
+DISPLAY_MS = 300
+
+
+def legacy_show(root, message, bg_color='#ff9800', display_time=DISPLAY_MS):
+    """The blocking fade-in/fade-out that show_notification used to do"""
+    notif = tk.Toplevel(root)
+    notif.overrideredirect(True)
+    notif.attributes('-topmost', True)
+    notif.attributes('-alpha', 0.0)
+    notif.configure(bg='grey15')
+    notif.geometry(f"+{root.winfo_screenwidth() - 320}+20")
+    frame = tk.Frame(notif, bg=bg_color, padx=20, pady=15)
+    frame.pack(padx=5, pady=5)
+    tk.Label(frame, text=message, bg=bg_color, fg='white', font=('Segoe UI', 14, 'bold')).pack()
+    for i in range(0, 11):
+        notif.attributes('-alpha', i / 10)
+        notif.update()
+        time.sleep(0.02)
+
+    def fade_out():
+        for i in range(10, -1, -1):
+            notif.attributes('-alpha', i / 10)
+            notif.update()
+            time.sleep(0.02)
+        notif.destroy()
+
+    notif.after(display_time, fade_out)
+
+
+def measure(root, show, toasts):
+    gaps = []
+    last = [time.perf_counter()]
+    done = [False]
+
+    def probe():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+        if not done[0]:
+            root.after(PROBE_MS, probe)
+
+    def finish():
+        done[0] = True
+        root.quit()
+
+    root.after(PROBE_MS, probe)
+    for i in range(toasts):
+        root.after(50 + i * 100, show, f"Notification {i + 1}")
+    root.after(50 + toasts * 100 + DISPLAY_MS + 800, finish)
+    root.mainloop()
+    return max(gaps) * 1000, sum(g > 0.05 for g in gaps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--toasts', type=int, default=3)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.geometry("200x100")
+    legacy = measure(root, lambda message: legacy_show(root, message), args.toasts)
+
+    manager = NotificationManager(root)
+    current = measure(root, lambda message: manager.show(message, display_time=DISPLAY_MS), args.toasts)
+    manager.destroy()
+    root.destroy()
+
+    print(f"{args.toasts} overlapping toasts, probe every {PROBE_MS} ms")
+    print(f"{'sleep-based fades':<24}worst stall {legacy[0]:8.1f} ms, {legacy[1]} stalls > 50 ms")
+    print(f"{'NotificationManager':<24}worst stall {current[0]:8.1f} ms, {current[1]} stalls > 50 ms")
+
+
+if __name__ == "__main__":
+    main()
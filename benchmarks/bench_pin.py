@@ -0,0 +1,112 @@
+"""PIN check latency at the calibrated hash cost, and what it does to the UI loop
+
+Calibrates PBKDF2 for --target-ms on this CPU, then runs a loop standing
+in for the Tk thread: a tick every --tick-ms (the clock and the lock
+screen countdown) with a PIN submitted every --every-ms. Each PIN is
+checked either inline on the loop, as a plain comparison would be if
+it were simply swapped for the slow hash, or through PinService's worker
+with results handed back the way TkDispatcher does. Reports the time
+from OK to the result on the loop, and how late the ticks ran.
+
+    python benchmarks/bench_pin.py [--target-ms 50] [--seconds 5]
+"""
+import argparse
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import summarize  # noqa: E402
+import pin_service  # noqa: E402
+from config import DEFAULT_CONFIG  # noqa: E402
+
+PIN = "062100!"
+
+
+class Reports:
+    """Stands in for the Tk dispatcher: worker results run when drained"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def call(self, fn, *args):
+        self.queue.put((fn, args))
+
+    def drain(self):
+        while True:
+            try:
+                fn, args = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            fn(*args)
+
+
+def run_loop(seconds, tick, every, submit, drain):
+    """(tick lags, check latencies) of a loop ticking every `tick` s, checking a PIN every `every` s"""
+    lags = []
+    latencies = []
+    start = time.perf_counter()
+    next_tick = next_check = start
+    while True:
+        now = time.perf_counter()
+        if now - start >= seconds:
+            return lags, latencies
+        if now >= next_tick:
+            lags.append(now - next_tick)
+            # Like after(): the next tick is scheduled from when this one ran
+            next_tick = now + tick
+        if now >= next_check:
+            submit(PIN, lambda ok, wait, submitted=now: latencies.append(time.perf_counter() - submitted))
+            next_check = now + every
+        drain()
+        # Wake for the next tick or check, or soon anyway to pick up results
+        time.sleep(max(0.0, min(next_tick, next_check, time.perf_counter() + 0.001) - time.perf_counter()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target-ms', type=float, default=pin_service.TARGET_SECONDS * 1000)
+    parser.add_argument('--seconds', type=float, default=5.0, help="length of each run")
+    parser.add_argument('--tick-ms', type=float, default=20.0)
+    parser.add_argument('--every-ms', type=float, default=250.0, help="time between PIN submissions")
+    args = parser.parse_args()
+
+    iterations = pin_service.calibrate(args.target_ms / 1000)
+    pin_hash = pin_service.hash_pin(PIN, iterations)
+    parsed = pin_service.parse_pin_hash(pin_hash)
+    samples = []
+    for _ in range(20):
+        start = time.perf_counter()
+        pin_service.check_pin(PIN, parsed)
+        samples.append(time.perf_counter() - start)
+    print(f"calibrated to {iterations} PBKDF2-SHA256 iterations for {args.target_ms:g} ms")
+    summarize("hash alone", samples)
+    print()
+
+    tick = args.tick_ms / 1000
+    every = args.every_ms / 1000
+    lags, _ = run_loop(args.seconds, tick, every, lambda pin, done: None, lambda: None)
+    summarize("tick lag, no checks", lags)
+
+    def inline(pin, done):
+        done(pin_service.check_pin(pin, parsed), 0.0)
+
+    lags, latencies = run_loop(args.seconds, tick, every, inline, lambda: None)
+    summarize("check latency, inline", latencies)
+    summarize("tick lag, inline", lags)
+
+    reports = Reports()
+    service = pin_service.PinService(reports.call)
+    service.set_pin(DEFAULT_CONFIG._replace(pin_hash=pin_hash))
+    service.start()
+    service.join()
+    lags, latencies = run_loop(args.seconds, tick, every, service.verify, reports.drain)
+    service.close()
+    summarize("check latency, worker", latencies)
+    summarize("tick lag, worker", lags)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compare the fixed 100 ms poll with the deadline-driven scheduler
+
+Simulates one hour of station time per scenario on a virtual clock and
+reports wakeups and CPU time per hour for each policy:
+
+    python benchmarks/bench_scheduler.py
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import WAKE_SLACK_MS, next_tick_delay  # noqa: E402
+
+HOUR = 3600.0
+WARNING_SECONDS = 300
+LEGACY_INTERVAL = 0.1
+
+
+class StubLabel:
+    """Stands in for a Tk label when no display is available"""
+
+    def config(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def make_labels():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        return root, tk.Label(root), tk.Label(root)
+    except Exception:
+        return None, StubLabel(), StubLabel()
+
+
+def tick(now, deadline, time_label, status_label, visible):
+    """The work one check_schedule pass does"""
+    if deadline is None:
+        if visible:
+            time_label.config(text="00:00")
+            status_label.config(text="Ready", fg='#6c757d')
+        return None
+    remaining = max(0.0, deadline - now)
+    if visible:
+        minutes, seconds = divmod(int(remaining), 60)
+        time_label.config(text=f"{minutes:02d}:{seconds:02d}")
+        if remaining > WARNING_SECONDS:
+            status_label.config(text="Timer running...", fg='#6c757d')
+        elif remaining > 0:
+            status_label.config(text="Almost done!", fg='#ff9800')
+        else:
+            status_label.config(text="TIME'S UP!", fg='#ff5252')
+    return remaining
+
+
+def run_legacy(deadline, labels, visible):
+    # The fixed poll redraws whether or not the window is mapped
+    visible = True
+    now = 0.0
+    wakeups = 0
+    start = time.process_time()
+    while now < HOUR:
+        tick(now, deadline, labels[0], labels[1], visible)
+        wakeups += 1
+        now += LEGACY_INTERVAL
+    return wakeups, time.process_time() - start
+
+
+def run_deadline(deadline, labels, visible):
+    now = 0.0
+    wakeups = 0
+    start = time.process_time()
+    while now < HOUR:
+        remaining = tick(now, deadline, labels[0], labels[1], visible)
+        wakeups += 1
+        if remaining is not None and remaining <= 0:
+            remaining = None
+        delay = next_tick_delay(remaining, (WARNING_SECONDS,), visible)
+        if delay is None:
+            break
+        now += (math.ceil(delay * 1000) + WAKE_SLACK_MS) / 1000.0
+    return wakeups, time.process_time() - start
+
+
+def main():
+    root, time_label, status_label = make_labels()
+    labels = (time_label, status_label)
+    backend = "Tk labels" if root is not None else "stub labels (no display)"
+    scenarios = [
+        ("idle", None, True),
+        ("running", HOUR + 0.5, True),
+        ("running, expires at 59:30", HOUR - 30, True),
+        ("running, minimized", HOUR + 0.5, False),
+    ]
+    print(f"One simulated hour per scenario, {backend}")
+    print(f"{'scenario':<28}{'policy':<10}{'wakeups/h':>12}{'CPU ms/h':>12}")
+    for name, deadline, visible in scenarios:
+        for policy, runner in (("legacy", run_legacy), ("deadline", run_deadline)):
+            wakeups, cpu = runner(deadline, labels, visible)
+            print(f"{name:<28}{policy:<10}{wakeups:>12}{cpu * 1000:>12.1f}")
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
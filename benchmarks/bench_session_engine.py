@@ -0,0 +1,55 @@
+"""Time SessionEngine start/extend/expire with many concurrent sessions
+
+    python benchmarks/bench_session_engine.py [--sessions 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_engine import SessionEngine  # noqa: E402
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10}{count:>10} ops {elapsed * 1e6 / count:>10.2f} us/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=10000, help="concurrent sessions")
+    args = parser.parse_args()
+    sessions = args.sessions
+    rng = random.Random(1)
+    clock = ManualClock()
+    engine = SessionEngine(clock=clock)
+    ids = [f"PC{i:05d}" for i in range(sessions)]
+
+    timed("start", sessions, lambda: [engine.start(sid, rng.randint(60, 7200)) for sid in ids])
+    timed("extend", sessions, lambda: [engine.extend(rng.choice(ids), 300) for _ in ids])
+
+    def expire_all():
+        expired = 0
+        while engine.next_deadline() is not None:
+            clock.now += 1.0
+            expired += len(engine.expire_due())
+        assert expired == sessions, expired
+
+    timed("expire", sessions, expire_all)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Scheduler overhead and event timing accuracy from full simulated sessions
+
+Plays scripted shop scenarios through the real app on the virtual-clock
+harness (simulation.py) and reports, per simulated hour: after() callbacks
+run, check_schedule ticks, Tk widget calls, CPU time spent and the speedup
+over real time, plus how late the warning, expiry and shutdown fired
+compared with their exact due times.
+
+    python benchmarks/bench_simulation.py [--runs 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import Simulation  # noqa: E402
+
+HOUR = 3600.0
+LOCK_SECONDS = 30
+
+
+def idle(sim):
+    sim.advance(HOUR)
+    return []
+
+
+def one_hour_session(sim):
+    sim.add_time(minutes=60)
+    start = sim.elapsed
+    sim.advance(HOUR + 60)
+    return [('warning', start + HOUR - 300), ('expiry', start + HOUR),
+            ('shutdown', start + HOUR + LOCK_SECONDS)]
+
+
+def minimized_session(sim):
+    sim.minimize()
+    return one_hour_session(sim)
+
+
+def extend_from_lock_screen(sim):
+    sim.add_time(minutes=25)
+    start = sim.elapsed
+    sim.advance(25 * 60 + 5)
+    sim.extend_from_lock_screen(minutes=25)
+    extended = sim.elapsed
+    sim.advance(HOUR - sim.elapsed)
+    return [('warning', start + 20 * 60), ('expiry', start + 25 * 60),
+            ('warning', extended + 20 * 60), ('expiry', extended + 25 * 60),
+            ('shutdown', extended + 25 * 60 + LOCK_SECONDS)]
+
+
+def short_sessions(sim):
+    """Eleven 5-minute sessions, each topped up from the lock screen 10 s after it ends"""
+    expected = []
+    for _ in range(11):
+        if not sim.app.lock_screen.visible:
+            sim.add_time(minutes=5)
+        else:
+            sim.extend_from_lock_screen(minutes=5)
+        start = sim.elapsed
+        expected.append(('expiry', start + 300))
+        sim.advance(310)
+    sim.advance(HOUR - sim.elapsed)
+    return expected
+
+
+SCENARIOS = [
+    ("idle", idle),
+    ("1 h session", one_hour_session),
+    ("1 h session, minimized", minimized_session),
+    ("extend from lock screen", extend_from_lock_screen),
+    ("5 min sessions from lock", short_sessions),
+]
+
+EVENT_KINDS = {
+    'warning': ('notification', "5 MINUTES REMAINING!"),
+    'expiry': ('notification', "TIME'S UP!"),
+    'shutdown': ('shutdown', None),
+}
+
+
+def timing_errors(sim, expected):
+    """Milliseconds between each expected event and when it actually fired"""
+    errors = []
+    for name, due in expected:
+        kind, detail = EVENT_KINDS[name]
+        fired = sim.first(kind, detail, after=due - 1)
+        errors.append(None if fired is None else (fired - due) * 1000)
+    return errors
+
+
+def run(scenario, runs):
+    callbacks = ticks = widget_calls = 0
+    simulated = cpu = wall = 0.0
+    errors = []
+    for _ in range(runs):
+        with Simulation() as sim:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            expected = scenario(sim)
+            cpu += time.process_time() - cpu_start
+            wall += time.perf_counter() - wall_start
+            simulated += sim.elapsed
+            callbacks += sim.loop.executed
+            ticks += sim.app.ticker.wakeups
+            widget_calls += sim.loop.widget_calls
+            errors.extend(timing_errors(sim, expected))
+    hours = simulated / HOUR
+    return {
+        'callbacks': callbacks / hours,
+        'ticks': ticks / hours,
+        'widget_calls': widget_calls / hours,
+        'cpu_ms': cpu * 1000 / hours,
+        'speedup': simulated / wall if wall else float('inf'),
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help="simulations per scenario")
+    args = parser.parse_args()
+
+    print(f"{args.runs} runs per scenario, figures per simulated hour")
+    print(f"{'scenario':<28}{'callbacks':>10}{'ticks':>8}{'Tk calls':>10}{'CPU ms':>9}"
+          f"{'speedup':>12}{'events':>8}{'late max ms':>13}")
+    for name, scenario in SCENARIOS:
+        result = run(scenario, args.runs)
+        fired = [e for e in result['errors'] if e is not None]
+        missed = len(result['errors']) - len(fired)
+        late = f"{max(fired):.1f}" if fired else "-"
+        if missed:
+            late += f" ({missed} missed)"
+        print(f"{name:<28}{result['callbacks']:>10.0f}{result['ticks']:>8.0f}"
+              f"{result['widget_calls']:>10.0f}{result['cpu_ms']:>9.1f}"
+              f"{result['speedup']:>11.0f}x{len(result['errors']):>8}{late:>13}")
+
+
+if __name__ == "__main__":
+    main()
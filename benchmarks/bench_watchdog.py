@@ -0,0 +1,167 @@
+"""Watchdog footprint, cost of one state read, and time to bring back a killed timer
+
+Runs station_watchdog.py as its own process over a stand-in timer (a
+tiny script that publishes a deadline and beats like the real app) and
+reports the watchdog's CPU time and resident memory from /proc, next to
+a bare Python interpreter for scale. Then kills the timer and times how
+long until a relaunched one is beating with the same deadline, and
+finally lets the time run out before a kill to see the station locked
+(with the dry-run power backend).
+
+Also times one poll's read: struct.unpack_from off the mapping, versus
+opening and reading the file each time.
+
+    python benchmarks/bench_watchdog.py [--seconds 20] [--interval 0.25]
+
+Linux only (reads /proc); CPU time there is counted in clock ticks,
+usually 10 ms, so a longer --seconds gives a finer figure.
+"""
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from station_watchdog import LAYOUT, RUNNING, StatePublisher, StateReader  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Publishes like FullscreenTimerApp: the deadline it was given (or a
+# fresh one), then a heartbeat every 0.1 s
+FAKE_TIMER = """
+import sys, time
+from station_watchdog import StatePublisher
+args = sys.argv[1:]
+left = float(args[0])
+path = args[args.index('--state-file') + 1]
+deadline = float(args[args.index('--deadline') + 1]) if '--deadline' in args else time.time() + left
+board = StatePublisher(path)
+board.update(deadline, True, False, False)
+while True:
+    board.beat(time.time())
+    time.sleep(0.1)
+"""
+
+
+def proc_stats(pid):
+    """(CPU seconds, RSS KiB, peak RSS KiB) of a process"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    memory = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                memory[key] = int(value.split()[0])
+    return cpu, memory['VmRSS'], memory['VmHWM']
+
+
+def wait_for(reader, test, limit=30.0):
+    """Seconds until the snapshot passes `test`, polling every millisecond"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < limit:
+        snapshot = reader.read()
+        if snapshot is not None and test(snapshot):
+            return time.perf_counter() - start, snapshot
+        time.sleep(0.001)
+    raise RuntimeError("timed out waiting for the watchdog")
+
+
+def time_reads(path, count):
+    board = StatePublisher(path)
+    board.update(time.time() + 600, True, False, False)
+    reader = StateReader(path)
+    start = time.perf_counter()
+    for _ in range(count):
+        reader.read()
+    mapped = (time.perf_counter() - start) / count
+    start = time.perf_counter()
+    for _ in range(count):
+        with open(path, 'rb') as f:
+            LAYOUT.unpack(f.read(LAYOUT.size))
+    opened = (time.perf_counter() - start) / count
+    reader.close()
+    board.close()
+    return mapped, opened
+
+
+def start_watchdog(state, interval, left):
+    return subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'station_watchdog.py'), '--state', state, '--power', 'dry-run',
+         '--interval', str(interval), '--stale', '2', '--', sys.executable, '-c', FAKE_TIMER, str(left)],
+        env=dict(os.environ, PYTHONPATH=ROOT),
+        stdout=subprocess.PIPE,
+        universal_newlines=True
+    )
+
+
+def stop(watchdog, reader):
+    snapshot = reader.read()
+    watchdog.send_signal(signal.SIGINT)
+    watchdog.wait()
+    if snapshot is not None:
+        try:
+            os.kill(snapshot.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    return watchdog.stdout.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=20.0, help="how long to sample the watchdog")
+    parser.add_argument('--interval', type=float, default=0.25, help="watchdog poll interval")
+    parser.add_argument('--reads', type=int, default=100000)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix='timer-watchdog-')
+    state = os.path.join(directory, 'state.bin')
+
+    mapped, opened = time_reads(os.path.join(directory, 'reads.bin'), args.reads)
+    print(f"one state read: {mapped * 1e6:.2f} us off the mapping, {opened * 1e6:.2f} us opening the file")
+
+    baseline = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+    time.sleep(0.5)
+    _, bare_rss, _ = proc_stats(baseline.pid)
+    baseline.kill()
+    baseline.wait()
+
+    watchdog = start_watchdog(state, args.interval, 600)
+    reader = StateReader(state)
+    wait_for(reader, lambda s: s.flags & RUNNING and s.heartbeat > 0)
+    cpu_before, _, _ = proc_stats(watchdog.pid)
+    time.sleep(args.seconds)
+    cpu_after, rss, peak = proc_stats(watchdog.pid)
+    cpu = cpu_after - cpu_before
+    print(f"watchdog over {args.seconds:g} s, polling every {args.interval:g} s: "
+          f"CPU {cpu * 1000:.0f} ms ({cpu / args.seconds * 100:.3f} %), "
+          f"RSS {rss} KiB (peak {peak} KiB; bare Python {bare_rss} KiB)")
+
+    before = reader.read()
+    os.kill(before.pid, signal.SIGKILL)
+    elapsed, after = wait_for(reader, lambda s: s.pid != before.pid and s.heartbeat > 0)
+    print(f"killed timer back up and beating after {elapsed * 1000:.0f} ms, "
+          f"deadline {'kept' if after.deadline == before.deadline else 'CHANGED'}")
+    stop(watchdog, reader)
+    reader.close()
+
+    # Time runs out, then the timer is killed: the station must be locked
+    os.remove(state)
+    watchdog = start_watchdog(state, args.interval, 1)
+    reader = StateReader(state)
+    _, before = wait_for(reader, lambda s: s.flags & RUNNING and s.heartbeat > 0)
+    time.sleep(max(0.0, before.deadline - time.time()) + 0.2)
+    os.kill(before.pid, signal.SIGKILL)
+    wait_for(reader, lambda s: s.pid != before.pid and s.heartbeat > 0)
+    output = stop(watchdog, reader)
+    reader.close()
+    print(f"expired timer killed: {'station locked' if 'locked the station' in output else 'NOT LOCKED'}")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
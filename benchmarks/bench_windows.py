@@ -0,0 +1,105 @@
+"""Open-to-visible latency of the PIN prompt, Add Time menu and lock screen
+
+Opens and closes each window many times, once with a fresh window built
+for every open (what the timer used to do) and once reusing the same
+window from screens.py, and times each open until the window's <Map>
+event. The PIN prompt used to be a modal simpledialog; its keypad
+stands in for it in the rebuilt case.
+
+    python benchmarks/bench_windows.py [--opens 200]
+    xvfb-run python benchmarks/bench_windows.py
+
+--headless uses the simulation harness's Tk stand-in, which measures only
+the Python side and counts the Tk calls per open (no display needed).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import summarize  # noqa: E402
+import screens  # noqa: E402
+from metrics import LoopMonitor  # noqa: E402
+from simulation import EventLoop, VirtualClock, tk_module  # noqa: E402
+
+MENU_BUTTONS = [
+    ("30 MIN - ₱6", '#FF9800', ('Arial', 12, 'bold'), None),
+    ("1 HOUR - ₱10", '#FF9800', ('Arial', 12, 'bold'), None),
+    ("Custom Minutes", '#4CAF50', ('Arial', 12), None),
+    ("Custom Seconds", '#2196F3', ('Arial', 12), None),
+    ("👤 Member", '#9C27B0', ('Arial', 12), None),
+    ("Cancel", '#f44336', ('Arial', 12), None),
+]
+
+
+def windows(root, monitor):
+    """(name, make a window, arguments to open it with)"""
+    return [
+        ("PIN prompt", lambda: screens.PinDialog(root, lambda pin, done: done(True, 0.0), monitor),
+         ("Enter PIN to add time:", lambda: None)),
+        ("Add Time menu", lambda: screens.MenuWindow(root, 'time menu', "Add Time", "ADD TIME OPTIONS",
+                                                     300, 15, monitor),
+         (MENU_BUTTONS, None)),
+        ("lock screen", lambda: screens.LockScreen(root, lambda pin, done: done(True, 0.0), lambda: None, lambda: None,
+                                                   time.monotonic, monitor),
+         (30,)),
+    ]
+
+
+def open_once(root, window, args, headless):
+    """Seconds from open() until the window was mapped"""
+    start = time.perf_counter()
+    window.open(*args)
+    while window.opened_at is not None and not headless:
+        root.update()
+    elapsed = time.perf_counter() - start
+    window.close()
+    if not headless:
+        root.update()
+    return elapsed
+
+
+def run(root, loop, make, args, opens, reuse, headless):
+    samples = []
+    calls = 0
+    window = make()
+    for _ in range(opens):
+        if not reuse:
+            window = make()
+        before = loop.widget_calls if loop else 0
+        samples.append(open_once(root, window, args, headless))
+        calls += (loop.widget_calls - before) if loop else 0
+        if not reuse:
+            window.window.destroy()
+    return samples, calls / opens if loop else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--opens', type=int, default=200)
+    parser.add_argument('--headless', action='store_true', help="Tk stand-in, no display needed")
+    args = parser.parse_args()
+
+    loop = None
+    if args.headless:
+        loop = EventLoop(VirtualClock())
+        screens.tk = tk_module(loop)
+    root = screens.tk.Tk()
+    root.geometry("1280x720")
+    monitor = LoopMonitor(clock=time.perf_counter)
+
+    backend = "Tk stand-in (Python side only)" if args.headless else "Tk"
+    print(f"{args.opens} opens each, {backend}")
+    for name, make, open_args in windows(root, monitor):
+        for reuse in (False, True):
+            samples, calls = run(root, loop, make, open_args, args.opens, reuse, args.headless)
+            summarize(f"{name}, {'reused' if reuse else 'built per open'}", samples)
+            if calls is not None:
+                print(f"{'':<34}{calls:.1f} Tk calls per open")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
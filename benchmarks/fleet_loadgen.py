@@ -0,0 +1,169 @@
+"""Load generator for the fleet coordinator
+
+Simulates many stations on localhost, pushes commands through the
+coordinator's admin interface and reports round-trip command latency and
+coordinator CPU use:
+
+    python benchmarks/fleet_loadgen.py --stations 500 --commands 2000
+    python benchmarks/fleet_loadgen.py --connect 10.0.0.5:8765   # existing coordinator
+
+A coordinator started here gets a throwaway admin token and station key;
+with --connect they are read from --token-file and --key-file (default:
+the per-user data dir, where the coordinator creates them).
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import secrets
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _stats import percentile  # noqa: E402
+from fleet import (Coordinator, default_admin_token_path, default_station_key_path, encode,  # noqa: E402
+                   load_token, parse_address)
+
+
+def run_coordinator(conn, admin_token, station_key):
+    """Child process: serve until told to stop, then report CPU time"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    coordinator = Coordinator(admin_token=admin_token, station_key=station_key)
+    loop.run_until_complete(coordinator.start('127.0.0.1', 0))
+    conn.send(coordinator.port)
+    loop.add_reader(conn.fileno(), loop.stop)
+    loop.run_forever()
+    conn.recv()
+    conn.send((time.process_time(), len(coordinator.last_seen)))
+
+
+async def simulate_stations(host, port, key, station_ids, heartbeat_interval, stop):
+    """One connection carrying heartbeats for a batch of stations"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode({'t': 'hello', 'ids': station_ids, 'key': key}))
+    remaining = {sid: random.uniform(0, 7200) for sid in station_ids}
+
+    async def heartbeats():
+        await asyncio.sleep(random.uniform(0, heartbeat_interval))
+        while not stop.is_set():
+            rows = [[sid, round(left, 1), 0] for sid, left in remaining.items()]
+            writer.write(encode({'t': 'hb', 's': rows}))
+            await asyncio.sleep(heartbeat_interval)
+
+    sender = asyncio.ensure_future(heartbeats())
+    try:
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if message.get('t') == 'cmd':
+                if message['op'] == 'add':
+                    remaining[message['id']] += message['s']
+                else:
+                    remaining[message['id']] = -1
+                writer.write(encode({'t': 'ack', 'n': message['n'], 'ok': True}))
+    finally:
+        sender.cancel()
+        writer.close()
+
+
+async def drive_commands(host, port, token, station_ids, count, rate):
+    """Send admin commands at `rate` per second and collect latencies"""
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = {}
+    latencies = []
+    failures = 0
+
+    async def receive():
+        nonlocal failures
+        while len(latencies) + failures < count:
+            message = json.loads(await reader.readline())
+            started = sent.pop(message['n'])
+            if message.get('ok'):
+                latencies.append(time.perf_counter() - started)
+            else:
+                failures += 1
+
+    receiver = asyncio.ensure_future(receive())
+    for n in range(1, count + 1):
+        op = 'add' if random.random() < 0.9 else 'lock'
+        sent[n] = time.perf_counter()
+        writer.write(encode({'t': 'admin', 'n': n, 'token': token, 'op': op,
+                             'id': random.choice(station_ids), 's': 300}))
+        await asyncio.sleep(1.0 / rate)
+    await asyncio.wait_for(receiver, 30)
+    writer.close()
+    return latencies, failures
+
+
+async def run(args, host, port, admin_token, station_key):
+    station_ids = [f"PC{i:04d}" for i in range(args.stations)]
+    stop = asyncio.Event()
+    batches = [station_ids[i:i + args.per_connection]
+               for i in range(0, len(station_ids), args.per_connection)]
+    stations = [asyncio.ensure_future(simulate_stations(host, port, station_key, batch, args.heartbeat, stop))
+                for batch in batches]
+    # Let every station connect and send a first heartbeat
+    await asyncio.sleep(args.heartbeat + 0.5)
+    latencies, failures = await drive_commands(host, port, admin_token, station_ids, args.commands, args.rate)
+    stop.set()
+    for task in stations:
+        task.cancel()
+    return latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stations', type=int, default=500)
+    parser.add_argument('--per-connection', type=int, default=1,
+                        help="stations multiplexed (and heartbeats batched) per connection")
+    parser.add_argument('--commands', type=int, default=2000)
+    parser.add_argument('--rate', type=float, default=200.0, help="commands per second")
+    parser.add_argument('--heartbeat', type=float, default=1.0, help="heartbeat interval in seconds")
+    parser.add_argument('--connect', metavar='HOST:PORT', help="use a running coordinator")
+    parser.add_argument('--token-file', metavar='PATH', help="its admin token (with --connect)")
+    parser.add_argument('--key-file', metavar='PATH', help="its station key (with --connect)")
+    args = parser.parse_args()
+
+    child = None
+    if args.connect:
+        host, port = parse_address(args.connect)
+        admin_token = load_token(args.token_file or default_admin_token_path())
+        station_key = load_token(args.key_file or default_station_key_path())
+    else:
+        admin_token = secrets.token_urlsafe(32)
+        station_key = secrets.token_urlsafe(32)
+        parent_conn, child_conn = multiprocessing.Pipe()
+        child = multiprocessing.Process(target=run_coordinator, args=(child_conn, admin_token, station_key),
+                                        daemon=True)
+        child.start()
+        host, port = '127.0.0.1', parent_conn.recv()
+
+    started = time.perf_counter()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    latencies, failures = loop.run_until_complete(run(args, host, port, admin_token, station_key))
+    wall = time.perf_counter() - started
+
+    print(f"stations={args.stations} per_connection={args.per_connection} "
+          f"heartbeat={args.heartbeat}s commands={args.commands} failures={failures}")
+    if latencies:
+        print("command round trip (admin -> coordinator -> station -> back): "
+              f"p50 {percentile(latencies, 0.5) * 1000:.2f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, "
+              f"max {max(latencies) * 1000:.2f} ms")
+    if child is not None:
+        parent_conn.send('stop')
+        cpu, known = parent_conn.recv()
+        child.join(5)
+        print(f"coordinator: {known} stations seen, {cpu:.2f} s CPU over {wall:.1f} s "
+              f"({100 * cpu / wall:.1f}% of one core)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Days of station use in minutes: memory, widget and timer leak check
+
+Drives thousands of shop cycles through the real FullscreenTimerApp on
+the virtual-clock harness: top-ups from the main window and the lock
+screen, packages, member sign-ins, Settings, Pause/Resume, wrong PINs,
+config edits, every warning, expiry, the lock screen and its shutdown
+countdown. Every --every cycles it records traced Python memory
+(tracemalloc), process RSS, live Tk widgets, pending after() callbacks
+and (with --tk) Tk images.
+
+After a warm-up, any of them staying above its first-half peak (plus a
+slack) all through the last quarter of the run counts as unbounded
+growth: the run fails and the allocation sites that grew most are
+printed.
+
+    python benchmarks/soak.py [--cycles 2000] [--seed 1]
+    xvfb-run python benchmarks/soak.py --tk
+
+--tk uses real Tk widgets with only after() on the virtual clock; without
+it the Tk stand-in is used and no display is needed.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from collections import namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import Simulation  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEMBER = 'SOAK'
+PACKAGE = "30 MIN"
+
+Sample = namedtuple('Sample', 'cycle traced rss widgets after_ids images')
+# Metric, how it is shown, and the command line option giving its slack
+CHECKS = (
+    ('traced', "traced KiB", 'traced_slack'),
+    ('rss', "RSS KiB", 'rss_slack'),
+    ('widgets', "Tk widgets", 'count_slack'),
+    ('after_ids', "after() ids", 'count_slack'),
+    ('images', "Tk images", 'count_slack'),
+)
+
+
+def rss_kib():
+    """Resident set size of this process, where /proc has it"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def count_widgets(widget):
+    return sum(1 + count_widgets(child) for child in widget.winfo_children())
+
+
+def measure(sim, cycle):
+    gc.collect()
+    root = sim.app.main_window
+    after_ids = sim.loop.pending
+    images = None
+    if sim.real_tk:
+        # Anything scheduled around the virtual loop would show up here
+        after_ids += len(root.tk.splitlist(root.tk.call('after', 'info')))
+        images = len(root.image_names())
+    return Sample(cycle, tracemalloc.get_traced_memory()[0] // 1024, rss_kib(), count_widgets(root),
+                  after_ids, images)
+
+
+def write_config(sim, price):
+    sim.write_config({"pin": "062100!", "packages": [{"label": PACKAGE, "minutes": 30, "price": price}]})
+
+
+def run_cycle(sim, rng, cycle):
+    """One customer: top up, maybe fiddle with the menus, run out, sit on the lock screen"""
+    app = sim.app
+    minutes = rng.randint(2, 12)
+    locked = app.lock_screen.visible
+    window = app.lock_screen.window if locked else None
+    roll = rng.random()
+    if roll < 0.1:
+        sim.buy_package(PACKAGE, window)
+    elif roll < 0.2:
+        app.member_store().credit(MEMBER, minutes * 60)
+        sim.sign_in_member(MEMBER, window)
+    elif locked:
+        sim.extend_from_lock_screen(minutes=minutes)
+    else:
+        sim.add_time(minutes=minutes)
+
+    sim.advance(rng.uniform(10, 60))
+    roll = rng.random()
+    if roll < 0.15:
+        sim.settings("Close")
+    elif roll < 0.25:
+        sim.settings("👤 Sign Out" if app.member_id else "⏸ Pause")
+        sim.advance(rng.uniform(5, 120))
+        if app.paused_remaining is not None:
+            sim.settings("▶ Resume")
+    elif roll < 0.3:
+        sim.click("➕ Add Time")
+        sim.enter_pin("0000")
+        sim.click("Cancel")
+    if cycle % 100 == 50:
+        # A config edit relabels the package button on the next open
+        write_config(sim, rng.choice((600, 800)))
+
+    # Warnings, expiry, then the attendant may or may not beat the countdown
+    while app.timer_running:
+        sim.advance(60)
+    sim.advance(rng.uniform(0, 45))
+
+    # The harness's own logs would grow forever; the app's state must not
+    del sim.events[:]
+    del sim.loop.late[:]
+    del sim.dialogs.shown[:]
+
+
+def grows(samples, metric, slack):
+    """Whether the last quarter of the samples stays above the first half's peak plus `slack`
+
+    Comparing a floor with a peak keeps noise (a toast still up, a tick
+    pending) from looking like growth; a real leak lifts the floor.
+    """
+    values = [getattr(sample, metric) for sample in samples]
+    if None in values or len(values) < 4:
+        return False
+    return min(values[-(len(values) // 4):]) > max(values[:len(values) // 2]) + slack
+
+
+def top_growth(baseline, snapshot, limit):
+    """The allocation sites that grew most since `baseline`"""
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+              tracemalloc.Filter(False, '<unknown>'))
+    stats = snapshot.filter_traces(ignore).compare_to(baseline.filter_traces(ignore), 'lineno')
+    return [stat for stat in stats if stat.size_diff > 0][:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--every', type=int, default=0, help="cycles between samples (default: cycles / 20)")
+    parser.add_argument('--warmup', type=int, default=0, help="cycles before the baseline (default: cycles / 10)")
+    parser.add_argument('--tk', action='store_true', help="real Tk widgets (needs a display, e.g. xvfb-run)")
+    parser.add_argument('--traced-slack', type=int, default=256, help="KiB of traced memory noise allowed")
+    parser.add_argument('--rss-slack', type=int, default=8192, help="KiB of RSS noise allowed")
+    parser.add_argument('--count-slack', type=int, default=0, help="widgets, after() ids and images allowed")
+    parser.add_argument('--top', type=int, default=10, help="allocation sites to list")
+    args = parser.parse_args()
+    every = args.every or max(1, args.cycles // 20)
+    warmup = args.warmup or max(1, args.cycles // 10)
+    rng = random.Random(args.seed)
+
+    tracemalloc.start()
+    samples = []
+    with Simulation(real_tk=args.tk) as sim:
+        write_config(sim, 600)
+        sim.advance(6)
+        sim.app.member_store().create(MEMBER, "Soak test")
+        for cycle in range(1, args.cycles + 1):
+            run_cycle(sim, rng, cycle)
+            if cycle == warmup:
+                baseline = tracemalloc.take_snapshot()
+            if cycle > warmup and (cycle - warmup) % every == 0:
+                samples.append(measure(sim, cycle))
+        snapshot = tracemalloc.take_snapshot()
+        hours = sim.elapsed / 3600
+    tracemalloc.stop()
+
+    print(f"{args.cycles} cycles ({hours:.0f} simulated hours), {'Tk' if args.tk else 'Tk stand-in'}, "
+          f"seed {args.seed}")
+    print(f"{'cycle':>7}" + ''.join(f"{label:>14}" for _, label, _ in CHECKS))
+    for sample in samples:
+        print(f"{sample.cycle:>7}" + ''.join(
+            f"{'-' if getattr(sample, metric) is None else getattr(sample, metric):>14}"
+            for metric, _, _ in CHECKS))
+
+    leaks = [label for metric, label, slack in CHECKS if grows(samples, metric, getattr(args, slack))]
+    print()
+    print("unbounded growth: " + (', '.join(leaks) if leaks else "none"))
+    print(f"top allocation sites since cycle {warmup}:")
+    for stat in top_growth(baseline, snapshot, args.top):
+        frame = stat.traceback[0]
+        print(f"  {stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+8d} blocks  "
+              f"{os.path.relpath(frame.filename, ROOT)}:{frame.lineno}")
+    return 1 if leaks else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
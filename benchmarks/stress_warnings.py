@@ -0,0 +1,121 @@
+"""Warning delivery under random event-loop stalls
+
+Runs many simulated sessions of random length on the virtual-clock harness
+while random stalls block the loop (as a PIN dialog, a fade or a slow
+handler would), then checks that every threshold a session crosses is
+announced exactly once and reports how late. For comparison it also counts
+how many of those crossings the old one-second window check
+(threshold - 1 < remaining <= threshold) would have missed on the same ticks.
+
+    python benchmarks/stress_warnings.py [--sessions 500] [--seed 1]
+        [--stall-every 20] [--max-stall 8]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import Simulation  # noqa: E402
+from warning_schedule import DEFAULT_WARNINGS  # noqa: E402
+
+MESSAGES = {warning.message: warning.seconds for warning in DEFAULT_WARNINGS}
+
+
+def inject_stalls(sim, rng, every, max_stall):
+    """Keep one stall pending at a random time; each blocks the loop for a random while"""
+    def stall():
+        sim.loop.stall(rng.uniform(0, max_stall))
+        sim.loop.after(int(rng.expovariate(1 / every) * 1000), stall)
+    sim.loop.after(int(rng.expovariate(1 / every) * 1000), stall)
+
+
+def record_ticks(sim):
+    """Log the remaining time each check_schedule pass saw"""
+    ticks = []
+    app = sim.app
+    check = app.ticker.callback
+
+    def logged():
+        ticks.append(app.engine.remaining(app.session_id))
+        check()
+    app.ticker.callback = logged
+    return ticks
+
+
+def run_session(sim, rng, ticks):
+    """One top-up played to expiry; returns (crossings, announcements, legacy hits)"""
+    minutes = rng.randint(1, 30)
+    seconds = minutes * 60
+    del ticks[:]
+    first_event = len(sim.events)
+    if not sim.app.lock_screen.visible:
+        sim.add_time(minutes=minutes)
+    else:
+        sim.extend_from_lock_screen(minutes=minutes)
+    start = sim.elapsed
+    # Expiry is only noticed by a tick, which a stall can hold up
+    while sim.app.timer_running:
+        sim.advance(60)
+    crossings = {t: start + seconds - t for t in MESSAGES.values() if t < seconds}
+
+    announced = {}
+    for at, kind, detail in sim.events[first_event:]:
+        if kind == 'notification' and detail in MESSAGES:
+            announced.setdefault(MESSAGES[detail], []).append(at - sim.started)
+    legacy = {t for t in crossings
+              if any(r is not None and t - 1 < r <= t for r in ticks)}
+    # The attendant takes a while to get to the lock screen
+    sim.advance(rng.uniform(0, 20))
+    return crossings, announced, legacy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--stall-every', type=float, default=20.0, help="mean seconds between stalls")
+    parser.add_argument('--max-stall', type=float, default=8.0, help="longest stall in seconds")
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    crossed = once = duplicates = missed = legacy_hits = 0
+    lateness = []
+    with Simulation() as sim:
+        inject_stalls(sim, rng, args.stall_every, args.max_stall)
+        ticks = record_ticks(sim)
+        for _ in range(args.sessions):
+            crossings, announced, legacy = run_session(sim, rng, ticks)
+            legacy_hits += len(legacy)
+            for threshold, due in crossings.items():
+                crossed += 1
+                times = announced.get(threshold, [])
+                if not times:
+                    missed += 1
+                    continue
+                if len(times) == 1:
+                    once += 1
+                else:
+                    duplicates += 1
+                lateness.append(max(0.0, times[0] - due))
+        stalls = len(sim.loop.late)
+
+    lateness.sort()
+    print(f"{args.sessions} sessions, {stalls} late callbacks from stalls up to {args.max_stall:.0f} s "
+          f"every ~{args.stall_every:.0f} s")
+    print(f"threshold crossings    {crossed}")
+    print(f"announced once         {once}")
+    print(f"announced twice+       {duplicates}")
+    print(f"missed                 {missed}")
+    if lateness:
+        p99 = lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))]
+        print(f"lateness               p50 {lateness[len(lateness) // 2]:.2f} s   "
+              f"p99 {p99:.2f} s   max {lateness[-1]:.2f} s")
+    print(f"old window check would have fired {legacy_hits} of {crossed} "
+          f"({crossed - legacy_hits} missed)")
+    return 1 if missed or duplicates else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Shop settings the timer reads from a JSON file and reloads while running
+
+    {
+        "pin_hash": "pbkdf2_sha256$600000$...$...",
+        "warning_minutes": 5,
+        "shutdown_seconds": 30,
+        "centavos_per_minute": 20,
+        "custom_time": ["minutes", "seconds"],
+        "packages": [
+            {"label": "30 MIN", "minutes": 30},
+            {"label": "1 HOUR", "minutes": 60, "price": 1000}
+        ],
+        "warnings": [{"minutes": 10}, {"minutes": 5}, {"minutes": 1}]
+    }
+
+Every key is optional. "warning_minutes" (or "warning_seconds") is when
+the clock turns to its warning color; "warnings" is a warning schedule in
+the format of warning_schedule.py; "custom_time" picks which of the Custom
+Minutes / Custom Seconds buttons the Add Time menu shows; a package's
+price is in centavos and defaults to the per-minute rate. "pin_hash" is
+written by `python pin_service.py set-pin`; a plain "pin" is still read
+(and hashed on load) when there is no hash.
+
+The file is parsed once into an immutable Config. ConfigSource re-reads
+it only when its modification time or size changes, which costs one
+stat() per check, and keeps the last good Config if an edit is broken.
+"""
+import json
+import os
+from collections import namedtuple
+
+from ledger import CENTAVOS_PER_MINUTE, MAX_PRICE, MAX_SECONDS, price_for_seconds
+from paths import config_dir
+from pin_service import parse_pin_hash
+from warning_schedule import DEFAULT_WARNINGS, parse_warnings
+
+CHECK_INTERVAL_MS = 5000
+CUSTOM_TIME = ('minutes', 'seconds')
+
+Package = namedtuple('Package', 'label seconds price')
+
+Config = namedtuple('Config', 'pin pin_hash warning_seconds shutdown_seconds centavos_per_minute '
+                              'custom_time packages warnings')
+
+DEFAULT_CONFIG = Config(
+    pin="062100!",
+    pin_hash=None,
+    warning_seconds=300,
+    shutdown_seconds=30,
+    centavos_per_minute=CENTAVOS_PER_MINUTE,
+    custom_time=CUSTOM_TIME,
+    packages=(),
+    warnings=DEFAULT_WARNINGS,
+)
+
+
+def default_config_path():
+    """Per-user location of the config file"""
+    return os.path.join(config_dir(), 'config.json')
+
+
+def _seconds(entry, prefix, what):
+    """Whole seconds from entry[prefix + 'seconds'] or entry[prefix + 'minutes']"""
+    try:
+        if prefix + 'seconds' in entry:
+            seconds = int(entry[prefix + 'seconds'])
+        else:
+            seconds = int(entry[prefix + 'minutes']) * 60
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"{what}: needs a whole number of minutes or seconds")
+    if seconds < 1:
+        raise ValueError(f"{what}: must be at least one second")
+    return seconds
+
+
+def parse_packages(entries, centavos_per_minute):
+    packages = []
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"package {number}: expected an object")
+        seconds = _seconds(entry, '', f"package {number}")
+        if seconds > MAX_SECONDS:
+            raise ValueError(f"package {number}: can be at most {MAX_SECONDS} seconds")
+        try:
+            price = int(entry.get('price', price_for_seconds(seconds, centavos_per_minute)))
+        except (TypeError, ValueError):
+            raise ValueError(f"package {number}: price must be a whole number of centavos")
+        if not 0 <= price <= MAX_PRICE:
+            raise ValueError(f"package {number}: price must be 0 to {MAX_PRICE} centavos")
+        label = str(entry.get('label') or f"{seconds // 60} MIN")
+        packages.append(Package(label, seconds, price))
+    return tuple(packages)
+
+
+def parse_config(settings):
+    """Build a Config from a dict, defaults for anything missing
+
+    Raises ValueError describing the first bad setting.
+    """
+    if not isinstance(settings, dict):
+        raise ValueError("config must be a JSON object")
+    config = DEFAULT_CONFIG
+    changes = {}
+    if 'pin' in settings:
+        if not isinstance(settings['pin'], str) or not settings['pin']:
+            raise ValueError("pin must be a non-empty string")
+        changes['pin'] = settings['pin']
+    if 'pin_hash' in settings:
+        parse_pin_hash(settings['pin_hash'])
+        changes['pin_hash'] = settings['pin_hash']
+    if 'warning_seconds' in settings or 'warning_minutes' in settings:
+        changes['warning_seconds'] = _seconds(settings, 'warning_', "warning time")
+    if 'shutdown_seconds' in settings:
+        changes['shutdown_seconds'] = _seconds(settings, 'shutdown_', "shutdown countdown")
+    if 'centavos_per_minute' in settings:
+        rate = settings['centavos_per_minute']
+        if not isinstance(rate, int) or rate < 0:
+            raise ValueError("centavos_per_minute must be a whole number")
+        changes['centavos_per_minute'] = rate
+    if 'custom_time' in settings:
+        custom = settings['custom_time']
+        if not isinstance(custom, list) or any(kind not in CUSTOM_TIME for kind in custom):
+            raise ValueError(f"custom_time must be a list of {', '.join(CUSTOM_TIME)}")
+        changes['custom_time'] = tuple(kind for kind in CUSTOM_TIME if kind in custom)
+    if 'packages' in settings:
+        if not isinstance(settings['packages'], list):
+            raise ValueError("packages must be a JSON list")
+        changes['packages'] = parse_packages(
+            settings['packages'], changes.get('centavos_per_minute', config.centavos_per_minute))
+    if 'warnings' in settings:
+        if not isinstance(settings['warnings'], list):
+            raise ValueError("warnings must be a JSON list")
+        changes['warnings'] = parse_warnings(settings['warnings'])
+    return config._replace(**changes)
+
+
+def load_config(path):
+    """Read a Config from a JSON file"""
+    with open(path, encoding='utf-8') as f:
+        return parse_config(json.load(f))
+
+
+class ConfigSource:
+    """The current Config of a file, re-read only when the file changes
+
+    A missing file means the defaults; a file that fails to parse keeps
+    whatever Config was in effect before it.
+    """
+
+    def __init__(self, path, on_error=print):
+        self.path = path
+        self.on_error = on_error
+        self.signature = None
+        self.config = DEFAULT_CONFIG
+        self.error = None
+        self.reloads = 0
+        self.check()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def check(self):
+        """Reload if the file changed; returns the new Config, or None if nothing changed"""
+        signature = self._stat()
+        if signature == self.signature:
+            return None
+        self.signature = signature
+        if signature is None:
+            config = DEFAULT_CONFIG
+        else:
+            try:
+                config = load_config(self.path)
+            except (OSError, ValueError) as e:
+                self.error = str(e)
+                self.on_error(f"Config error in {self.path}: {e}; keeping the current settings")
+                return None
+        self.error = None
+        if config == self.config:
+            return None
+        self.config = config
+        self.reloads += 1
+        return config
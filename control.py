@@ -0,0 +1,307 @@
+"""Local control socket for topping up stations from a POS or a script
+
+A station started with --control serves this on a Unix socket or a TCP
+port from an asyncio thread beside the Tk loop; commands are handed to
+the Tk thread through TkDispatcher's queue, a whole batch in one hop.
+The coordinator can serve it too (fleet.py coordinator --control), in
+which case each command names the station it is for.
+
+The wire format is one JSON object per line, like fleet.py's; a
+connection may send any number of requests:
+
+    {"token":"...","n":1,"op":"add","s":1800}
+    {"token":"...","n":2,"batch":[{"op":"extend","s":900,"id":"PC01"},{"op":"status"}]}
+    -> {"n":2,"ok":true,"results":[{"ok":true},{"ok":true,"remaining":1712.4,"locked":0}]}
+
+add starts a fresh session of "s" seconds (what the Add Time button
+does), extend adds to the running one, reset and lock end it and bring up
+the lock screen, status reports the time left. Every request carries the
+token from the station's token file, which is created on first use and
+readable only by its owner.
+
+    python control.py --address 127.0.0.1:8766 add 1800
+    python control.py --address /run/timer/control.sock status
+    python control.py --address 127.0.0.1:8767 batch topups.json
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+
+from fleet import encode, load_token, token_matches
+from journal import MAX_SECONDS
+from paths import data_dir
+
+DEFAULT_CONTROL_PORT = 8766
+OPS = ('add', 'extend', 'reset', 'lock', 'status')
+MAX_BATCH = 256
+MAX_LINE = 1 << 20
+
+
+def default_token_path():
+    """Per-user location of the control token"""
+    return os.path.join(data_dir(), 'control.token')
+
+
+def parse_control_address(address):
+    """('unix', path) for a socket path, else ('tcp', host, port); host defaults to loopback
+
+    Raises ValueError for a port out of range, or a path where there are
+    no Unix sockets (Windows before AF_UNIX support in Python).
+    """
+    if '/' in address or '\\' in address or address.endswith('.sock'):
+        if not hasattr(socket, 'AF_UNIX') or not hasattr(asyncio, 'start_unix_server'):
+            raise ValueError(f"{address}: Unix sockets are not available here; use HOST:PORT")
+        return ('unix', address)
+    host, _, port = address.rpartition(':')
+    port = int(port or DEFAULT_CONTROL_PORT)
+    if not 0 <= port <= 65535:
+        raise ValueError(f"port {port} is out of range")
+    return ('tcp', host or '127.0.0.1', port)
+
+
+def check_command(command):
+    """Raise ValueError unless `command` is a well-formed control command"""
+    if not isinstance(command, dict):
+        raise ValueError("command must be an object")
+    op = command.get('op')
+    if op not in OPS:
+        raise ValueError(f"unknown op {op!r}")
+    if op in ('add', 'extend'):
+        seconds = command.get('s')
+        if not isinstance(seconds, int) or not 1 <= seconds <= MAX_SECONDS:
+            raise ValueError(f"{op} needs a whole number of seconds 's' from 1 to {MAX_SECONDS}")
+
+
+class ControlServer:
+    """Serves the control protocol and runs requests through `execute`
+
+    `execute(commands)` takes a list of checked commands and returns an
+    awaitable, or a concurrent.futures.Future (such as TkDispatcher.call
+    gives), of one result dict per command.
+    """
+
+    def __init__(self, execute, token, address):
+        self.execute = execute
+        self.token = token.encode()
+        self.address = parse_control_address(address)
+        self.server = None
+        self.loop = None
+        self.thread = None
+        self.requests = 0
+        self.rejected = 0
+
+    async def start(self):
+        if self.address[0] == 'unix':
+            path = self.address[1]
+            # A socket left behind by a crash would make the bind fail
+            if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)
+            self.server = await asyncio.start_unix_server(self._handle, path, limit=MAX_LINE)
+            os.chmod(path, 0o600)
+        else:
+            _, host, port = self.address
+            self.server = await asyncio.start_server(self._handle, host, port, limit=MAX_LINE)
+        return self.server
+
+    def start_thread(self):
+        """Serve from a background thread with its own event loop; raises if it cannot listen"""
+        started = threading.Event()
+        failure = []
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.loop.run_until_complete(self.start())
+            except Exception as e:
+                # Whatever went wrong is raised again in the caller
+                failure.append(e)
+                self.loop.close()
+                return
+            finally:
+                started.set()
+            try:
+                self.loop.run_forever()
+            finally:
+                self.loop.close()
+
+        self.thread = threading.Thread(target=run, name='control', daemon=True)
+        self.thread.start()
+        started.wait()
+        if failure:
+            raise failure[0]
+
+    def close(self):
+        if self.server is None:
+            return
+        if self.thread is not None and self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._shutdown)
+            self.thread.join(1.0)
+        else:
+            self.server.close()
+        if self.address[0] == 'unix' and os.path.exists(self.address[1]):
+            os.unlink(self.address[1])
+
+    def _shutdown(self):
+        self.server.close()
+        self.loop.stop()
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self._request(line)
+                writer.write(encode(reply))
+                if reply.get('error') == "bad token":
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _request(self, line):
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError
+        except ValueError:
+            return {'ok': False, 'error': "not a JSON object"}
+        reply = {'n': message.get('n')}
+        if not token_matches(message.get('token'), self.token):
+            self.rejected += 1
+            reply.update(ok=False, error="bad token")
+            return reply
+        commands = message['batch'] if 'batch' in message else [message]
+        try:
+            if not isinstance(commands, list) or not 0 < len(commands) <= MAX_BATCH:
+                raise ValueError(f"batch must be a list of 1 to {MAX_BATCH} commands")
+            for command in commands:
+                check_command(command)
+        except ValueError as e:
+            reply.update(ok=False, error=str(e))
+            return reply
+        self.requests += 1
+        try:
+            results = self.execute(commands)
+            if isinstance(results, concurrent.futures.Future):
+                results = asyncio.wrap_future(results)
+            results = await results
+        except Exception as e:
+            reply.update(ok=False, error=str(e))
+            return reply
+        reply.update(ok=all(result.get('ok') for result in results), results=results)
+        return reply
+
+
+class CoordinatorControl:
+    """Control commands routed to stations through a fleet Coordinator"""
+
+    def __init__(self, coordinator):
+        self.coordinator = coordinator
+
+    async def __call__(self, commands):
+        return list(await asyncio.gather(*(self._run(command) for command in commands)))
+
+    async def _run(self, command):
+        op = command['op']
+        if op == 'status':
+            return {'ok': True, 'stations': self.coordinator.status()}
+        station_id = command.get('id')
+        if not isinstance(station_id, str):
+            return {'ok': False, 'error': f"{op} needs a station 'id'"}
+        # Stations only know add (which extends) and reset/lock
+        ok = await self.coordinator.command(station_id, 'add' if op in ('add', 'extend') else op,
+                                            command.get('s', 0))
+        return {'ok': ok} if ok else {'ok': False, 'error': f"{station_id} is not connected or did not acknowledge"}
+
+
+class ControlConnection:
+    """A client connection that can send many requests"""
+
+    def __init__(self, reader, writer, token):
+        self.reader = reader
+        self.writer = writer
+        self.token = token
+        self.sent = 0
+
+    @classmethod
+    async def open(cls, address, token):
+        kind, *where = parse_control_address(address)
+        if kind == 'unix':
+            reader, writer = await asyncio.open_unix_connection(where[0], limit=MAX_LINE)
+        else:
+            reader, writer = await asyncio.open_connection(*where, limit=MAX_LINE)
+        return cls(reader, writer, token)
+
+    async def request(self, message):
+        """Send one command or {'batch': [...]} and return the reply"""
+        self.sent += 1
+        self.writer.write(encode(dict(message, token=self.token, n=self.sent)))
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("control socket closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.writer.close()
+
+
+async def control_request(address, token, message):
+    """Send one request on a fresh connection and return the reply"""
+    connection = await ControlConnection.open(address, token)
+    try:
+        return await connection.request(message)
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send commands to a timer's control socket")
+    parser.add_argument('--address', default=f"127.0.0.1:{DEFAULT_CONTROL_PORT}",
+                        help="HOST:PORT or socket path (default: %(default)s)")
+    parser.add_argument('--token-file', default=None, help="control token (default: per-user data dir)")
+    parser.add_argument('--id', help="station id, when talking to a coordinator")
+    parser.add_argument('op', choices=OPS + ('batch',))
+    parser.add_argument('arg', nargs='?', help="seconds for add/extend, JSON file (or -) for batch")
+    args = parser.parse_args(argv)
+
+    try:
+        token = load_token(args.token_file or default_token_path())
+    except OSError as e:
+        print(f"Cannot read the control token: {e}")
+        return 2
+    if args.op == 'batch':
+        source = sys.stdin if args.arg in (None, '-') else open(args.arg, encoding='utf-8')
+        with source:
+            message = {'batch': json.load(source)}
+    else:
+        message = {'op': args.op}
+        if args.arg is not None:
+            message['s'] = int(args.arg)
+        if args.id:
+            message['id'] = args.id
+
+    loop = asyncio.get_event_loop()
+    try:
+        reply = loop.run_until_complete(control_request(args.address, token, message))
+    except OSError as e:
+        print(f"Cannot reach {args.address}: {e}")
+        return 2
+    print(json.dumps(reply, indent=2))
+    return 0 if reply.get('ok') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
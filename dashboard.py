@@ -0,0 +1,322 @@
+"""Whole-floor view of every station's time on one Tk Canvas
+
+Each station is a tile of four canvas items (background, name, clock and
+status) created once and reused; a single after() tick redraws once a
+second and only re-configures items whose text or color changed, the same
+diffing DisplayBinder does for the timer's own screen. Tiles are only
+re-laid out when stations join or leave or the window is resized.
+
+    python dashboard.py --coordinator 192.168.1.10:8765 --token-file fleet-admin.token
+    python dashboard.py --synthetic 300
+
+A tile turns to its warning color at the shop config's warning time
+(config.py), read from --config or the per-user config file.
+
+Data comes from a feed with a poll() method returning rows in the
+coordinator's status format ([station id, remaining or -1, locked, seconds
+since heartbeat]): CoordinatorFeed polls a running coordinator from a
+background thread; SyntheticFeed makes up a busy shop for benchmarks.
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+import threading
+import time
+import tkinter as tk
+
+from config import ConfigSource, default_config_path
+from fleet import (DEFAULT_PORT, HEARTBEAT_INTERVAL, Coordinator, admin_request, default_admin_token_path,
+                   load_token, parse_address)
+from viewmodel import ADDED_COLOR, EXPIRED_COLOR, IDLE_COLOR, WARNING_COLOR, format_clock
+
+REDRAW_MS = 1000
+OFFLINE_AFTER = 3 * HEARTBEAT_INTERVAL
+OFFLINE_COLOR = '#444444'
+TILE_COLOR = '#2d2d2d'
+TILE_GAP = 4
+
+
+def tile_state(remaining, locked, age, warning_seconds):
+    """(clock text, status text, status color) for one station"""
+    if age > OFFLINE_AFTER:
+        return ("--:--", "OFFLINE", OFFLINE_COLOR)
+    if locked:
+        return ("00:00", "LOCKED", EXPIRED_COLOR)
+    if remaining < 0:
+        return ("00:00", "Ready", IDLE_COLOR)
+    if remaining > warning_seconds:
+        return (format_clock(remaining), "Running", ADDED_COLOR)
+    if remaining > 0:
+        return (format_clock(remaining), "Almost done", WARNING_COLOR)
+    return ("00:00", "TIME'S UP", EXPIRED_COLOR)
+
+
+class Tile:
+    """Canvas items for one station and the state they currently show"""
+
+    __slots__ = ('background', 'name', 'clock', 'status', 'state')
+
+    def __init__(self, canvas, station_id):
+        self.background = canvas.create_rectangle(0, 0, 0, 0, fill=TILE_COLOR, outline='')
+        self.name = canvas.create_text(0, 0, text=station_id, fill='white', anchor='n')
+        self.clock = canvas.create_text(0, 0, text="", fill='white')
+        self.status = canvas.create_text(0, 0, text="", anchor='s')
+        self.state = None
+
+    def delete(self, canvas):
+        canvas.delete(self.background, self.name, self.clock, self.status)
+
+
+class Dashboard:
+    """Tiles for every station in a feed, redrawn once a second"""
+
+    def __init__(self, root, feed, warning_seconds, redraw_ms=REDRAW_MS):
+        self.root = root
+        self.feed = feed
+        self.warning_seconds = warning_seconds
+        self.redraw_ms = redraw_ms
+        self.canvas = tk.Canvas(root, bg='black', highlightthickness=0)
+        self.canvas.pack(expand=True, fill='both')
+        self.canvas.bind('<Configure>', self.on_resize)
+        self.tiles = {}
+        self.order = []
+        self.size = None
+        self.redraw_id = None
+        self.redraws = 0
+        self.item_updates = 0
+        self.last_redraw_ms = 0.0
+        self.max_redraw_ms = 0.0
+
+    def start(self):
+        self.redraw()
+
+    def stop(self):
+        if self.redraw_id is not None:
+            self.root.after_cancel(self.redraw_id)
+            self.redraw_id = None
+
+    def redraw(self):
+        """Poll the feed, update what changed and schedule the next second"""
+        started = time.perf_counter()
+        self.apply(self.feed.poll())
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.redraws += 1
+        self.last_redraw_ms = elapsed_ms
+        self.max_redraw_ms = max(self.max_redraw_ms, elapsed_ms)
+        self.redraw_id = self.root.after(max(1, int(self.redraw_ms - elapsed_ms)), self.redraw)
+
+    def apply(self, rows):
+        """Bring the canvas in line with status rows; returns the item updates made"""
+        station_ids = [row[0] for row in rows]
+        if station_ids != self.order:
+            self._layout(station_ids)
+        canvas = self.canvas
+        updates = 0
+        for station_id, remaining, locked, age in rows:
+            tile = self.tiles[station_id]
+            state = tile_state(remaining, locked, age, self.warning_seconds)
+            previous = tile.state
+            if previous == state:
+                continue
+            if previous is None or state[0] != previous[0]:
+                canvas.itemconfigure(tile.clock, text=state[0])
+                updates += 1
+            if previous is None or state[1:] != previous[1:]:
+                canvas.itemconfigure(tile.status, text=state[1], fill=state[2])
+                updates += 1
+            tile.state = state
+        self.item_updates += updates
+        return updates
+
+    def on_resize(self, event):
+        if (event.width, event.height) != self.size:
+            self._layout(self.order)
+
+    def _layout(self, station_ids):
+        canvas = self.canvas
+        for station_id in set(self.tiles) - set(station_ids):
+            self.tiles.pop(station_id).delete(canvas)
+        for station_id in station_ids:
+            if station_id not in self.tiles:
+                self.tiles[station_id] = Tile(canvas, station_id)
+        self.order = list(station_ids)
+
+        width = max(canvas.winfo_width(), 1)
+        height = max(canvas.winfo_height(), 1)
+        self.size = (width, height)
+        if not station_ids:
+            return
+        # Columns so tiles come out about twice as wide as they are tall
+        columns = max(1, min(len(station_ids), round(math.sqrt(len(station_ids) * width / (2 * height)))))
+        rows = math.ceil(len(station_ids) / columns)
+        tile_width = width / columns
+        tile_height = height / rows
+        name_font = ('Arial', max(6, int(tile_height * 0.14)), 'bold')
+        clock_font = ('Arial', max(8, int(tile_height * 0.3)), 'bold')
+        status_font = ('Arial', max(6, int(tile_height * 0.13)))
+        for index, station_id in enumerate(station_ids):
+            tile = self.tiles[station_id]
+            row, column = divmod(index, columns)
+            x0 = column * tile_width + TILE_GAP / 2
+            y0 = row * tile_height + TILE_GAP / 2
+            x1 = x0 + tile_width - TILE_GAP
+            y1 = y0 + tile_height - TILE_GAP
+            middle = (x0 + x1) / 2
+            canvas.coords(tile.background, x0, y0, x1, y1)
+            canvas.coords(tile.name, middle, y0 + 2)
+            canvas.itemconfigure(tile.name, font=name_font)
+            canvas.coords(tile.clock, middle, (y0 + y1) / 2)
+            canvas.itemconfigure(tile.clock, font=clock_font)
+            canvas.coords(tile.status, middle, y1 - 2)
+            canvas.itemconfigure(tile.status, font=status_font)
+
+
+class CoordinatorFeed:
+    """Polls a coordinator's status from a background thread
+
+    poll() returns the latest reply with remaining times and heartbeat ages
+    moved on by the time since it arrived, so clocks count down smoothly
+    between replies.
+    """
+
+    def __init__(self, host, port, token, interval=REDRAW_MS / 1000, clock=time.monotonic):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.interval = interval
+        self.clock = clock
+        self.snapshot = ([], clock())
+        self.error = None
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='dashboard-feed', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def poll(self):
+        rows, received = self.snapshot
+        elapsed = self.clock() - received
+        return [
+            [station_id, remaining if remaining < 0 else max(0.0, remaining - elapsed), locked, age + elapsed]
+            for station_id, remaining, locked, age in rows
+        ]
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        try:
+            while self.running:
+                try:
+                    reply = loop.run_until_complete(
+                        admin_request(self.host, self.port, self.token, {'op': 'status'}))
+                    if reply.get('ok'):
+                        self.snapshot = (reply.get('stations', []), self.clock())
+                        self.error = None
+                    else:
+                        self.error = reply.get('error', "status refused")
+                except (OSError, ValueError) as e:
+                    self.error = str(e)
+                time.sleep(self.interval)
+        finally:
+            loop.close()
+
+
+class SyntheticFeed:
+    """A made-up busy shop, fed through a real Coordinator, for benchmarks
+
+    Every poll a few stations get topped up, run out, get locked or stop
+    sending heartbeats, and the rest report their time as usual.
+    """
+
+    def __init__(self, count, seed=1, clock=time.monotonic, churn=0.02):
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.churn = churn
+        self.coordinator = Coordinator(clock=clock)
+        self.deadlines = {}
+        self.offline = set()
+        self.station_ids = [f"PC{number:03d}" for number in range(1, count + 1)]
+        for station_id in self.station_ids:
+            self._change(station_id)
+        self._heartbeat()
+
+    def poll(self):
+        for station_id in self.rng.sample(self.station_ids, max(1, int(len(self.station_ids) * self.churn))):
+            self._change(station_id)
+        self._heartbeat()
+        return self.coordinator.status()
+
+    def _change(self, station_id):
+        roll = self.rng.random()
+        self.offline.discard(station_id)
+        if roll < 0.6:
+            self.deadlines[station_id] = self.clock() + self.rng.uniform(10, 7200)
+        elif roll < 0.8:
+            self.deadlines[station_id] = None
+        elif roll < 0.95:
+            self.deadlines[station_id] = self.clock()
+        else:
+            self.offline.add(station_id)
+
+    def _heartbeat(self):
+        now = self.clock()
+        entries = []
+        for station_id in self.station_ids:
+            if station_id in self.offline:
+                continue
+            deadline = self.deadlines[station_id]
+            if deadline is None:
+                entries.append([station_id, -1, 0])
+            else:
+                remaining = max(0.0, deadline - now)
+                entries.append([station_id, remaining, int(remaining <= 0)])
+        self.coordinator._on_heartbeat(entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard of every station's time")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--coordinator', metavar='HOST:PORT', help="coordinator to show")
+    source.add_argument('--synthetic', type=int, metavar='N', help="show N made-up stations")
+    parser.add_argument('--token-file', metavar='PATH',
+                        help="the coordinator's admin token (default: per-user data dir)")
+    parser.add_argument('--config', metavar='PATH',
+                        help="shop config to take the warning time from (default: per-user config dir)")
+    parser.add_argument('--windowed', action='store_true', help="start in a window, not fullscreen")
+    args = parser.parse_args(argv)
+    warning_seconds = ConfigSource(args.config or default_config_path()).config.warning_seconds
+
+    if args.coordinator:
+        host, port = parse_address(args.coordinator, DEFAULT_PORT)
+        try:
+            token = load_token(args.token_file or default_admin_token_path())
+        except OSError as e:
+            print(f"Cannot read the admin token: {e}")
+            return 2
+        feed = CoordinatorFeed(host, port, token)
+        feed.start()
+    else:
+        feed = SyntheticFeed(args.synthetic)
+
+    root = tk.Tk()
+    root.title("⏱️ Timer Dashboard")
+    root.configure(bg='black')
+    if args.windowed:
+        root.geometry("1280x720")
+    else:
+        root.attributes('-fullscreen', True)
+    root.bind('<Escape>', lambda e: root.attributes('-fullscreen', False))
+    dashboard = Dashboard(root, feed, warning_seconds)
+    dashboard.start()
+    root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
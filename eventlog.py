@@ -0,0 +1,290 @@
+"""Structured event log, written in the background to rotating gzip files
+
+The app calls emit(kind, **fields) from the Tk thread (or any other);
+that only appends a tuple to a deque, which needs no lock of our own, so
+logging never waits on the disk. A writer thread wakes every
+FLUSH_INTERVAL seconds, encodes whatever has queued up as JSON lines and
+appends the batch to the active file in one write:
+
+    events/
+        current.jsonl                       the file being written
+        events-20261018-040000.250Z.jsonl.gz
+                                            rotated archives, named after
+                                            their first event (UTC)
+
+Once the active file passes ROTATE_BYTES it is gzipped into an archive
+and a new one is started; only the newest KEEP_ARCHIVES archives are kept.
+A file left behind by a crash is archived on the next start.
+
+    python eventlog.py query --kind warning --kind timeout --since 2026-10-01
+    python eventlog.py query --station PC01 --json
+"""
+import argparse
+import calendar
+import collections
+import datetime
+import gzip
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+from paths import data_dir
+
+FLUSH_INTERVAL = 0.5
+ROTATE_BYTES = 4 << 20
+KEEP_ARCHIVES = 64
+CURRENT = 'current.jsonl'
+ARCHIVE_PREFIX = 'events-'
+ARCHIVE_SUFFIX = '.jsonl.gz'
+ARCHIVE_TIME = '%Y%m%d-%H%M%S'
+
+# Event kinds
+STARTUP = 'startup'
+START = 'start'
+EXTEND = 'extend'
+RESET = 'reset'
+PAUSE = 'pause'
+RESUME = 'resume'
+WARNING = 'warning'
+TIMEOUT = 'timeout'
+LOCK = 'lock'
+SHUTDOWN = 'shutdown'
+PIN_FAILED = 'pin-failed'
+ERROR = 'error'
+
+
+def default_event_dir():
+    """Per-user location of the event log"""
+    return os.path.join(data_dir(), 'events')
+
+
+def archive_name(first_ts):
+    seconds, millis = divmod(int(first_ts * 1000), 1000)
+    return f"{ARCHIVE_PREFIX}{time.strftime(ARCHIVE_TIME, time.gmtime(seconds))}.{millis:03d}Z{ARCHIVE_SUFFIX}"
+
+
+def archive_time(name):
+    """Time of an archive's first event, from its name"""
+    stamp, _, millis = name[len(ARCHIVE_PREFIX):-len(ARCHIVE_SUFFIX)].rstrip('Z').partition('.')
+    return calendar.timegm(time.strptime(stamp, ARCHIVE_TIME)) + int(millis or 0) / 1000
+
+
+def list_archives(directory):
+    """Archive file names, oldest first"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names if name.startswith(ARCHIVE_PREFIX) and name.endswith(ARCHIVE_SUFFIX))
+
+
+class EventLog:
+    """Queues events on any thread; one writer thread batches them to disk"""
+
+    def __init__(self, directory, station=None, clock=time.time, rotate_bytes=ROTATE_BYTES,
+                 keep=KEEP_ARCHIVES, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.station = station
+        self.clock = clock
+        self.rotate_bytes = rotate_bytes
+        self.keep = keep
+        self.flush_interval = flush_interval
+        self.queue = collections.deque()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.file = None
+        self.size = 0
+        self.first_ts = None
+        self.written = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+
+    def emit(self, kind, **fields):
+        """Queue one event; cheap enough for the Tk thread"""
+        self.queue.append((self.clock(), kind, fields))
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name='event-log', daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Write out what is queued and stop the writer"""
+        if self.thread is not None:
+            self.stopping.set()
+            self.thread.join(5.0)
+            self.thread = None
+        else:
+            self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def _run(self):
+        # A file left by a crash is archived before anything new is written
+        if os.path.exists(os.path.join(self.directory, CURRENT)):
+            try:
+                self._rotate()
+            except OSError as e:
+                self.errors += 1
+                print(f"Event log error: {e}")
+        while not self.stopping.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Encode and append everything queued so far (writer thread, or after close)"""
+        queue = self.queue
+        lines = []
+        while queue:
+            ts, kind, fields = queue.popleft()
+            record = {'ts': round(ts, 3), 'kind': kind}
+            if self.station is not None:
+                record['station'] = self.station
+            record.update(fields)
+            lines.append(json.dumps(record, separators=(',', ':'), ensure_ascii=False, default=str))
+            if self.first_ts is None:
+                self.first_ts = ts
+        if not lines:
+            return
+        data = ('\n'.join(lines) + '\n').encode('utf-8')
+        try:
+            if self.file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self.file = open(os.path.join(self.directory, CURRENT), 'ab')
+                self.size = self.file.tell()
+            self.file.write(data)
+            self.file.flush()
+            self.size += len(data)
+            self.written += len(lines)
+            self.batches += 1
+            if self.size >= self.rotate_bytes:
+                self._rotate()
+        except OSError as e:
+            # Diagnostics must never take the station down; the batch is lost
+            self.errors += 1
+            print(f"Event log error: {e}")
+
+    def _rotate(self):
+        """Gzip the active file into an archive and drop the oldest archives"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        path = os.path.join(self.directory, CURRENT)
+        first_ts = self.first_ts if self.first_ts is not None else first_event_time(path)
+        name = archive_name(first_ts)
+        while os.path.exists(os.path.join(self.directory, name)):
+            # Names must stay unique and in order
+            first_ts += 0.001
+            name = archive_name(first_ts)
+        tmp_path = os.path.join(self.directory, name + '.tmp')
+        with open(path, 'rb') as source, gzip.open(tmp_path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        os.remove(path)
+        self.size = 0
+        self.first_ts = None
+        self.rotations += 1
+        for old in list_archives(self.directory)[:-self.keep]:
+            os.remove(os.path.join(self.directory, old))
+
+
+def first_event_time(path):
+    """Timestamp of the first readable event in a plain log file, else its mtime"""
+    try:
+        with open(path, 'rb') as f:
+            return json.loads(f.readline())['ts']
+    except (ValueError, KeyError, TypeError):
+        return os.path.getmtime(path)
+
+
+def read_lines(path):
+    """Lines of a log file, gzipped or not; a truncated tail is skipped"""
+    opener = gzip.open if path.endswith('.gz') else open
+    try:
+        with opener(path, 'rb') as f:
+            for line in f:
+                yield line
+    except (EOFError, OSError):
+        pass
+
+
+def read_events(directory, since=None, until=None):
+    """Stream events (dicts) oldest first, skipping archives outside [since, until]"""
+    archives = list_archives(directory)
+    starts = [archive_time(name) for name in archives]
+    paths = []
+    for index, name in enumerate(archives):
+        # An archive ends before the next one starts
+        end = starts[index + 1] if index + 1 < len(starts) else None
+        if since is not None and end is not None and end < since:
+            continue
+        if until is not None and starts[index] > until:
+            continue
+        paths.append(os.path.join(directory, name))
+    paths.append(os.path.join(directory, CURRENT))
+    for path in paths:
+        for line in read_lines(path):
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            ts = event.get('ts', 0)
+            if (since is None or ts >= since) and (until is None or ts <= until):
+                yield event
+
+
+def parse_time(value):
+    """Local YYYY-MM-DD or YYYY-MM-DD HH:MM as a POSIX timestamp"""
+    for pattern in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.datetime.strptime(value, pattern).timestamp()
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD or 'YYYY-MM-DD HH:MM', got {value!r}")
+
+
+def format_event(event):
+    when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event.get('ts', 0)))
+    details = ' '.join(f"{key}={value}" for key, value in event.items() if key not in ('ts', 'kind', 'station'))
+    return f"{when}  {event.get('station', '-'):<10}{event.get('kind', '?'):<12}{details}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Timer event log")
+    parser.add_argument('--dir', default=default_event_dir(), help="event log directory")
+    sub = parser.add_subparsers(dest='action')
+    sub.required = True
+    query = sub.add_parser('query', help="print matching events, oldest first")
+    query.add_argument('--kind', action='append', help="event kind (repeatable)")
+    query.add_argument('--station')
+    query.add_argument('--since', type=parse_time, help="YYYY-MM-DD[ HH:MM], local time")
+    query.add_argument('--until', type=parse_time, help="YYYY-MM-DD[ HH:MM], local time")
+    query.add_argument('--limit', type=int, help="stop after this many events")
+    query.add_argument('--json', action='store_true', help="print raw JSON lines")
+    args = parser.parse_args(argv)
+
+    kinds = set(args.kind or ())
+    shown = 0
+    try:
+        for event in read_events(args.dir, args.since, args.until):
+            if kinds and event.get('kind') not in kinds:
+                continue
+            if args.station and event.get('station') != args.station:
+                continue
+            print(json.dumps(event, ensure_ascii=False) if args.json else format_event(event))
+            shown += 1
+            if args.limit and shown >= args.limit:
+                break
+    except BrokenPipeError:
+        # Piped into head
+        sys.stderr.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,550 @@
+"""Fleet coordinator and station client for running many timers from one place
+
+Stations (FullscreenTimerApp started with --coordinator) keep a TCP
+connection to the coordinator and send compact heartbeats; the coordinator
+keeps every station's deadline and pushes add-time, reset and lock commands.
+
+The wire format is one compact JSON object per line:
+
+    station -> coordinator   {"t":"hello","ids":["PC01"],"key":"..."}
+                             {"t":"hb","s":[["PC01",1499.2,0]]}   id, remaining (-1 idle), locked
+                             {"t":"ack","n":7,"ok":true}
+                             {"t":"topup","id":"PC01","r":[[1790000000,1500,500]]}   ts, seconds, centavos
+    coordinator -> station   {"t":"cmd","n":7,"id":"PC01","op":"add","s":900}
+    coordinator -> station   {"t":"err","error":"PC01 is already connected"}   then it hangs up
+    admin -> coordinator     {"t":"admin","n":1,"token":"...","op":"add","id":"PC01","s":900}
+    coordinator -> admin     {"t":"res","n":1,"ok":true}
+
+A single connection may announce several station ids, so gateways and the
+load generator can batch heartbeats for many stations into one line.
+
+Two secrets keep the shop LAN out: admin requests carry the admin token
+and a hello carries the station key, each from a file the coordinator
+creates on first start (per-user data dir, readable only by its owner).
+Copy the station key to every station (timer.py --fleet-key-file); the
+admin token stays on the coordinator's machine, so a station PC holds
+nothing that can add time. Until a connection's hello is accepted its
+heartbeats, top-ups and acks are ignored; it may only report for the
+ids it claimed, and an id a live station already holds is refused.
+
+    python fleet.py coordinator --port 8765 --ledger /srv/timer-ledger
+    python fleet.py send PC01 add 900
+    python fleet.py status
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import hmac
+import itertools
+import json
+import math
+import os
+import secrets
+import sys
+import threading
+import time
+
+from journal import MAX_SECONDS
+from paths import data_dir
+from session_engine import SessionEngine
+
+DEFAULT_PORT = 8765
+HEARTBEAT_INTERVAL = 5.0
+COMMAND_TIMEOUT = 2.0
+COMMANDS = ('add', 'reset', 'lock')
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 30.0
+# A station id whose holder has been silent this long may be claimed again
+# (its old connection is probably half-open after a network drop)
+CLAIM_STALE_AFTER = 3 * HEARTBEAT_INTERVAL
+
+
+def encode(message):
+    """Serialize one protocol message as a compact JSON line"""
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode()
+
+
+def default_admin_token_path():
+    """Per-user location of the coordinator's admin token"""
+    return os.path.join(data_dir(), 'fleet-admin.token')
+
+
+def default_station_key_path():
+    """Per-user location of the key stations present in their hello"""
+    return os.path.join(data_dir(), 'fleet-station.key')
+
+
+def load_token(path, create=False):
+    """Read a token file, making a new random token if asked and there is none"""
+    try:
+        with open(path, encoding='ascii') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        if not create:
+            raise
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='ascii') as f:
+        f.write(token + '\n')
+    return token
+
+
+def token_matches(offered, expected):
+    """Constant-time check of a token from the wire; no expected token means no access"""
+    return (expected is not None and isinstance(offered, str)
+            and hmac.compare_digest(offered.encode(), expected))
+
+
+def parse_address(address, default_port=DEFAULT_PORT):
+    """Split "host:port" (port optional) into a tuple"""
+    host, _, port = address.rpartition(':')
+    if not host:
+        return port, default_port
+    return host, int(port)
+
+
+class _Peer:
+    """One connection to the coordinator"""
+
+    __slots__ = ('writer', 'station_ids', 'accepted')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.station_ids = set()
+        self.accepted = False
+
+    def send(self, message):
+        self.writer.write(encode(message))
+
+
+class Coordinator:
+    """Holds every station's deadline and routes commands to stations
+
+    Admin requests must carry `admin_token` and station hellos
+    `station_key`; with either left as None that side is shut out.
+    """
+
+    def __init__(self, clock=time.monotonic, ledger=None, admin_token=None, station_key=None):
+        self.clock = clock
+        self.ledger = ledger
+        self.admin_token = admin_token.encode() if admin_token is not None else None
+        self.station_key = station_key.encode() if station_key is not None else None
+        self.engine = SessionEngine(clock=clock)
+        self.routes = {}
+        self.last_seen = {}
+        self.locked = set()
+        self.server = None
+        # seq -> (peer the command went to, future of its ack)
+        self._pending = {}
+        self._seq = itertools.count(1)
+        self.rejected = 0
+        # Messages, heartbeat entries and top-up rows dropped as malformed
+        self.malformed = 0
+
+    async def start(self, host='0.0.0.0', port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def command(self, station_id, op, seconds=0, timeout=COMMAND_TIMEOUT):
+        """Send a command to a station and wait for its acknowledgement"""
+        if op not in COMMANDS:
+            raise ValueError(f"Unknown command: {op}")
+        if op == 'add' and not 1 <= seconds <= MAX_SECONDS:
+            raise ValueError(f"add needs 1 to {MAX_SECONDS} seconds")
+        peer = self.routes.get(station_id)
+        if peer is None:
+            return False
+        seq = next(self._seq)
+        future = asyncio.get_event_loop().create_future()
+        self._pending[seq] = (peer, future)
+        peer.send({'t': 'cmd', 'n': seq, 'id': station_id, 'op': op, 's': seconds})
+        try:
+            ok = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._pending.pop(seq, None)
+        if ok:
+            self._apply(station_id, op, seconds)
+        return ok
+
+    def status(self):
+        """Rows of [station id, remaining or -1, locked, seconds since heartbeat]"""
+        now = self.clock()
+        rows = []
+        for station_id in sorted(self.last_seen):
+            remaining = self.engine.remaining(station_id, now)
+            rows.append([
+                station_id,
+                -1 if remaining is None else round(remaining, 1),
+                int(station_id in self.locked),
+                round(now - self.last_seen[station_id], 1),
+            ])
+        return rows
+
+    def _apply(self, station_id, op, seconds):
+        if op == 'add':
+            self.engine.extend(station_id, seconds)
+            self.locked.discard(station_id)
+        else:
+            self.engine.reset(station_id)
+            self.locked.add(station_id)
+
+    def _valid_heartbeats(self, entries, station_ids):
+        """(station id, remaining, locked) for the well-formed entries about `station_ids`"""
+        valid = []
+        for entry in entries if isinstance(entries, list) else ():
+            try:
+                station_id, remaining, locked = entry
+                remaining = float(remaining)
+            except (TypeError, ValueError):
+                self.malformed += 1
+                continue
+            if not isinstance(station_id, str) or not math.isfinite(remaining):
+                self.malformed += 1
+            elif station_id in station_ids:
+                valid.append((station_id, remaining, bool(locked)))
+        return valid
+
+    def _on_heartbeat(self, entries):
+        now = self.clock()
+        for station_id, remaining, locked in entries:
+            self.last_seen[station_id] = now
+            if remaining < 0:
+                self.engine.reset(station_id)
+            else:
+                known = self.engine.remaining(station_id, now)
+                # Only move the deadline when the station disagrees by more
+                # than heartbeat rounding, to keep the heap quiet.
+                if known is None or abs(known - remaining) > 1.0:
+                    self.engine.start(station_id, remaining)
+            if locked:
+                self.locked.add(station_id)
+            else:
+                self.locked.discard(station_id)
+
+    def _on_topup(self, station_id, rows):
+        """Book top-ups reported by a station in the central ledger"""
+        if self.ledger is None:
+            return
+        for row in rows if isinstance(rows, list) else ():
+            try:
+                timestamp, seconds, price = row
+                self.ledger.record(station_id, int(seconds), int(price), float(timestamp))
+            except (TypeError, ValueError):
+                # The ledger checks every value before buffering any of them
+                self.malformed += 1
+        self.ledger.flush()
+
+    def _on_hello(self, peer, message):
+        """Route the claimed station ids to `peer`; False if the hello is refused"""
+        if not token_matches(message.get('key'), self.station_key):
+            peer.send({'t': 'err', 'error': "bad station key"})
+            return False
+        station_ids = message.get('ids')
+        if not isinstance(station_ids, list) or not all(isinstance(sid, str) for sid in station_ids):
+            peer.send({'t': 'err', 'error': "ids must be a list of station ids"})
+            return False
+        now = self.clock()
+        for station_id in station_ids:
+            holder = self.routes.get(station_id)
+            if (holder is not None and holder is not peer
+                    and now - self.last_seen.get(station_id, now) < CLAIM_STALE_AFTER):
+                peer.send({'t': 'err', 'error': f"{station_id} is already connected"})
+                return False
+        for station_id in station_ids:
+            holder = self.routes.get(station_id)
+            if holder is not None and holder is not peer:
+                # Silent for too long; its connection is dead in all but name
+                holder.station_ids.discard(station_id)
+            self.routes[station_id] = peer
+            peer.station_ids.add(station_id)
+            # The claim counts as the first sign of life
+            self.last_seen.setdefault(station_id, now)
+        peer.accepted = True
+        return True
+
+    async def _on_admin(self, peer, message):
+        reply = {'t': 'res', 'n': message.get('n')}
+        if not token_matches(message.get('token'), self.admin_token):
+            self.rejected += 1
+            reply.update(ok=False, error="bad token")
+            peer.send(reply)
+            return
+        op = message.get('op')
+        try:
+            if op == 'status':
+                reply['ok'] = True
+                reply['stations'] = self.status()
+            else:
+                reply['ok'] = await self.command(message['id'], op, int(message.get('s', 0)))
+        except (KeyError, TypeError, ValueError) as e:
+            reply['ok'] = False
+            reply['error'] = str(e)
+        peer.send(reply)
+
+    async def _handle(self, reader, writer):
+        peer = _Peer(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    kind = message['t']
+                except (ValueError, KeyError, TypeError):
+                    continue
+                try:
+                    if kind == 'admin':
+                        asyncio.ensure_future(self._on_admin(peer, message))
+                    elif kind == 'hello':
+                        if not self._on_hello(peer, message):
+                            self.rejected += 1
+                            break
+                    elif not peer.accepted:
+                        # Nothing else is taken from a connection without a valid hello
+                        continue
+                    elif kind == 'hb':
+                        self._on_heartbeat(self._valid_heartbeats(message['s'], peer.station_ids))
+                    elif kind == 'ack':
+                        sender, future = self._pending.get(message.get('n'), (None, None))
+                        if sender is peer and not future.done():
+                            future.set_result(bool(message.get('ok')))
+                    elif kind == 'topup':
+                        station_id = message['id']
+                        if isinstance(station_id, str) and station_id in peer.station_ids:
+                            self._on_topup(station_id, message['r'])
+                except Exception:
+                    # One bad message must not end the station's session
+                    self.malformed += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for station_id in peer.station_ids:
+                if self.routes.get(station_id) is peer:
+                    del self.routes[station_id]
+            writer.close()
+
+
+class StationClient:
+    """Keeps one station connected to the coordinator from a background thread
+
+    `on_command(op, seconds)` is called on the client thread and may return
+    a bool or a concurrent.futures.Future resolving to one (for example from
+    TkDispatcher.call), which becomes the acknowledgement. `key` is the
+    coordinator's station key.
+    """
+
+    def __init__(self, station_id, host, port, on_command, key,
+                 heartbeat_interval=HEARTBEAT_INTERVAL, clock=time.monotonic):
+        self.station_id = station_id
+        self.host = host
+        self.port = port
+        self.on_command = on_command
+        self.key = key
+        self.heartbeat_interval = heartbeat_interval
+        self.clock = clock
+        self.deadline = None
+        self.locked = False
+        self.topups = collections.deque()
+        self.loop = None
+        self.thread = None
+        self._changed = None
+        self._task = None
+
+    def update(self, deadline, locked):
+        """Publish the station's state; safe to call from any thread"""
+        if deadline == self.deadline and locked == self.locked:
+            return
+        self.deadline = deadline
+        self.locked = locked
+        if self.loop is not None and self._changed is not None:
+            self.loop.call_soon_threadsafe(self._changed.set)
+
+    def report_topup(self, seconds, price):
+        """Queue a top-up for the coordinator's ledger; safe to call from any thread"""
+        self.topups.append([int(time.time()), seconds, price])
+        if self.loop is not None and self._changed is not None:
+            self.loop.call_soon_threadsafe(self._changed.set)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='fleet-client', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.loop is not None and self._task is not None:
+            self.loop.call_soon_threadsafe(self._task.cancel)
+
+    def heartbeat(self):
+        deadline = self.deadline
+        remaining = -1 if deadline is None else round(max(0.0, deadline - self.clock()), 1)
+        return {'t': 'hb', 's': [[self.station_id, remaining, int(self.locked)]]}
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._changed = asyncio.Event()
+        self._task = self.loop.create_task(self._main())
+        try:
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass  # stopped by stop()
+        finally:
+            self.loop.close()
+
+    async def _main(self):
+        delay = RECONNECT_MIN
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+                continue
+            delay = RECONNECT_MIN
+            sender = asyncio.ensure_future(self._send_heartbeats(writer))
+            try:
+                await self._read_commands(reader, writer)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                sender.cancel()
+                writer.close()
+                try:
+                    await sender
+                except asyncio.CancelledError:
+                    pass
+
+    async def _send_heartbeats(self, writer):
+        writer.write(encode({'t': 'hello', 'ids': [self.station_id], 'key': self.key}))
+        while True:
+            writer.write(encode(self.heartbeat()))
+            if self.topups:
+                rows = []
+                while self.topups:
+                    rows.append(self.topups.popleft())
+                writer.write(encode({'t': 'topup', 'id': self.station_id, 'r': rows}))
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.heartbeat_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _read_commands(self, reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get('t') == 'err':
+                print(f"Coordinator refused {self.station_id}: {message.get('error')}")
+                continue
+            if message.get('t') != 'cmd':
+                continue
+            try:
+                result = self.on_command(message['op'], int(message.get('s', 0)))
+                if isinstance(result, concurrent.futures.Future):
+                    result = await asyncio.wrap_future(result)
+                ok = bool(result)
+            except Exception:
+                ok = False
+            writer.write(encode({'t': 'ack', 'n': message['n'], 'ok': ok}))
+
+
+async def admin_request(host, port, token, message):
+    """Send one admin request to the coordinator and return its reply"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(encode(dict(message, t='admin', n=1, token=token)))
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Timer fleet coordinator")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--token-file', metavar='PATH',
+                        help="admin token, created by the coordinator if missing (default: per-user data dir)")
+    sub = parser.add_subparsers(dest='action')
+    sub.required = True
+    serve = sub.add_parser('coordinator', help="run the coordinator")
+    serve.add_argument('--ledger', metavar='DIR', help="book station top-ups in this ledger")
+    serve.add_argument('--station-key-file', metavar='PATH',
+                       help="key stations must present, created if missing (default: per-user data dir)")
+    serve.add_argument('--control', metavar='ADDRESS',
+                       help="also serve the control socket (control.py) on HOST:PORT or a socket path")
+    serve.add_argument('--control-token-file', metavar='PATH',
+                       help="control token, created if missing (default: per-user data dir)")
+    send = sub.add_parser('send', help="send a command to a station")
+    send.add_argument('station')
+    send.add_argument('op', choices=COMMANDS)
+    send.add_argument('seconds', nargs='?', type=int, default=0)
+    sub.add_parser('status', help="list stations known to the coordinator")
+    args = parser.parse_args(argv)
+
+    loop = asyncio.get_event_loop()
+    if args.action == 'coordinator':
+        ledger = None
+        if args.ledger:
+            from ledger import Ledger
+            ledger = Ledger(args.ledger)
+        station_key_path = args.station_key_file or default_station_key_path()
+        coordinator = Coordinator(
+            ledger=ledger,
+            admin_token=load_token(args.token_file or default_admin_token_path(), create=True),
+            station_key=load_token(station_key_path, create=True)
+        )
+        loop.run_until_complete(coordinator.start(args.host, args.port))
+        print(f"Coordinator listening on {args.host}:{coordinator.port}; station key in {station_key_path}")
+        control = None
+        if args.control:
+            from control import ControlServer, CoordinatorControl, default_token_path
+            token = load_token(args.control_token_file or default_token_path(), create=True)
+            control = ControlServer(CoordinatorControl(coordinator), token, args.control)
+            loop.run_until_complete(control.start())
+            print(f"Control socket on {args.control}")
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            coordinator.close()
+            if control is not None:
+                control.close()
+        return 0
+
+    try:
+        token = load_token(args.token_file or default_admin_token_path())
+    except OSError as e:
+        print(f"Cannot read the admin token: {e}")
+        return 2
+    if args.action == 'send':
+        message = {'op': args.op, 'id': args.station, 's': args.seconds}
+    else:
+        message = {'op': 'status'}
+    reply = loop.run_until_complete(admin_request(args.host, args.port, token, message))
+    if args.action == 'status':
+        for station_id, remaining, locked, age in reply.get('stations', []):
+            state = "locked" if locked else ("idle" if remaining < 0 else f"{int(remaining)}s left")
+            print(f"{station_id:<16}{state:<16}seen {age}s ago")
+    else:
+        print("OK" if reply.get('ok') else f"FAILED {reply.get('error', '')}".strip())
+    return 0 if reply.get('ok') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
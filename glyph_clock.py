@@ -0,0 +1,95 @@
+"""The big clock as one Arial text item per character on a fixed-size Canvas
+
+An 80 pt Label in a proportional font changes width as the digits change,
+and every change makes pack re-lay out the whole screen. Here the clock
+keeps the Label's typeface but puts each character in its own canvas text
+item, centred in a cell as wide as the widest digit: a tick re-texts only
+the characters that changed, usually just the last digit, and the canvas
+never changes size.
+"""
+import tkinter as tk
+import tkinter.font  # noqa: F401  (makes tk.font available)
+
+FONT = ('Arial', 80, 'bold')
+DIGITS = '0123456789'
+# Widest text the canvas is sized for up front
+WIDEST = '00:00:00'
+
+
+class GlyphClock:
+    """Clock text in fixed-width cells; one canvas text item per character
+
+    Takes config(text=..., fg=...) like the Label it replaces, so
+    DisplayBinder drives it unchanged.
+    """
+
+    def __init__(self, master, font=FONT, color='white', bg='black'):
+        metrics = tk.font.Font(root=master, font=font)
+        self.font = font
+        self.color = color
+        self.digit_width = max(metrics.measure(digit) for digit in DIGITS)
+        self.colon_width = metrics.measure(':')
+        self.height = metrics.metrics('linespace')
+        self.width = self.text_width(WIDEST)
+        self.canvas = tk.Canvas(master, width=self.width, height=self.height, bg=bg, highlightthickness=0)
+        self.items = []
+        self.text = None
+        self.swaps = 0
+        self.layouts = 0
+
+    def cell_width(self, char):
+        return self.colon_width if char == ':' else self.digit_width
+
+    def text_width(self, text):
+        return sum(self.cell_width(char) for char in text)
+
+    def pack(self, **options):
+        self.canvas.pack(**options)
+
+    def config(self, text=None, fg=None, **options):
+        if fg is not None and fg != self.color:
+            self.color = fg
+            for item in self.items:
+                self.canvas.itemconfigure(item, fill=fg)
+        if text is not None:
+            self.show(text)
+        if options:
+            self.canvas.config(**options)
+
+    configure = config
+
+    def show(self, text):
+        """Draw `text`; returns how many characters were redrawn"""
+        previous = self.text
+        if previous is None or len(text) != len(previous) or \
+                any((new == ':') != (old == ':') for new, old in zip(text, previous)):
+            self._layout(text)
+            return len(text)
+        canvas = self.canvas
+        swapped = 0
+        for item, new, old in zip(self.items, text, previous):
+            if new != old:
+                canvas.itemconfigure(item, text=new)
+                swapped += 1
+        self.text = text
+        self.swaps += swapped
+        return swapped
+
+    def _layout(self, text):
+        """Place one text item per character, centred; only when the shape changes"""
+        canvas = self.canvas
+        if self.items:
+            canvas.delete(*self.items)
+        total = self.text_width(text)
+        if total > self.width:
+            self.width = total
+            canvas.config(width=total)
+        x = (self.width - total) // 2
+        self.items = []
+        for char in text:
+            cell = self.cell_width(char)
+            self.items.append(canvas.create_text(x + cell // 2, 0, text=char, font=self.font,
+                                                 fill=self.color, anchor='n'))
+            x += cell
+        self.text = text
+        self.layouts += 1
@@ -0,0 +1,184 @@
+"""Append-only session journal so a crash or power cut does not lose paid time
+
+Every start, extend, reset and expiry is appended as a fixed-size binary
+record carrying the session's wall-clock deadline *after* the operation,
+so recovery only ever needs the last intact record: it is read from the
+tail of the file in constant time, however long the journal has grown.
+Records are written in batches and fsynced together, and the file is
+periodically compacted down to a single snapshot record.
+"""
+import os
+import struct
+import time
+import zlib
+
+from paths import data_dir
+
+START = 1
+EXTEND = 2
+RESET = 3
+EXPIRE = 4
+SNAPSHOT = 5
+# The clock was paused; `deadline` holds the exact seconds banked
+PAUSE = 6
+RUNNING_OPS = (START, EXTEND, SNAPSHOT)
+
+VERSION = 1
+# op, version, reserved, seconds, written at, deadline, total seconds, crc32
+RECORD = struct.Struct('<BBHIddII')
+PAYLOAD_SIZE = RECORD.size - 4
+# seconds and total are uint32, so no grant or session may be longer
+MAX_SECONDS = 2 ** 32 - 1
+
+BATCH_SIZE = 64
+COMPACT_AFTER = 100000
+
+
+def default_journal_path():
+    """Per-user location of the session journal"""
+    return os.path.join(data_dir(), 'session.journal')
+
+
+def pack_record(op, seconds=0, written_at=0.0, deadline=0.0, total=0):
+    """Encode one journal record, checksum included"""
+    payload = RECORD.pack(op, VERSION, 0, int(seconds), written_at, deadline, int(total), 0)[:PAYLOAD_SIZE]
+    return payload + struct.pack('<I', zlib.crc32(payload))
+
+
+def unpack_record(data):
+    """Decode one record, or return None if it is torn or corrupt"""
+    if len(data) != RECORD.size:
+        return None
+    op, version, _, seconds, written_at, deadline, total, crc = RECORD.unpack(data)
+    if version != VERSION or crc != zlib.crc32(data[:PAYLOAD_SIZE]):
+        return None
+    return JournalRecord(op, seconds, written_at, deadline, total)
+
+
+class JournalRecord:
+    """One decoded journal entry"""
+
+    __slots__ = ('op', 'seconds', 'written_at', 'deadline', 'total')
+
+    def __init__(self, op, seconds, written_at, deadline, total):
+        self.op = op
+        self.seconds = seconds
+        self.written_at = written_at
+        self.deadline = deadline
+        self.total = total
+
+    @property
+    def running(self):
+        return self.op in RUNNING_OPS
+
+    @property
+    def banked(self):
+        """Seconds left on a paused session, or None"""
+        return self.deadline if self.op == PAUSE else None
+
+    def remaining(self, now=None):
+        """Seconds left according to this record, never more than when it was written
+
+        Capping at the time left when the record was written means setting
+        the system clock back while the timer was down cannot add minutes.
+        """
+        if not self.running:
+            return None
+        if now is None:
+            now = time.time()
+        return max(0.0, min(self.deadline - now, self.deadline - self.written_at))
+
+
+def last_record(path):
+    """The newest intact record in a journal, or None"""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        # A torn final write leaves a partial record; skip it and walk back
+        offset = (size // RECORD.size) * RECORD.size
+        while offset > 0:
+            offset -= RECORD.size
+            f.seek(offset)
+            record = unpack_record(f.read(RECORD.size))
+            if record is not None:
+                return record
+    return None
+
+
+def replay(path):
+    """Yield every intact record in order (for inspection and benchmarks)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    usable = len(data) - len(data) % RECORD.size
+    view = memoryview(data)[:usable]
+    for offset in range(0, usable, RECORD.size):
+        record = unpack_record(view[offset:offset + RECORD.size])
+        if record is not None:
+            yield record
+
+
+class SessionJournal:
+    """Buffered writer for the session journal"""
+
+    def __init__(self, path, batch_size=BATCH_SIZE, compact_after=COMPACT_AFTER, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.batch_size = batch_size
+        self.compact_after = compact_after
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.latest = last_record(path)
+        self.file = open(path, 'ab')
+        size = self.file.tell()
+        if size % RECORD.size:
+            # Drop a torn final write so new records stay aligned
+            self.file.truncate(size - size % RECORD.size)
+        self.records = size // RECORD.size
+        self.pending = []
+
+    def append(self, op, seconds=0, deadline=0.0, total=0):
+        """Buffer a record; it is written and fsynced with the next batch"""
+        written_at = self.clock()
+        self.pending.append(pack_record(op, seconds, written_at, deadline, total))
+        self.latest = JournalRecord(op, int(seconds), written_at, deadline, int(total))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records and fsync them as one batch"""
+        if not self.pending:
+            return
+        self._write_pending()
+        os.fsync(self.file.fileno())
+        if self.records >= self.compact_after:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal as a single record holding the current state"""
+        self._write_pending()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            record = self.latest
+            if record is not None and record.running:
+                f.write(pack_record(SNAPSHOT, 0, record.written_at, record.deadline, record.total))
+            elif record is not None and record.op == PAUSE:
+                f.write(pack_record(PAUSE, record.seconds, record.written_at, record.deadline, record.total))
+            f.flush()
+            os.fsync(f.fileno())
+        self.file.close()
+        os.replace(tmp_path, self.path)
+        self.file = open(self.path, 'ab')
+        self.records = self.file.tell() // RECORD.size
+
+    def _write_pending(self):
+        if self.pending:
+            self.file.write(b''.join(self.pending))
+            self.file.flush()
+            self.records += len(self.pending)
+            self.pending = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
@@ -0,0 +1,291 @@
+"""Keyboard lockdown that only hooks the keyboard while the station is locked
+
+The suppression hooks (Windows keys, Alt+Tab, Ctrl+Esc, Alt+F4) are
+installed when the lock screen or the idle fullscreen lockdown comes up
+and removed again as soon as time is running, so keystrokes during a paid
+session do not go through Python hook code.
+
+Hooks go through a backend. WindowsHookBackend sets a low-level keyboard
+hook with SetWindowsHookExW when the first suppression is added and takes
+it out with UnhookWindowsHookEx when the last one goes, so during a
+session Windows does not call into Python at all. KeyboardLibBackend uses
+the `keyboard` package (imported on first use) where there is no
+Windows hook API; its listener stays once started, so there removing the
+hooks only empties its dispatch tables. FakeKeyboardBackend is an
+in-process stand-in fed with press(), for tests and benchmarks on
+machines where global hooks are unavailable.
+"""
+import sys
+
+BLOCKED_KEYS = ('windows', 'windows left', 'windows right')
+SUPPRESSED_HOTKEYS = ('alt+tab', 'ctrl+esc', 'alt+f4')
+
+# Virtual-key codes of the keys the suppressions name; left and right
+# modifiers are told apart by the low-level hook and mean the same here
+VIRTUAL_KEYS = {
+    'windows': (0x5B, 0x5C),
+    'windows left': (0x5B,),
+    'windows right': (0x5C,),
+    'alt': (0x12, 0xA4, 0xA5),
+    'ctrl': (0x11, 0xA2, 0xA3),
+    'tab': (0x09,),
+    'esc': (0x1B,),
+    'f4': (0x73,),
+}
+KEY_NAMES = {code: name for name, codes in VIRTUAL_KEYS.items() if not name.startswith('windows')
+             for code in codes}
+
+
+class WindowsHookBackend:
+    """A WH_KEYBOARD_LL hook that only exists while something is suppressed
+
+    The hook runs on the thread that set it, inside its message loop; the
+    Tk thread's mainloop is one, so the policy is applied from there.
+    """
+
+    WH_KEYBOARD_LL = 13
+    HC_ACTION = 0
+    # WM_KEYDOWN and WM_SYSKEYDOWN (Alt held)
+    KEY_DOWN = (0x0100, 0x0104)
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class KBDLLHOOKSTRUCT(ctypes.Structure):
+            _fields_ = [('vkCode', wintypes.DWORD), ('scanCode', wintypes.DWORD), ('flags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+        self.ctypes = ctypes
+        self.event_struct = KBDLLHOOKSTRUCT
+        self.event_pointer = ctypes.POINTER(KBDLLHOOKSTRUCT)
+        hook_proc = ctypes.WINFUNCTYPE(wintypes.LPARAM, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        self.user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self.user32.SetWindowsHookExW.argtypes = (ctypes.c_int, hook_proc, wintypes.HINSTANCE, wintypes.DWORD)
+        self.user32.SetWindowsHookExW.restype = wintypes.HHOOK
+        self.user32.UnhookWindowsHookEx.argtypes = (wintypes.HHOOK,)
+        self.user32.UnhookWindowsHookEx.restype = wintypes.BOOL
+        self.user32.CallNextHookEx.argtypes = (wintypes.HHOOK, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        self.user32.CallNextHookEx.restype = wintypes.LPARAM
+        kernel32 = ctypes.WinDLL('kernel32')
+        # Without a restype the HMODULE comes back as an int and loses its
+        # upper half on 64-bit Python
+        kernel32.GetModuleHandleW.argtypes = (wintypes.LPCWSTR,)
+        kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+        self.module = kernel32.GetModuleHandleW(None)
+        # Kept referenced for as long as Windows may call it
+        self.proc = hook_proc(self.hook_event)
+        self.hook = None
+        self.blocked = {}
+        self.hotkeys = {}
+        self.pressed = set()
+
+    def block_key(self, key):
+        for code in VIRTUAL_KEYS[key]:
+            self.blocked[code] = self.blocked.get(code, 0) + 1
+        self._hook()
+        return ('key', key)
+
+    def suppress_hotkey(self, hotkey):
+        combo = frozenset(hotkey.split('+'))
+        self.hotkeys[combo] = self.hotkeys.get(combo, 0) + 1
+        self._hook()
+        return ('hotkey', combo)
+
+    def remove(self, handle):
+        kind, name = handle
+        if kind == 'key':
+            for code in VIRTUAL_KEYS[name]:
+                self.blocked[code] -= 1
+                if not self.blocked[code]:
+                    del self.blocked[code]
+        else:
+            self.hotkeys[name] -= 1
+            if not self.hotkeys[name]:
+                del self.hotkeys[name]
+        if not self.blocked and not self.hotkeys:
+            self._unhook()
+
+    def hook_event(self, code, message, event):
+        """LowLevelKeyboardProc: nonzero swallows the keystroke"""
+        if code == self.HC_ACTION and self.suppresses(self.ctypes.cast(event, self.event_pointer)[0].vkCode,
+                                                      message in self.KEY_DOWN):
+            return 1
+        return self.user32.CallNextHookEx(None, code, message, event)
+
+    def suppresses(self, key, down):
+        """Whether virtual key `key` going down (or up) is swallowed"""
+        name = KEY_NAMES.get(key)
+        if name is not None:
+            if down:
+                self.pressed.add(name)
+            else:
+                self.pressed.discard(name)
+        return key in self.blocked or (down and name is not None and frozenset(self.pressed) in self.hotkeys)
+
+    def _hook(self):
+        if self.hook is None:
+            self.pressed.clear()
+            self.hook = self.user32.SetWindowsHookExW(self.WH_KEYBOARD_LL, self.proc, self.module, 0)
+            if not self.hook:
+                raise self.ctypes.WinError(self.ctypes.get_last_error())
+
+    def _unhook(self):
+        if self.hook is not None:
+            self.user32.UnhookWindowsHookEx(self.hook)
+            self.hook = None
+
+
+class KeyboardLibBackend:
+    """Global hooks through the `keyboard` package
+
+    keyboard keeps its OS-level listener once started; with no hooks left
+    each keystroke only passes through its empty dispatch tables.
+    """
+
+    def __init__(self):
+        import keyboard
+        self.keyboard = keyboard
+
+    def block_key(self, key):
+        return ('key', self.keyboard.block_key(key))
+
+    def suppress_hotkey(self, hotkey):
+        return ('hotkey', self.keyboard.add_hotkey(hotkey, lambda: None, suppress=True))
+
+    def remove(self, handle):
+        kind, remove = handle
+        if kind == 'key':
+            self.keyboard.unhook(remove)
+        else:
+            self.keyboard.remove_hotkey(remove)
+
+
+class FakeKeyboardBackend:
+    """Suppression hooks evaluated in-process; feed keystrokes with press()
+
+    Like WindowsHookBackend, the listener only exists while something is
+    hooked; with `persistent_listener` it stays once started, as the
+    `keyboard` package's does. Every key event the listener sees pays for
+    a dispatch, hooks or not.
+    """
+
+    def __init__(self, persistent_listener=False):
+        self.persistent_listener = persistent_listener
+        self.listening = False
+        self.blocked = {}
+        self.hotkeys = {}
+        self.pressed = set()
+        self.events = 0
+        self.suppressed = 0
+
+    @property
+    def hooked(self):
+        return bool(self.blocked or self.hotkeys)
+
+    def block_key(self, key):
+        self.blocked[key] = self.blocked.get(key, 0) + 1
+        self.listening = True
+        return ('key', key)
+
+    def suppress_hotkey(self, hotkey):
+        combo = frozenset(hotkey.split('+'))
+        self.hotkeys[combo] = self.hotkeys.get(combo, 0) + 1
+        self.listening = True
+        return ('hotkey', combo)
+
+    def remove(self, handle):
+        kind, name = handle
+        table = self.blocked if kind == 'key' else self.hotkeys
+        table[name] -= 1
+        if not table[name]:
+            del table[name]
+        if not self.hooked and not self.persistent_listener:
+            self.listening = False
+            self.pressed.clear()
+
+    def key_event(self, name, down=True):
+        """One key down/up; returns False if a hook suppressed it"""
+        self.events += 1
+        if not self.listening:
+            # No listener, so the OS never calls into Python for it
+            return True
+        if down:
+            self.pressed.add(name)
+        else:
+            self.pressed.discard(name)
+        if name in self.blocked or (down and frozenset(self.pressed) in self.hotkeys):
+            self.suppressed += 1
+            return False
+        return True
+
+    def press(self, hotkey):
+        """Press and release a key or combination; returns whether it got through"""
+        names = hotkey.split('+')
+        accepted = [self.key_event(name, True) for name in names]
+        for name in reversed(names):
+            self.key_event(name, False)
+        return accepted[-1]
+
+
+def default_backend():
+    return WindowsHookBackend() if sys.platform == 'win32' else KeyboardLibBackend()
+
+
+class KeyboardPolicy:
+    """Keeps the suppression hooks installed exactly while lockdown is wanted
+
+    `on_error(message)` hears about hooks that could not be installed.
+    """
+
+    def __init__(self, backend_factory=default_backend, on_error=print):
+        self.backend_factory = backend_factory
+        self.on_error = on_error
+        self.backend = None
+        self.handles = []
+        self.failed = False
+        self.installs = 0
+        self.removals = 0
+
+    @property
+    def installed(self):
+        return bool(self.handles)
+
+    def apply(self, lockdown):
+        """Install or remove the hooks to match `lockdown`; returns True on a change"""
+        if lockdown == self.installed or self.failed:
+            return False
+        try:
+            if lockdown:
+                self._install()
+            else:
+                self._remove()
+        except Exception as e:
+            # No hooks on this machine (missing package, no permission):
+            # report once and stop trying
+            self.on_error(f"Keyboard blocking error: {e}")
+            self.failed = True
+            return False
+        return True
+
+    def close(self):
+        if self.installed:
+            self._remove()
+
+    def _install(self):
+        if self.backend is None:
+            self.backend = self.backend_factory()
+        try:
+            for key in BLOCKED_KEYS:
+                self.handles.append(self.backend.block_key(key))
+            for hotkey in SUPPRESSED_HOTKEYS:
+                self.handles.append(self.backend.suppress_hotkey(hotkey))
+        except Exception:
+            self._remove()
+            raise
+        self.installs += 1
+
+    def _remove(self):
+        while self.handles:
+            self.backend.remove(self.handles.pop())
+        self.removals += 1
@@ -0,0 +1,428 @@
+"""Revenue and usage ledger for top-ups
+
+Every top-up is stored as one row across four array-backed column files
+(timestamp, station, seconds, price in centavos) inside a partition
+directory per month:
+
+    ledger/
+        stations.txt            station ids, one per line (row value = line index)
+        2026-09/
+            ts.q  station.H  seconds.I  price.I
+            rollup.bin          per-day, per-station totals for the month and
+                                how many rows they cover, so a rollup that
+                                lags the columns after a crash is rolled forward
+            unsorted            present once a row arrived out of time order
+
+Rows within a partition are normally in time order, so a time range maps
+to a row range by binary search over ts.q without loading it. A row that
+arrives late (a delayed station batch, a clock stepped back) marks the
+partition unsorted, and its scans filter every row instead. Aggregate reports read
+only the small per-day rollups of the months they cover, so they stay fast
+over years of data; raw scans stream column chunks and never hold more
+than one chunk in memory.
+
+    python ledger.py report revenue --by station --month last
+    python ledger.py report utilization --from 2026-09-01 --to 2026-09-30
+"""
+import argparse
+import array
+import calendar
+import datetime
+import mmap
+import os
+import struct
+import sys
+
+from paths import data_dir
+
+# README pricing: 5 pesos for 25 minutes, 10 pesos for 50 minutes
+CENTAVOS_PER_MINUTE = 20
+
+COLUMNS = (('ts', 'q'), ('station', 'H'), ('seconds', 'I'), ('price', 'I'))
+# Largest top-up the uint32 seconds and price columns hold
+MAX_SECONDS = MAX_PRICE = 2 ** 32 - 1
+# Station ids are row values in the uint16 station column
+MAX_STATIONS = 2 ** 16
+ROLLUP = struct.Struct('<BHIQQ')  # day of month, station, top-ups, seconds, centavos
+ROLLUP_HEADER = struct.Struct('<Q')  # rows of the partition the rollup covers
+SCAN_CHUNK = 65536
+FLUSH_ROWS = 4096
+
+
+def price_for_seconds(seconds, centavos_per_minute=CENTAVOS_PER_MINUTE):
+    """Price in centavos for a top-up, from the posted per-minute rate"""
+    return (seconds * centavos_per_minute + 30) // 60
+
+
+def default_ledger_dir():
+    """Per-user location of the ledger"""
+    return os.path.join(data_dir(), 'ledger')
+
+
+def day_start(date):
+    """Local midnight of a date as a POSIX timestamp"""
+    return datetime.datetime(date.year, date.month, date.day).timestamp()
+
+
+class DayLookup:
+    """Maps timestamps to (YYYY-MM, day of month), remembering the last local day"""
+
+    def __init__(self):
+        self.start = self.end = 0
+        self.value = None
+
+    def __call__(self, timestamp):
+        if not self.start <= timestamp < self.end:
+            date = datetime.date.fromtimestamp(timestamp)
+            self.start = day_start(date)
+            self.end = day_start(date + datetime.timedelta(days=1))
+            self.value = (f"{date.year:04d}-{date.month:02d}", date.day)
+        return self.value
+
+
+def months_between(start, end):
+    """YYYY-MM keys of every month touched by [start, end] (dates)"""
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield f"{year:04d}-{month:02d}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+class Partition:
+    """One month of rows"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rollup = {}
+        self.rollup_rows = 0
+        os.makedirs(path, exist_ok=True)
+        self.rows = self._repair()
+        self.in_order = not os.path.exists(os.path.join(path, 'unsorted'))
+        self.last_ts = self._last_ts()
+        self._load_rollup()
+
+    def column_path(self, name):
+        typecode = dict(COLUMNS)[name]
+        return os.path.join(self.path, f"{name}.{typecode}")
+
+    def _repair(self):
+        """Trim columns to a common length after an interrupted append"""
+        lengths = []
+        for name, typecode in COLUMNS:
+            path = self.column_path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            lengths.append(size // array.array(typecode).itemsize)
+        rows = min(lengths)
+        for name, typecode in COLUMNS:
+            path = self.column_path(name)
+            if os.path.exists(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(rows * array.array(typecode).itemsize)
+        return rows
+
+    def _last_ts(self):
+        """Timestamp of the last row on disk, or None for an empty partition"""
+        if not self.rows:
+            return None
+        with open(self.column_path('ts'), 'rb') as f:
+            f.seek((self.rows - 1) * 8)
+            return struct.unpack('<q', f.read(8))[0]
+
+    def _load_rollup(self):
+        path = os.path.join(self.path, 'rollup.bin')
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        if len(data) >= ROLLUP_HEADER.size:
+            self.rollup_rows = ROLLUP_HEADER.unpack_from(data)[0]
+            for day, station, count, seconds, price in ROLLUP.iter_unpack(data[ROLLUP_HEADER.size:]):
+                self.rollup[day, station] = [count, seconds, price]
+        if self.rollup_rows > self.rows:
+            self.rebuild_rollup()
+        elif self.rollup_rows < self.rows:
+            self._roll_forward()
+            self.save_rollup()
+
+    def save_rollup(self):
+        path = os.path.join(self.path, 'rollup.bin')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(ROLLUP_HEADER.pack(self.rollup_rows))
+            f.write(b''.join(
+                ROLLUP.pack(day, station, *totals)
+                for (day, station), totals in sorted(self.rollup.items())
+            ))
+        os.replace(tmp_path, path)
+
+    def rebuild_rollup(self):
+        """Recompute the per-day totals from the columns"""
+        self.rollup = {}
+        self.rollup_rows = 0
+        self._roll_forward()
+        self.save_rollup()
+
+    def _roll_forward(self):
+        """Add rows written after the rollup was last saved"""
+        lookup = DayLookup()
+        for ts, station, seconds, price in self.scan(self.rollup_rows):
+            self.add_to_rollup(lookup(ts)[1], station, seconds, price)
+        self.rollup_rows = self.rows
+
+    def add_to_rollup(self, day, station, seconds, price):
+        key = (day, station)
+        totals = self.rollup.get(key)
+        if totals is None:
+            self.rollup[key] = [1, seconds, price]
+        else:
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += price
+
+    def append(self, columns):
+        """Append buffered column arrays (one per COLUMNS entry)"""
+        ts = columns[0]
+        if self.in_order:
+            previous = ts[0] if self.last_ts is None else self.last_ts
+            for value in ts:
+                if value < previous:
+                    # Marked before the rows land, so a crash cannot leave it unmarked
+                    open(os.path.join(self.path, 'unsorted'), 'wb').close()
+                    self.in_order = False
+                    break
+                previous = value
+        for (name, _), values in zip(COLUMNS, columns):
+            with open(self.column_path(name), 'ab') as f:
+                values.tofile(f)
+        self.rows += len(ts)
+        self.rollup_rows = self.rows
+        self.last_ts = ts[-1] if self.last_ts is None else max(self.last_ts, ts[-1])
+
+    def row_for_time(self, timestamp):
+        """First row at or after `timestamp`, by binary search over ts.q (only while in_order)"""
+        if not self.rows:
+            return 0
+        with open(self.column_path('ts'), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as ts:
+                lo, hi = 0, self.rows
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if struct.unpack_from('<q', ts, mid * 8)[0] < timestamp:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                return lo
+
+    def scan(self, start_row=0, end_row=None):
+        """Stream (ts, station, seconds, price) rows, one chunk in memory at a time"""
+        if end_row is None:
+            end_row = self.rows
+        files = [open(self.column_path(name), 'rb') for name, _ in COLUMNS]
+        try:
+            for f, (_, typecode) in zip(files, COLUMNS):
+                f.seek(start_row * array.array(typecode).itemsize)
+            row = start_row
+            while row < end_row:
+                count = min(SCAN_CHUNK, end_row - row)
+                chunk = []
+                for f, (_, typecode) in zip(files, COLUMNS):
+                    values = array.array(typecode)
+                    values.fromfile(f, count)
+                    chunk.append(values)
+                yield from zip(*chunk)
+                row += count
+        finally:
+            for f in files:
+                f.close()
+
+
+class Ledger:
+    """Single-writer ledger of top-ups"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.stations = []
+        self.station_index = {}
+        self._load_stations()
+        self.partitions = {}
+        self.buffer_month = None
+        self.buffer = None
+        self.day_lookup = DayLookup()
+
+    def _load_stations(self):
+        try:
+            with open(os.path.join(self.path, 'stations.txt'), encoding='utf-8') as f:
+                self.stations = [line.rstrip('\n') for line in f]
+        except FileNotFoundError:
+            self.stations = []
+        self.station_index = {station: i for i, station in enumerate(self.stations)}
+
+    def station_id(self, station):
+        """Row value for a station, registering it on first use"""
+        index = self.station_index.get(station)
+        if index is None:
+            index = len(self.stations)
+            if index >= MAX_STATIONS:
+                raise ValueError(f"ledger already holds {MAX_STATIONS} stations")
+            with open(os.path.join(self.path, 'stations.txt'), 'a', encoding='utf-8') as f:
+                f.write(station + '\n')
+            self.stations.append(station)
+            self.station_index[station] = index
+        return index
+
+    def partition(self, month):
+        partition = self.partitions.get(month)
+        if partition is None:
+            partition = Partition(os.path.join(self.path, month))
+            self.partitions[month] = partition
+        return partition
+
+    def months(self):
+        return sorted(name for name in os.listdir(self.path) if len(name) == 7 and name[4] == '-')
+
+    def record(self, station, seconds, price=None, timestamp=None):
+        """Buffer one top-up; rows are written by flush()
+
+        Raises ValueError, before anything is buffered, for a value its
+        column cannot hold, so the columns always stay the same length.
+        """
+        if timestamp is None:
+            timestamp = datetime.datetime.now().timestamp()
+        if price is None:
+            price = price_for_seconds(seconds)
+        seconds = int(seconds)
+        price = int(price)
+        if not 0 <= seconds <= MAX_SECONDS:
+            raise ValueError(f"seconds {seconds} out of range")
+        if not 0 <= price <= MAX_PRICE:
+            raise ValueError(f"price {price} out of range")
+        try:
+            month, day = self.day_lookup(timestamp)
+        except (OverflowError, OSError) as e:
+            raise ValueError(f"timestamp {timestamp} out of range") from e
+        if month != self.buffer_month:
+            self.flush()
+            self.buffer_month = month
+            self.buffer = [array.array(typecode) for _, typecode in COLUMNS]
+        station = self.station_id(station)
+        for column, value in zip(self.buffer, (int(timestamp), station, seconds, price)):
+            column.append(value)
+        self.partition(month).add_to_rollup(day, station, seconds, price)
+        if len(self.buffer[0]) >= FLUSH_ROWS:
+            self._write_rows()
+
+    def _write_rows(self):
+        if self.buffer and len(self.buffer[0]):
+            self.partition(self.buffer_month).append(self.buffer)
+            self.buffer = [array.array(typecode) for _, typecode in COLUMNS]
+
+    def flush(self):
+        """Write buffered rows and the updated rollup"""
+        if self.buffer_month is None:
+            return
+        self._write_rows()
+        self.partition(self.buffer_month).save_rollup()
+
+    def close(self):
+        self.flush()
+
+    def totals(self, start, end, by='station'):
+        """Sum top-ups, seconds and centavos per station or per day over dates [start, end]"""
+        self.flush()
+        results = {}
+        for month in months_between(start, end):
+            if not os.path.isdir(os.path.join(self.path, month)):
+                continue
+            year, mon = int(month[:4]), int(month[5:])
+            first = start.day if (start.year, start.month) == (year, mon) else 1
+            last = end.day if (end.year, end.month) == (year, mon) else calendar.monthrange(year, mon)[1]
+            for (day, station), (count, seconds, price) in self.partition(month).rollup.items():
+                if not first <= day <= last:
+                    continue
+                key = self.stations[station] if by == 'station' else datetime.date(year, mon, day)
+                totals = results.setdefault(key, [0, 0, 0])
+                totals[0] += count
+                totals[1] += seconds
+                totals[2] += price
+        return results
+
+    def scan(self, start, end, station=None):
+        """Stream raw (timestamp, station, seconds, centavos) rows with start <= ts < end"""
+        self.flush()
+        wanted = None if station is None else self.station_index.get(station, -1)
+        first = datetime.date.fromtimestamp(start)
+        last = datetime.date.fromtimestamp(end)
+        for month in months_between(first, last):
+            if not os.path.isdir(os.path.join(self.path, month)):
+                continue
+            partition = self.partition(month)
+            if partition.in_order:
+                rows = partition.scan(partition.row_for_time(start), partition.row_for_time(end))
+            else:
+                rows = (row for row in partition.scan() if start <= row[0] < end)
+            for ts, index, seconds, price in rows:
+                if wanted is None or index == wanted:
+                    yield ts, self.stations[index], seconds, price
+
+
+def parse_range(args):
+    """Resolve --month/--from/--to into a (start, end) pair of dates"""
+    today = datetime.date.today()
+    if args.month:
+        if args.month in ('last', 'this'):
+            first = today.replace(day=1)
+            if args.month == 'last':
+                first = (first - datetime.timedelta(days=1)).replace(day=1)
+        else:
+            first = datetime.datetime.strptime(args.month, '%Y-%m').date()
+        last = first.replace(day=calendar.monthrange(first.year, first.month)[1])
+        return first, last
+    start = datetime.datetime.strptime(args.start, '%Y-%m-%d').date() if args.start else today.replace(day=1)
+    end = datetime.datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else today
+    return start, end
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Timer revenue and usage ledger")
+    parser.add_argument('--ledger', default=default_ledger_dir(), help="ledger directory")
+    sub = parser.add_subparsers(dest='action')
+    sub.required = True
+    report = sub.add_parser('report', help="revenue or utilization over a date range")
+    report.add_argument('kind', choices=('revenue', 'utilization'))
+    report.add_argument('--by', choices=('station', 'day'), default='station')
+    report.add_argument('--month', help="YYYY-MM, 'this' or 'last'")
+    report.add_argument('--from', dest='start', help="YYYY-MM-DD (default: first of this month)")
+    report.add_argument('--to', dest='end', help="YYYY-MM-DD inclusive (default: today)")
+    sub.add_parser('reindex', help="rebuild the per-day rollups from the columns")
+    args = parser.parse_args(argv)
+
+    ledger = Ledger(args.ledger)
+    if args.action == 'reindex':
+        for month in ledger.months():
+            ledger.partition(month).rebuild_rollup()
+        return 0
+
+    start, end = parse_range(args)
+    totals = ledger.totals(start, end, by=args.by)
+    days = (end - start).days + 1
+    print(f"{args.kind} by {args.by}, {start} to {end}")
+    grand = [0, 0, 0]
+    for key in sorted(totals):
+        count, seconds, price = totals[key]
+        grand = [grand[0] + count, grand[1] + seconds, grand[2] + price]
+        if args.kind == 'revenue':
+            print(f"{str(key):<16}{count:>8} top-ups {price / 100:>12.2f} pesos")
+        else:
+            available = 86400 * (days if args.by == 'station' else max(1, len(ledger.stations)))
+            print(f"{str(key):<16}{seconds / 3600:>10.1f} h sold {100 * seconds / available:>7.1f}%")
+    if args.kind == 'revenue':
+        print(f"{'TOTAL':<16}{grand[0]:>8} top-ups {grand[2] / 100:>12.2f} pesos")
+    else:
+        print(f"{'TOTAL':<16}{grand[1] / 3600:>10.1f} h sold")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Member accounts with prepaid time balances, in SQLite
+
+A member buys time in advance and spends it on any station: signing in
+moves the whole balance onto the station's clock, and pausing (or signing
+out) banks the exact seconds left back onto the account, so unused
+minutes carry over to the next visit. Every change is also kept as a
+movement row for the member's history.
+
+The database runs in WAL mode, so the station's writes never block a
+reader such as the members CLI. Lookups go through the primary key and
+the SQL text is fixed, so sqlite3's statement cache reuses the prepared
+statements instead of compiling them per call.
+
+    python members.py add M0001 --name "Juan" --minutes 300
+    python members.py credit M0001 60
+    python members.py show M0001
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+
+from paths import data_dir
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS members (
+        member_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL DEFAULT '',
+        balance REAL NOT NULL DEFAULT 0,
+        updated REAL NOT NULL
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS movements (
+        id INTEGER PRIMARY KEY,
+        member_id TEXT NOT NULL,
+        ts REAL NOT NULL,
+        seconds REAL NOT NULL,
+        kind TEXT NOT NULL,
+        station TEXT NOT NULL DEFAULT ''
+    )""",
+    "CREATE INDEX IF NOT EXISTS movements_by_member ON movements (member_id, ts)",
+)
+
+SELECT_MEMBER = "SELECT member_id, name, balance, updated FROM members WHERE member_id = ?"
+SELECT_BALANCE = "SELECT balance FROM members WHERE member_id = ?"
+INSERT_MEMBER = "INSERT INTO members (member_id, name, balance, updated) VALUES (?, ?, ?, ?)"
+CREDIT = "UPDATE members SET balance = balance + ?, updated = ? WHERE member_id = ?"
+DEBIT = "UPDATE members SET balance = balance - ?, updated = ? WHERE member_id = ? AND balance >= ?"
+INSERT_MOVEMENT = "INSERT INTO movements (member_id, ts, seconds, kind, station) VALUES (?, ?, ?, ?, ?)"
+SELECT_MOVEMENTS = ("SELECT ts, seconds, kind, station FROM movements WHERE member_id = ? "
+                    "ORDER BY ts DESC LIMIT ?")
+
+# Movement kinds
+CREDIT_KIND = 'credit'
+DEBIT_KIND = 'debit'
+SIGN_IN = 'sign-in'
+BANK = 'bank'
+
+Member = namedtuple('Member', 'member_id name balance updated')
+
+
+class MemberError(ValueError):
+    """Unknown member, or not enough balance for a debit"""
+
+
+def default_members_path():
+    """Per-user location of the member database"""
+    return os.path.join(data_dir(), 'members.db')
+
+
+class MemberStore:
+    """Balances in seconds per member id; use from one thread"""
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Autocommit; writes that touch two tables use an explicit transaction
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.db.execute(statement)
+
+    def close(self):
+        self.db.close()
+
+    def create(self, member_id, name='', balance=0.0):
+        try:
+            with self._transaction():
+                self.db.execute(INSERT_MEMBER, (member_id, name, float(balance), self.clock()))
+                if balance:
+                    self.db.execute(INSERT_MOVEMENT, (member_id, self.clock(), float(balance), CREDIT_KIND, ''))
+        except sqlite3.IntegrityError:
+            raise MemberError(f"member {member_id} already exists")
+
+    def get(self, member_id):
+        """The member's row, or None"""
+        row = self.db.execute(SELECT_MEMBER, (member_id,)).fetchone()
+        return None if row is None else Member(*row)
+
+    def balance(self, member_id):
+        row = self.db.execute(SELECT_BALANCE, (member_id,)).fetchone()
+        if row is None:
+            raise MemberError(f"no member {member_id}")
+        return row[0]
+
+    def credit(self, member_id, seconds, station='', kind=CREDIT_KIND):
+        """Add seconds to a balance; returns the new balance"""
+        now = self.clock()
+        with self._transaction():
+            if self.db.execute(CREDIT, (seconds, now, member_id)).rowcount != 1:
+                raise MemberError(f"no member {member_id}")
+            self.db.execute(INSERT_MOVEMENT, (member_id, now, seconds, kind, station))
+            return self.db.execute(SELECT_BALANCE, (member_id,)).fetchone()[0]
+
+    def debit(self, member_id, seconds, station='', kind=DEBIT_KIND):
+        """Take seconds off a balance; returns the new balance
+
+        Raises MemberError if the member does not exist or has less than
+        `seconds` left; the balance is then unchanged.
+        """
+        now = self.clock()
+        with self._transaction():
+            if self.db.execute(DEBIT, (seconds, now, member_id, seconds)).rowcount != 1:
+                if self.db.execute(SELECT_BALANCE, (member_id,)).fetchone() is None:
+                    raise MemberError(f"no member {member_id}")
+                raise MemberError(f"member {member_id} has less than {seconds:.0f} seconds left")
+            self.db.execute(INSERT_MOVEMENT, (member_id, now, -seconds, kind, station))
+            return self.db.execute(SELECT_BALANCE, (member_id,)).fetchone()[0]
+
+    def withdraw_all(self, member_id, station=''):
+        """Move a member's whole balance out (to a station's clock); returns the seconds"""
+        with self._transaction():
+            balance = self.balance(member_id)
+            if balance > 0:
+                self.debit(member_id, balance, station, SIGN_IN)
+            return balance
+
+    def movements(self, member_id, limit=20):
+        return self.db.execute(SELECT_MOVEMENTS, (member_id, limit)).fetchall()
+
+    def _transaction(self):
+        return _Transaction(self.db)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, or ROLLBACK on error; nests as a no-op"""
+
+    def __init__(self, db):
+        self.db = db
+        self.outer = False
+
+    def __enter__(self):
+        if not self.db.in_transaction:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.outer = True
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.outer:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def format_balance(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes} min {seconds:02d} s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Timer member accounts")
+    parser.add_argument('--db', default=None, help="member database (default: per-user data dir)")
+    sub = parser.add_subparsers(dest='action')
+    sub.required = True
+    add = sub.add_parser('add', help="create a member")
+    add.add_argument('member_id')
+    add.add_argument('--name', default='')
+    add.add_argument('--minutes', type=int, default=0, help="opening balance")
+    credit = sub.add_parser('credit', help="add prepaid minutes")
+    credit.add_argument('member_id')
+    credit.add_argument('minutes', type=int)
+    show = sub.add_parser('show', help="balance and recent movements")
+    show.add_argument('member_id')
+    args = parser.parse_args(argv)
+
+    store = MemberStore(args.db or default_members_path())
+    try:
+        if args.action == 'add':
+            store.create(args.member_id, args.name, args.minutes * 60)
+        elif args.action == 'credit':
+            store.credit(args.member_id, args.minutes * 60)
+        member = store.get(args.member_id)
+        if member is None:
+            raise MemberError(f"no member {args.member_id}")
+        print(f"{member.member_id}  {member.name}  balance {format_balance(member.balance)}")
+        if args.action == 'show':
+            for ts, seconds, kind, station in store.movements(args.member_id):
+                when = time.strftime('%Y-%m-%d %H:%M', time.localtime(ts))
+                print(f"  {when}  {kind:<8}{seconds / 60:>+10.1f} min  {station}")
+    except MemberError as e:
+        print(e)
+        return 1
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Event-loop lag and handler-time instrumentation for the Tk thread
+
+Components schedule their after() callbacks through a ScopedAfter, which
+records two things for every callback it runs, per subsystem: how late it
+started compared with when it was due (loop lag: a modal dialog, a fade or
+a slow handler elsewhere held the loop), and how long it ran.
+
+LoopMonitor keeps fixed-bucket histograms of both, and MetricsExporter
+publishes them in the Prometheus text format, as a file rewritten in place
+(readable by node_exporter's textfile collector) and/or over HTTP on
+localhost, so stations with bad lag stand out across the shop. It also
+keeps how long each reusable window took from open() to on screen.
+"""
+import bisect
+import os
+import threading
+import time
+
+# Upper bounds in seconds, Prometheus-style; anything slower lands in +Inf
+BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_INTERVAL_MS = 10000
+
+METRICS = (
+    ('lag', 'timer_loop_lag_seconds', "Delay between an after() callback's due time and when it ran"),
+    ('duration', 'timer_handler_seconds', "Time spent running after() callbacks"),
+)
+WINDOW_METRIC = ('timer_window_open_seconds', "Time from opening a window until it was mapped")
+
+
+class Histogram:
+    """Counts observations into fixed buckets; also keeps sum and max"""
+
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (max for +Inf)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class LoopMonitor:
+    """Lag and duration histograms per subsystem"""
+
+    def __init__(self, station_id=None, clock=time.perf_counter):
+        self.station_id = station_id
+        self.clock = clock
+        self.histograms = {}
+        self.windows = {}
+
+    def scope(self, widget, subsystem):
+        """after()/after_cancel() on `widget`, with callbacks counted under `subsystem`"""
+        return ScopedAfter(self, widget, subsystem)
+
+    def observe(self, subsystem, lag, duration):
+        histograms = self.histograms.get(subsystem)
+        if histograms is None:
+            histograms = self.histograms[subsystem] = {'lag': Histogram(), 'duration': Histogram()}
+        histograms['lag'].observe(lag)
+        histograms['duration'].observe(duration)
+
+    def observe_open(self, window, seconds):
+        histogram = self.windows.get(window)
+        if histogram is None:
+            histogram = self.windows[window] = Histogram()
+        histogram.observe(seconds)
+
+    def run(self, subsystem, due, fn, args):
+        start = self.clock()
+        try:
+            return fn(*args)
+        finally:
+            self.observe(subsystem, max(0.0, start - due), self.clock() - start)
+
+    def summary(self):
+        """{subsystem: {'lag': (p50, p99, max), 'duration': (...), 'count': n}} in ms"""
+        return {
+            subsystem: dict(
+                {kind: tuple(round(value * 1000, 1) for value in
+                             (h.quantile(0.5), h.quantile(0.99), h.max))
+                 for kind, h in histograms.items()},
+                count=histograms['lag'].count
+            )
+            for subsystem, histograms in self.histograms.items()
+        }
+
+    def window_summary(self):
+        """{window: (p50, p99, max, opens)}, times in ms"""
+        return {
+            window: tuple(round(value * 1000, 1) for value in
+                          (h.quantile(0.5), h.quantile(0.99), h.max)) + (h.count,)
+            for window, h in self.windows.items()
+        }
+
+    def render(self):
+        """All histograms in the Prometheus text exposition format"""
+        lines = []
+        station = '' if self.station_id is None else f'station="{self.station_id}",'
+        for kind, name, help_text in METRICS:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for subsystem in sorted(self.histograms):
+                render_histogram(lines, name, f'{station}subsystem="{subsystem}"',
+                                 self.histograms[subsystem][kind])
+        lines.append("# HELP timer_loop_lag_max_seconds Worst loop lag seen since startup")
+        lines.append("# TYPE timer_loop_lag_max_seconds gauge")
+        for subsystem in sorted(self.histograms):
+            lag = self.histograms[subsystem]['lag']
+            lines.append(f'timer_loop_lag_max_seconds{{{station}subsystem="{subsystem}"}} {lag.max:.6f}')
+        if self.windows:
+            name, help_text = WINDOW_METRIC
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for window in sorted(self.windows):
+                render_histogram(lines, name, f'{station}window="{window}"', self.windows[window])
+        return '\n'.join(lines) + '\n'
+
+
+def render_histogram(lines, name, labels, histogram):
+    """Append one labelled histogram's bucket, sum and count lines"""
+    cumulative = 0
+    for bound, count in zip(BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram.sum:.6f}')
+    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+
+class ScopedAfter:
+    """Stands in for a widget's after()/after_idle()/after_cancel(), timing each callback"""
+
+    __slots__ = ('monitor', 'widget', 'subsystem')
+
+    def __init__(self, monitor, widget, subsystem):
+        self.monitor = monitor
+        self.widget = widget
+        self.subsystem = subsystem
+
+    def after(self, ms, fn, *args):
+        due = self.monitor.clock() + ms / 1000.0
+        return self.widget.after(ms, self.monitor.run, self.subsystem, due, fn, args)
+
+    def after_idle(self, fn, *args):
+        return self.widget.after_idle(self.monitor.run, self.subsystem, self.monitor.clock(), fn, args)
+
+    def after_cancel(self, after_id):
+        self.widget.after_cancel(after_id)
+
+
+class MetricsExporter:
+    """Publishes a LoopMonitor to a file and/or http://127.0.0.1:<port>/metrics
+
+    export() renders on the Tk thread; the HTTP thread only ever serves the
+    last rendered text, so it never reads the live histograms.
+    """
+
+    def __init__(self, monitor, path=None, port=None):
+        self.monitor = monitor
+        self.path = path
+        self.port = port
+        self.text = b''
+        self.server = None
+
+    def start(self):
+        if self.port is None:
+            return
+        # Only stations serving metrics pay for importing the HTTP server
+        import http.server
+        exporter = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(exporter.text)))
+                self.end_headers()
+                self.wfile.write(exporter.text)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.HTTPServer(('127.0.0.1', self.port), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True).start()
+
+    def export(self):
+        """Render the current histograms and publish them"""
+        self.text = self.monitor.render().encode()
+        if self.path is not None:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(self.text)
+            os.replace(tmp_path, self.path)
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,171 @@
+"""Stacked toast notifications animated without blocking the Tk loop
+
+Toasts fade in, wait, fade out and slide into place when the stack
+reflows, all driven by a single shared after() tick that only runs while
+something is animating. A small pool of prebuilt Toplevels is reused
+instead of creating and destroying one per message.
+"""
+import tkinter as tk
+
+FRAME_MS = 20
+ALPHA_STEP = 0.1
+POOL_SIZE = 3
+RIGHT_OFFSET = 320
+TOP_MARGIN = 20
+STACK_GAP = 10
+# Fraction of the remaining distance a toast moves per frame when reflowing
+SLIDE_EASING = 0.35
+
+
+class Toast:
+    """One reusable notification window"""
+
+    def __init__(self, root):
+        self.window = tk.Toplevel(root)
+        self.window.withdraw()
+        self.window.overrideredirect(True)
+        self.window.attributes('-topmost', True)
+        self.window.attributes('-alpha', 0.0)
+        self.window.configure(bg='grey15')
+
+        shadow = tk.Frame(self.window, bg='black')
+        shadow.pack(padx=5, pady=5)
+
+        self.frame = tk.Frame(
+            shadow,
+            padx=20,
+            pady=15,
+            highlightthickness=0
+        )
+        self.frame.pack()
+
+        self.label = tk.Label(
+            self.frame,
+            fg='white',
+            font=('Segoe UI', 14, 'bold')
+        )
+        self.label.pack()
+
+        self.alpha = 0.0
+        self.target_alpha = 0.0
+        self.height = 0
+        self.x = 0
+        self.y = 0
+        self.target_y = 0
+        self.hide_id = None
+
+    def prepare(self, message, bg_color):
+        """Fill in the text and colors and measure the window"""
+        self.frame.config(bg=bg_color)
+        self.label.config(text=message, bg=bg_color)
+        self.window.update_idletasks()
+        return self.window.winfo_reqheight()
+
+    @property
+    def animating(self):
+        return self.alpha != self.target_alpha or self.y != self.target_y
+
+    def step(self):
+        """Advance the fade and slide by one frame"""
+        if self.alpha < self.target_alpha:
+            self.alpha = min(self.target_alpha, round(self.alpha + ALPHA_STEP, 2))
+        elif self.alpha > self.target_alpha:
+            self.alpha = max(self.target_alpha, round(self.alpha - ALPHA_STEP, 2))
+        self.window.attributes('-alpha', self.alpha)
+
+        if self.y != self.target_y:
+            distance = self.target_y - self.y
+            self.y += int(distance * SLIDE_EASING) or (1 if distance > 0 else -1)
+            self.window.geometry(f"+{self.x}+{self.y}")
+
+    def show(self):
+        """Map the window, transparent, at its slot in the stack"""
+        self.alpha = 0.0
+        self.y = self.target_y
+        self.window.attributes('-alpha', 0.0)
+        self.window.geometry(f"+{self.x}+{self.y}")
+        self.window.deiconify()
+
+    def hide(self):
+        self.window.withdraw()
+
+    def destroy(self):
+        if self.window.winfo_exists():
+            self.window.destroy()
+
+
+class NotificationManager:
+    """Shows toasts stacked down the right edge of the screen"""
+
+    def __init__(self, root, pool_size=POOL_SIZE, timers=None):
+        self.root = root
+        # Anything with after()/after_cancel(); the root window by default
+        self.timers = timers or root
+        self.pool_size = pool_size
+        self.pool = [Toast(root) for _ in range(pool_size)]
+        self.active = []
+        self.tick_id = None
+
+    def show(self, message, bg_color='#ff9800', display_time=5000):
+        """Queue a toast; returns immediately"""
+        toast = self.pool.pop() if self.pool else Toast(self.root)
+        toast.height = toast.prepare(message, bg_color)
+        toast.x = self.root.winfo_screenwidth() - RIGHT_OFFSET
+        toast.target_alpha = 1.0
+        self.active.append(toast)
+        self._reflow()
+        toast.show()
+        toast.hide_id = self.timers.after(display_time, self.dismiss, toast)
+        self._start_ticking()
+
+    def dismiss(self, toast):
+        """Start fading a toast out"""
+        if toast.hide_id is not None:
+            self.timers.after_cancel(toast.hide_id)
+            toast.hide_id = None
+        toast.target_alpha = 0.0
+        self._start_ticking()
+
+    def destroy(self):
+        """Tear down every toast, pooled or visible"""
+        if self.tick_id is not None:
+            self.timers.after_cancel(self.tick_id)
+            self.tick_id = None
+        for toast in self.active + self.pool:
+            if toast.hide_id is not None:
+                self.timers.after_cancel(toast.hide_id)
+            toast.destroy()
+        self.active = []
+        self.pool = []
+
+    def _reflow(self):
+        y = TOP_MARGIN
+        for toast in self.active:
+            toast.target_y = y
+            y += toast.height + STACK_GAP
+
+    def _start_ticking(self):
+        if self.tick_id is None:
+            self.tick_id = self.timers.after(FRAME_MS, self._tick)
+
+    def _tick(self):
+        self.tick_id = None
+        finished = []
+        for toast in self.active:
+            if toast.animating:
+                toast.step()
+            if toast.alpha == 0.0 and toast.target_alpha == 0.0:
+                finished.append(toast)
+
+        for toast in finished:
+            self.active.remove(toast)
+            toast.hide()
+            if len(self.pool) < self.pool_size:
+                self.pool.append(toast)
+            else:
+                toast.destroy()
+        if finished:
+            self._reflow()
+
+        if any(toast.animating for toast in self.active):
+            self._start_ticking()
@@ -0,0 +1,28 @@
+"""Per-user directories the timer keeps its files in
+
+Windows puts everything under %LOCALAPPDATA%\\timer; elsewhere the XDG
+base directories are used (~/.local/share, ~/.config, ~/.cache).
+"""
+import os
+import sys
+
+
+def _user_dir(variable, default):
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get(variable) or os.path.join(os.path.expanduser('~'), *default)
+    return os.path.join(base, 'timer')
+
+
+def data_dir():
+    """Journal, ledger, members, event log, tokens and the state file"""
+    return _user_dir('XDG_DATA_HOME', ('.local', 'share'))
+
+
+def config_dir():
+    return _user_dir('XDG_CONFIG_HOME', ('.config',))
+
+
+def cache_dir():
+    return _user_dir('XDG_CACHE_HOME', ('.cache',))
@@ -0,0 +1,235 @@
+"""PIN checks against a salted PBKDF2 hash, off the Tk thread, with lockout
+
+The config stores the PIN as a hash (config.json "pin_hash"):
+
+    pbkdf2_sha256$<iterations>$<salt, base64>$<hash, base64>
+
+whose iteration count is calibrated on the station when the PIN is set,
+so one check costs about TARGET_SECONDS of CPU there:
+
+    python pin_service.py set-pin --config C:\\timer\\config.json
+    python pin_service.py calibrate --target-ms 50
+
+A config that still has a plain "pin" works too; it is hashed in the
+background when loaded.
+
+PinService runs every check on its own thread (hashlib releases the GIL
+while it hashes), so the clock and the lock screen countdown keep going,
+and hands the result back through `call`, normally TkDispatcher.call.
+After FREE_ATTEMPTS wrong PINs in a row every further one locks entry
+for twice as long as the last, up to MAX_LOCKOUT; a right PIN resets it.
+"""
+import argparse
+import base64
+import collections
+import getpass
+import hashlib
+import hmac
+import json
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+
+ALGORITHM = 'pbkdf2_sha256'
+TARGET_SECONDS = 0.05
+MIN_ITERATIONS = 1000
+SALT_BYTES = 16
+PROBE_ITERATIONS = 10000
+FREE_ATTEMPTS = 3
+BASE_LOCKOUT = 5.0
+MAX_LOCKOUT = 900.0
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def _derive(pin, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', pin.encode('utf-8'), salt, iterations)
+
+
+def calibrate(target=TARGET_SECONDS):
+    """PBKDF2 iterations that take about `target` seconds on this CPU"""
+    salt = secrets.token_bytes(SALT_BYTES)
+    best = None
+    # Best of three, so a busy moment does not make the hash too cheap
+    for _ in range(3):
+        start = time.perf_counter()
+        _derive('calibrate', salt, PROBE_ITERATIONS)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    iterations = int(PROBE_ITERATIONS * target / max(best, 1e-9))
+    return max(MIN_ITERATIONS, iterations // 1000 * 1000)
+
+
+def hash_pin(pin, iterations, salt=None):
+    """The pin_hash string for `pin`"""
+    salt = salt or secrets.token_bytes(SALT_BYTES)
+    return f"{ALGORITHM}${iterations}${_b64(salt)}${_b64(_derive(pin, salt, iterations))}"
+
+
+def parse_pin_hash(text):
+    """(iterations, salt, hash) from a pin_hash string; raises ValueError"""
+    try:
+        algorithm, iterations, salt, digest = text.split('$')
+        if algorithm != ALGORITHM:
+            raise ValueError
+        iterations = int(iterations)
+        salt = base64.b64decode(salt, validate=True)
+        digest = base64.b64decode(digest, validate=True)
+    except (AttributeError, ValueError):
+        raise ValueError(f"pin_hash must look like {ALGORITHM}$<iterations>$<salt>$<hash>")
+    if iterations < 1 or not salt or not digest:
+        raise ValueError("pin_hash has no iterations, salt or hash")
+    return iterations, salt, digest
+
+
+def check_pin(pin, parsed):
+    """Whether `pin` matches a parsed pin_hash, in constant time"""
+    iterations, salt, digest = parsed
+    return hmac.compare_digest(_derive(pin, salt, iterations), digest)
+
+
+def lockout_seconds(failures):
+    """How long entry is locked after `failures` wrong PINs in a row"""
+    if failures < FREE_ATTEMPTS:
+        return 0.0
+    return min(MAX_LOCKOUT, BASE_LOCKOUT * 2 ** (failures - FREE_ATTEMPTS))
+
+
+class PinService:
+    """Checks PINs on a worker thread; the lockout is kept on the calling (Tk) thread
+
+    `call(fn, *args)` must run fn(*args) on the Tk thread. `target` is the
+    cost used to hash a plain config PIN.
+    """
+
+    def __init__(self, call, clock=time.monotonic, target=TARGET_SECONDS):
+        self.call = call
+        self.clock = clock
+        self.target = target
+        self.jobs = queue.Queue()
+        self.thread = None
+        # Only the worker touches the hash
+        self.secret = None
+        # Callbacks of the checks in flight, in the order the worker runs them
+        self.pending = collections.deque()
+        self.failures = 0
+        self.locked_until = 0.0
+        self.checked = 0
+        self.rejected = 0
+        self.check_seconds = 0.0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='pin', daemon=True)
+        self.thread.start()
+
+    def close(self):
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join(1.0)
+            self.thread = None
+
+    def set_pin(self, config):
+        """Check against this config's PIN from now on (hashed first if it is plain)"""
+        self.jobs.put(('set', config.pin_hash, config.pin))
+
+    def lockout_left(self):
+        return max(0.0, self.locked_until - self.clock())
+
+    def verify(self, pin, done):
+        """Check `pin` in the background, then call done(ok, lockout seconds left)
+
+        While locked out, done(False, seconds) is called right away.
+        """
+        wait = self.lockout_left()
+        if wait > 0:
+            self.rejected += 1
+            done(False, wait)
+            return
+        self.pending.append(done)
+        self.jobs.put(('verify', pin))
+
+    def join(self):
+        """Wait until every queued job has run (tests and the simulation)"""
+        self.jobs.join()
+
+    def _finish(self, ok, seconds):
+        """A check finished (Tk thread)"""
+        done = self.pending.popleft()
+        self.checked += 1
+        self.check_seconds += seconds
+        if ok:
+            self.failures = 0
+        else:
+            self.rejected += 1
+            self.failures += 1
+            self.locked_until = self.clock() + lockout_seconds(self.failures)
+        done(ok, self.lockout_left())
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                if job[0] == 'set':
+                    _, pin_hash, pin = job
+                    if pin_hash is None:
+                        pin_hash = hash_pin(pin, calibrate(self.target))
+                    self.secret = parse_pin_hash(pin_hash)
+                else:
+                    start = time.perf_counter()
+                    ok = self.secret is not None and check_pin(job[1], self.secret)
+                    self.call(self._finish, ok, time.perf_counter() - start)
+            finally:
+                self.jobs.task_done()
+
+
+def main(argv=None):
+    from config import default_config_path
+
+    parser = argparse.ArgumentParser(description="Timer PIN hashing")
+    sub = parser.add_subparsers(dest='action')
+    sub.required = True
+    set_pin = sub.add_parser('set-pin', help="store a new PIN in the config, hashed for this CPU")
+    set_pin.add_argument('--config', default=None, help="config file (default: per-user config dir)")
+    set_pin.add_argument('--target-ms', type=float, default=TARGET_SECONDS * 1000)
+    calibrate_parser = sub.add_parser('calibrate', help="iterations for a target check time")
+    calibrate_parser.add_argument('--target-ms', type=float, default=TARGET_SECONDS * 1000)
+    args = parser.parse_args(argv)
+
+    iterations = calibrate(args.target_ms / 1000)
+    salt = secrets.token_bytes(SALT_BYTES)
+    start = time.perf_counter()
+    _derive('check', salt, iterations)
+    print(f"{iterations} iterations, {(time.perf_counter() - start) * 1000:.1f} ms per check on this CPU")
+    if args.action == 'calibrate':
+        return 0
+
+    pin = getpass.getpass("New PIN: ")
+    if not pin or pin != getpass.getpass("Again: "):
+        print("PINs are empty or do not match; nothing changed")
+        return 1
+    path = args.config or default_config_path()
+    try:
+        with open(path, encoding='utf-8') as f:
+            settings = json.load(f)
+    except FileNotFoundError:
+        settings = {}
+    settings.pop('pin', None)
+    settings['pin_hash'] = hash_pin(pin, iterations)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(settings, f, indent=2)
+    os.replace(tmp_path, path)
+    print(f"PIN saved to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Shutdown, lock and log-off of the station, without blocking the Tk thread
+
+A backend turns an action into the command line for this OS:
+WindowsBackend uses shutdown.exe and LockWorkStation, SystemdBackend uses
+systemctl and loginctl, DryRunBackend runs nothing and only records what
+it was asked to do. PowerManager runs the command on a worker thread with
+a timeout and reports (action, ok, detail) back through a callback.
+"""
+import os
+import subprocess
+import sys
+import threading
+
+ACTIONS = ('shutdown', 'lock', 'logoff')
+# How long a power command may take before it counts as failed
+COMMAND_TIMEOUT = 15.0
+
+
+class WindowsBackend:
+    name = 'windows'
+
+    def command(self, action):
+        if action == 'shutdown':
+            return ['shutdown', '/s', '/t', '1']
+        if action == 'lock':
+            return ['rundll32.exe', 'user32.dll,LockWorkStation']
+        return ['shutdown', '/l']
+
+
+class SystemdBackend:
+    name = 'systemd'
+
+    def command(self, action):
+        if action == 'shutdown':
+            return ['systemctl', 'poweroff']
+        session = os.environ.get('XDG_SESSION_ID', 'self')
+        if action == 'lock':
+            return ['loginctl', 'lock-session', session]
+        return ['loginctl', 'terminate-session', session]
+
+
+class DryRunBackend:
+    """Runs nothing; every action succeeds and is kept in `requested`"""
+    name = 'dry-run'
+
+    def __init__(self):
+        self.requested = []
+
+    def command(self, action):
+        self.requested.append(action)
+        return None
+
+
+BACKENDS = {'windows': WindowsBackend, 'systemd': SystemdBackend, 'dry-run': DryRunBackend}
+
+
+def default_backend():
+    return WindowsBackend() if sys.platform == 'win32' else SystemdBackend()
+
+
+def make_backend(name='auto'):
+    return default_backend() if name == 'auto' else BACKENDS[name]()
+
+
+class PowerManager:
+    """Runs power actions off the calling thread
+
+    `report(action, ok, detail)` is called from the worker thread; a Tk
+    app hands it on to the Tk thread with TkDispatcher.call.
+    """
+
+    def __init__(self, backend, report, timeout=COMMAND_TIMEOUT):
+        self.backend = backend
+        self.report = report
+        self.timeout = timeout
+        self.pending = set()
+
+    def request(self, action):
+        """Start an action; returns False if the same one is already running"""
+        if action not in ACTIONS:
+            raise ValueError(f"unknown power action {action!r}")
+        if action in self.pending:
+            return False
+        self.pending.add(action)
+        threading.Thread(target=self._run, args=(action,), name=f'power-{action}', daemon=True).start()
+        return True
+
+    def run(self, action):
+        """Run an action on this thread; returns (ok, detail)"""
+        command = self.backend.command(action)
+        if command is None:
+            return True, f"dry run: {action}"
+        try:
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            return False, f"{command[0]} did not finish within {self.timeout:.0f} seconds"
+        except OSError as e:
+            return False, str(e)
+        if result.returncode != 0:
+            output = (result.stderr or result.stdout).decode(errors='replace').strip()
+            return False, output or f"{command[0]} exited with status {result.returncode}"
+        return True, ""
+
+    def _run(self, action):
+        try:
+            ok, detail = self.run(action)
+        finally:
+            self.pending.discard(action)
+        self.report(action, ok, detail)
@@ -0,0 +1,67 @@
+"""Deadline-driven tick scheduling for the timer display"""
+import math
+
+# Wake a couple of milliseconds after a boundary rather than just before it,
+# otherwise int(remaining) still shows the old second and we wake twice.
+WAKE_SLACK_MS = 2
+
+
+def next_tick_delay(remaining, thresholds=(), display_visible=True):
+    """Seconds until the next event that matters, or None when idle
+
+    Events are the next whole-second change of the clock (only while the
+    display is visible), each warning threshold still ahead and expiry.
+    """
+    if remaining is None:
+        return None
+    if remaining <= 0:
+        return 0.0
+
+    delay = remaining
+    if display_visible:
+        fraction = remaining - math.floor(remaining)
+        delay = min(delay, fraction if fraction > 0 else 1.0)
+
+    for threshold in thresholds:
+        if remaining > threshold:
+            delay = min(delay, remaining - threshold)
+
+    return delay
+
+
+class TickScheduler:
+    """Keeps at most one pending after() callback and sleeps between events"""
+
+    def __init__(self, widget, callback):
+        self.widget = widget
+        self.callback = callback
+        self.after_id = None
+        self.wakeups = 0
+
+    def schedule(self, delay):
+        """Run the callback after `delay` seconds, or stop ticking if None"""
+        self.cancel()
+        if delay is None:
+            return
+        delay_ms = int(math.ceil(delay * 1000)) + WAKE_SLACK_MS
+        self.after_id = self.widget.after(delay_ms, self._fire)
+
+    def wake(self):
+        """Run the callback as soon as the event loop is free"""
+        self.cancel()
+        self.after_id = self.widget.after_idle(self._fire)
+
+    def cancel(self):
+        """Drop the pending callback, if any"""
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+
+    @property
+    def pending(self):
+        return self.after_id is not None
+
+    def _fire(self):
+        self.after_id = None
+        self.wakeups += 1
+        self.callback()
@@ -0,0 +1,446 @@
+"""Dialogs and the lock screen, built once and reused
+
+Building a Toplevel full of widgets every time the Add Time menu, the
+Settings menu or the lock screen comes up costs a widget tree per open
+and a visible delay on slow station PCs. Each window here is built once,
+withdrawn (prebuild(), which the app runs from after_idle once the clock
+is on screen, or the first open if that comes sooner), then only brought
+back with deiconify(); opening refreshes what changed (button texts, the
+countdown) instead of rebuilding.
+
+PIN entry is a keypad inside the window (PinPad) rather than a modal
+simpledialog, so the Tk loop, and with it the clock and the lock screen
+countdown, keeps running while the PIN is typed. The PIN is checked
+asynchronously: `check(pin, done)` calls done(ok, lockout seconds left)
+later, and the pad ignores keys until it does. Every open is timed
+until the window is mapped and recorded per window in the LoopMonitor
+(timer_window_open_seconds).
+"""
+import math
+import tkinter as tk
+
+PANEL_BG = '#2d2d2d'
+KEYPAD = ('1', '2', '3', '4', '5', '6', '7', '8', '9', '⌫', '0', 'OK')
+MAX_PIN = 32
+
+
+def pin_message(wait):
+    """What the pad says after a wrong PIN, given the lockout seconds left"""
+    if wait > 0:
+        return f"Too many tries. Wait {math.ceil(wait)} s"
+    return "Incorrect PIN!"
+
+
+class PinPad:
+    """Masked PIN entry: an on-screen keypad, plus the physical keyboard
+
+    Only digits are on the keypad; any other printable key typed on the
+    keyboard goes in too, so PINs like the default one still work.
+    """
+
+    def __init__(self, master, on_submit, on_cancel, bg=PANEL_BG, size=14):
+        self.on_submit = on_submit
+        self.on_cancel = on_cancel
+        self.digits = ''
+        self.checking = False
+        self.frame = tk.Frame(master, bg=bg)
+        self.prompt = tk.Label(self.frame, text="Enter PIN:", fg='white', bg=bg, font=('Arial', size))
+        self.prompt.pack(pady=(0, 5))
+        self.display = tk.Label(self.frame, text="", fg='white', bg='black', width=12,
+                                font=('Arial', size + 4, 'bold'))
+        self.display.pack(pady=5)
+        self.message = tk.Label(self.frame, text="", fg='#ff5252', bg=bg, font=('Arial', size - 2))
+        self.message.pack()
+
+        keys = tk.Frame(self.frame, bg=bg)
+        keys.pack(pady=5)
+        for index, key in enumerate(KEYPAD):
+            tk.Button(
+                keys,
+                text=key,
+                command=lambda key=key: self.press(key),
+                bg='#4CAF50' if key == 'OK' else '#6c757d',
+                fg='white',
+                font=('Arial', size, 'bold'),
+                width=4
+            ).grid(row=index // 3, column=index % 3, padx=3, pady=3)
+        tk.Button(
+            self.frame,
+            text="Cancel",
+            command=self.cancel,
+            bg='#f44336',
+            fg='white',
+            font=('Arial', size - 2),
+            width=12
+        ).pack(pady=5)
+
+    def pack(self, **options):
+        self.frame.pack(**options)
+
+    def pack_forget(self):
+        self.frame.pack_forget()
+
+    def reset(self, prompt=None):
+        """Clear the entry (and any error) for a new PIN"""
+        self.digits = ''
+        self.checking = False
+        if prompt is not None:
+            self.prompt.config(text=prompt)
+        self.display.config(text="")
+        self.message.config(text="")
+
+    def fail(self, message="Incorrect PIN!"):
+        """Reject the PIN that was entered; the pad stays up for another try"""
+        self.digits = ''
+        self.checking = False
+        self.display.config(text="")
+        self.message.config(text=message)
+
+    def press(self, key):
+        if self.checking:
+            return
+        if key == 'OK':
+            self.submit()
+        elif key == '⌫':
+            self.digits = self.digits[:-1]
+            self.display.config(text='•' * len(self.digits))
+        elif len(self.digits) < MAX_PIN:
+            self.digits += key
+            self.display.config(text='•' * len(self.digits))
+            if self.message.cget('text'):
+                self.message.config(text="")
+
+    def submit(self):
+        pin, self.digits = self.digits, ''
+        self.checking = True
+        self.display.config(text="")
+        self.message.config(text="Checking…")
+        self.on_submit(pin)
+
+    def cancel(self):
+        self.reset()
+        self.on_cancel()
+
+    def on_key(self, event):
+        """<Key> handler for the window the pad is in"""
+        if event.keysym in ('Return', 'KP_Enter'):
+            self.press('OK')
+        elif event.keysym == 'BackSpace':
+            self.press('⌫')
+        elif event.keysym == 'Escape':
+            self.cancel()
+        elif event.char and event.char.isprintable():
+            self.press(event.char)
+        return "break"
+
+
+class ReusableWindow:
+    """A Toplevel built once, then only withdrawn and shown again
+
+    Subclasses build() the widgets once and refresh() what can change
+    between opens.
+    """
+
+    def __init__(self, master, name, monitor=None):
+        self.master = master
+        self.name = name
+        self.monitor = monitor
+        self.window = None
+        self.visible = False
+        self.opened_at = None
+        self.previous_grab = None
+        self.builds = 0
+
+    def prebuild(self):
+        """Build the window withdrawn, so the first open only has to show it"""
+        if self.window is None:
+            self.window = tk.Toplevel(self.master)
+            self.window.withdraw()
+            self.window.protocol("WM_DELETE_WINDOW", self.close)
+            self.window.bind('<Map>', self.on_map, '+')
+            self.build(self.window)
+            self.builds += 1
+
+    def open(self, *args):
+        started = self.monitor.clock() if self.monitor is not None else None
+        self.prebuild()
+        self.refresh(*args)
+        if not self.visible:
+            self.visible = True
+            self.opened_at = started
+            self.previous_grab = self.window.grab_current()
+            self.window.deiconify()
+        self.window.lift()
+        self.window.grab_set()
+        self.window.focus_set()
+
+    def close(self):
+        if not self.visible:
+            return
+        self.visible = False
+        self.window.grab_release()
+        self.window.withdraw()
+        # Hand the grab back, e.g. to the lock screen under the Add Time menu
+        previous, self.previous_grab = self.previous_grab, None
+        if previous is not None and previous is not self.window:
+            try:
+                previous.grab_set()
+            except tk.TclError:
+                pass
+
+    def on_map(self, event):
+        """Record how long this open took to reach the screen"""
+        if event.widget is not self.window or self.opened_at is None:
+            return
+        self.monitor.observe_open(self.name, self.monitor.clock() - self.opened_at)
+        self.opened_at = None
+
+    def build(self, window):
+        raise NotImplementedError
+
+    def refresh(self, *args):
+        pass
+
+
+class MenuWindow(ReusableWindow):
+    """A column of buttons under a heading, like the Add Time and Settings menus
+
+    open() takes the buttons as (text, bg, font, command) tuples; a
+    command of None just closes the menu. Existing buttons are re-labelled
+    in place and only missing ones are created, so the usual open touches
+    a couple of options at most.
+    """
+
+    def __init__(self, master, name, title, heading, width, button_width, monitor=None):
+        super().__init__(master, name, monitor)
+        self.title = title
+        self.heading = heading
+        self.width = width
+        self.button_width = button_width
+        self.buttons = []
+        self.specs = []
+        self.commands = []
+        self.shown = 0
+
+    def build(self, window):
+        window.title(self.title)
+        window.resizable(False, False)
+        window.configure(bg=PANEL_BG)
+        window.attributes('-topmost', True)
+        tk.Label(
+            window,
+            text=self.heading,
+            fg='white',
+            bg=PANEL_BG,
+            font=('Arial', 14, 'bold')
+        ).pack(pady=10)
+        self.frame = tk.Frame(window, bg=PANEL_BG)
+        self.frame.pack(pady=10)
+
+    def refresh(self, buttons, parent=None):
+        self.window.transient(parent or self.master)
+        self.commands = [command for _, _, _, command in buttons]
+        for index, (text, bg, font, _) in enumerate(buttons):
+            spec = (text, bg, font)
+            if index == len(self.buttons):
+                self.buttons.append(tk.Button(
+                    self.frame,
+                    text=text,
+                    command=lambda index=index: self.choose(index),
+                    bg=bg,
+                    fg='white',
+                    font=font,
+                    width=self.button_width
+                ))
+                self.specs.append(spec)
+            elif self.specs[index] != spec:
+                self.buttons[index].config(text=text, bg=bg, font=font)
+                self.specs[index] = spec
+            # Buttons are only ever hidden from the end, so re-packing
+            # them in order keeps their order
+            if index >= self.shown:
+                self.buttons[index].pack(pady=5)
+        for button in self.buttons[len(buttons):self.shown]:
+            button.pack_forget()
+        if len(buttons) != self.shown:
+            self.shown = len(buttons)
+            self.window.geometry(f"{self.width}x{80 + 40 * self.shown}")
+
+    def choose(self, index):
+        command = self.commands[index]
+        self.close()
+        if command is not None:
+            command()
+
+
+class PinDialog(ReusableWindow):
+    """Asks for the PIN over the main window; `check(pin, done)` decides"""
+
+    def __init__(self, master, check, monitor=None):
+        super().__init__(master, 'pin', monitor)
+        self.check = check
+        self.on_success = None
+        # Bumped on every open, so a check finishing after a cancel is dropped
+        self.attempt = 0
+
+    def build(self, window):
+        window.title("PIN Verification")
+        window.geometry("300x420")
+        window.resizable(False, False)
+        window.configure(bg=PANEL_BG)
+        window.attributes('-topmost', True)
+        self.pad = PinPad(window, self.on_pin, self.close)
+        self.pad.pack(pady=15)
+        window.bind('<Key>', self.pad.on_key)
+
+    def refresh(self, prompt, on_success):
+        self.attempt += 1
+        self.pad.reset(prompt)
+        self.on_success = on_success
+
+    def close(self):
+        self.attempt += 1
+        super().close()
+
+    def on_pin(self, pin):
+        attempt = self.attempt
+        self.check(pin, lambda ok, wait: self.checked(attempt, ok, wait))
+
+    def checked(self, attempt, ok, wait):
+        if attempt != self.attempt:
+            return
+        if not ok:
+            self.pad.fail(pin_message(wait))
+            return
+        on_success, self.on_success = self.on_success, None
+        self.close()
+        on_success()
+
+
+class LockScreen(ReusableWindow):
+    """The TIME'S UP screen, with the shutdown countdown and an in-window PIN keypad
+
+    open(seconds) starts a countdown from `seconds`; `on_expire()` is
+    called when it runs out and `on_unlock()` once the right PIN is in.
+    """
+
+    def __init__(self, master, check, on_unlock, on_expire, clock, monitor=None):
+        super().__init__(master, 'lock screen', monitor)
+        self.check = check
+        self.on_unlock = on_unlock
+        self.on_expire = on_expire
+        self.clock = clock
+        self.deadline = None
+        self.tick_id = None
+        self.pad_shown = False
+        self.attempt = 0
+
+    def build(self, window):
+        window.protocol("WM_DELETE_WINDOW", lambda: None)
+        window.attributes('-fullscreen', True)
+        window.configure(bg='black')
+        window.attributes('-topmost', True)
+        window.bind('<Alt-F4>', lambda e: "break")
+        window.bind('<Escape>', lambda e: "break")
+        window.bind('<Control-q>', lambda e: "break")
+        window.bind('<Key>', self.on_key)
+        self.timers = self.monitor.scope(window, 'lock screen') if self.monitor is not None else window
+
+        tk.Label(
+            window,
+            text="TIME'S UP!",
+            fg='white',
+            bg='black',
+            font=('Arial', 48, 'bold')
+        ).pack(pady=50)
+
+        tk.Label(
+            window,
+            text="Please add more time to continue",
+            fg='white',
+            bg='black',
+            font=('Arial', 24)
+        ).pack(pady=20)
+
+        self.countdown_label = tk.Label(
+            window,
+            text="",
+            fg='red',
+            bg='black',
+            font=('Arial', 18, 'bold')
+        )
+        self.countdown_label.pack(pady=30)
+
+        self.add_button = tk.Button(
+            window,
+            text="➕ Add Time",
+            command=self.ask_pin,
+            bg='#4CAF50',
+            fg='white',
+            font=('Arial', 18, 'bold'),
+            padx=20,
+            pady=10
+        )
+        self.add_button.pack(pady=20)
+        self.pad = PinPad(window, self.on_pin, self.hide_pad, bg='black', size=18)
+
+    def refresh(self, seconds):
+        self.hide_pad()
+        self.deadline = self.clock() + seconds
+        self.tick()
+
+    def close(self):
+        if self.tick_id is not None:
+            self.timers.after_cancel(self.tick_id)
+            self.tick_id = None
+        super().close()
+
+    def tick(self):
+        """Show the seconds left and wake when the count next changes
+
+        The count is worked out from the deadline every time, so after a
+        stall it shows the right number instead of drifting behind.
+        """
+        if self.tick_id is not None:
+            self.timers.after_cancel(self.tick_id)
+        self.tick_id = None
+        left = self.deadline - self.clock()
+        if left > 0:
+            seconds = math.ceil(left)
+            self.countdown_label.config(text=f"This computer will shutdown after {seconds} seconds")
+            self.tick_id = self.timers.after(math.ceil((left - seconds + 1) * 1000), self.tick)
+        else:
+            self.on_expire()
+
+    def ask_pin(self):
+        self.attempt += 1
+        self.pad.reset("Enter PIN to add time:")
+        if not self.pad_shown:
+            self.pad_shown = True
+            self.add_button.pack_forget()
+            self.pad.pack(pady=20)
+
+    def hide_pad(self):
+        self.attempt += 1
+        if self.pad_shown:
+            self.pad_shown = False
+            self.pad.pack_forget()
+            self.add_button.pack(pady=20)
+
+    def on_key(self, event):
+        if self.pad_shown:
+            return self.pad.on_key(event)
+        return None
+
+    def on_pin(self, pin):
+        attempt = self.attempt
+        self.check(pin, lambda ok, wait: self.checked(attempt, ok, wait))
+
+    def checked(self, attempt, ok, wait):
+        if attempt != self.attempt or not self.visible:
+            return
+        if not ok:
+            self.pad.fail(pin_message(wait))
+            return
+        self.hide_pad()
+        self.on_unlock()
@@ -0,0 +1,192 @@
+"""Headless session bookkeeping on the monotonic clock
+
+Deadlines are kept on time.monotonic() so wall-clock jumps (NTP, or a
+customer changing the system time) cannot add or remove paid minutes.
+All deadlines live in one heap, so a single process can track thousands of
+sessions with O(log n) start/extend/expire.
+
+Warning thresholds ("5 minutes left") are edge-triggered: each session keeps
+the times at which its remaining time crosses each threshold, sorted, and a
+cursor into them, so every crossing is reported exactly once however late
+the check runs, and thresholds a session starts below never fire.
+"""
+import bisect
+import heapq
+import itertools
+import time
+
+
+class ThresholdIndex:
+    """When a session's remaining time crosses each threshold, and which have fired"""
+
+    __slots__ = ('thresholds', 'times', 'position')
+
+    def __init__(self, thresholds, deadline, now):
+        # Descending thresholds cross in ascending time order
+        self.thresholds = thresholds
+        self.times = [deadline - threshold for threshold in thresholds]
+        # A threshold at or above the time left now was never crossed from above
+        self.position = bisect.bisect_right(self.times, now)
+
+    def due(self, now):
+        """Thresholds crossed since the last call, largest first"""
+        end = bisect.bisect_right(self.times, now, self.position)
+        crossed = self.thresholds[self.position:end]
+        self.position = end
+        return crossed
+
+
+class Session:
+    """Paid time for one station"""
+
+    __slots__ = ('session_id', 'deadline', 'total_duration', 'expired', 'warnings')
+
+    def __init__(self, session_id, deadline, total_duration):
+        self.session_id = session_id
+        self.deadline = deadline
+        self.total_duration = total_duration
+        self.expired = False
+        self.warnings = None
+
+    def __repr__(self):
+        return (f"Session({self.session_id!r}, deadline={self.deadline:.3f}, "
+                f"expired={self.expired})")
+
+
+class SessionEngine:
+    """Tracks session deadlines and reports expiries in deadline order"""
+
+    def __init__(self, clock=time.monotonic, thresholds=()):
+        self.clock = clock
+        self.thresholds = tuple(sorted(set(thresholds), reverse=True))
+        self.sessions = {}
+        self._heap = []
+        self._stale = 0
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self.sessions
+
+    def get(self, session_id):
+        """Return the session, running or expired, or None"""
+        return self.sessions.get(session_id)
+
+    def start(self, session_id, seconds):
+        """Replace any existing session with a fresh one of `seconds`"""
+        if session_id in self.sessions:
+            self._discard(session_id)
+        now = self.clock()
+        session = Session(session_id, now + seconds, seconds)
+        self.sessions[session_id] = session
+        self._arm(session, now)
+        self._push(session)
+        return session
+
+    def extend(self, session_id, seconds):
+        """Add `seconds` to a running session, starting one if needed"""
+        session = self.sessions.get(session_id)
+        if session is None or session.expired:
+            return self.start(session_id, seconds)
+        self._stale += 1
+        session.deadline += seconds
+        session.total_duration += seconds
+        self._arm(session, self.clock())
+        self._push(session)
+        return session
+
+    def reset(self, session_id):
+        """Forget a session; returns True if there was one"""
+        if session_id not in self.sessions:
+            return False
+        self._discard(session_id)
+        return True
+
+    def is_running(self, session_id):
+        session = self.sessions.get(session_id)
+        return session is not None and not session.expired
+
+    def remaining(self, session_id, now=None):
+        """Seconds left on a running session, or None"""
+        session = self.sessions.get(session_id)
+        if session is None or session.expired:
+            return None
+        if now is None:
+            now = self.clock()
+        return max(0.0, session.deadline - now)
+
+    def set_thresholds(self, thresholds):
+        """Change the warning thresholds; running sessions re-arm from now"""
+        self.thresholds = tuple(sorted(set(thresholds), reverse=True))
+        now = self.clock()
+        for session in self.sessions.values():
+            if not session.expired:
+                self._arm(session, now)
+
+    def warnings_due(self, session_id, now=None):
+        """Thresholds the session has crossed since the last call, largest first
+
+        Each crossing is returned exactly once, however late this is called.
+        """
+        session = self.sessions.get(session_id)
+        if session is None or session.warnings is None:
+            return ()
+        if now is None:
+            now = self.clock()
+        return session.warnings.due(now)
+
+    def next_deadline(self):
+        """Earliest deadline of any running session, or None"""
+        heap = self._heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+            self._stale -= 1
+        return heap[0][0] if heap else None
+
+    def expire_due(self, now=None):
+        """Mark every session whose deadline has passed as expired
+
+        Each session is returned exactly once, in deadline order.
+        """
+        if now is None:
+            now = self.clock()
+        heap = self._heap
+        expired = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if not self._is_live(entry):
+                self._stale -= 1
+                continue
+            session = self.sessions[entry[2]]
+            session.expired = True
+            expired.append(session)
+        return expired
+
+    def _arm(self, session, now):
+        session.warnings = ThresholdIndex(self.thresholds, session.deadline, now) if self.thresholds else None
+
+    def _push(self, session):
+        heapq.heappush(self._heap, (session.deadline, next(self._counter), session.session_id))
+        # Extends and resets leave superseded entries behind; rebuild the
+        # heap once they outnumber the live ones so it cannot grow unbounded.
+        if self._stale > 64 and self._stale > len(self.sessions):
+            self._compact()
+
+    def _discard(self, session_id):
+        session = self.sessions.pop(session_id)
+        if not session.expired:
+            self._stale += 1
+
+    def _is_live(self, entry):
+        session = self.sessions.get(entry[2])
+        return session is not None and not session.expired and session.deadline == entry[0]
+
+    def _compact(self):
+        self._heap = [
+            (s.deadline, next(self._counter), s.session_id)
+            for s in self.sessions.values() if not s.expired
+        ]
+        heapq.heapify(self._heap)
+        self._stale = 0
@@ -0,0 +1,655 @@
+"""Headless, virtual-clock simulation of the timer app
+
+Runs the real FullscreenTimerApp against a stand-in for tkinter whose
+after() queue is driven by a virtual clock, so whole sessions (top-ups,
+the 5-minute warning, expiry, the lock screen and its shutdown countdown,
+extending from the lock screen) play out thousands of times faster than
+real time and without a display:
+
+    with Simulation() as sim:
+        sim.add_time(minutes=10)
+        sim.advance(600)
+        assert sim.first('lock') is not None
+
+PINs are typed on the app's keypads as key events; simpledialog and
+messagebox are replaced by ScriptedDialogs, which answers from a queue. Sounds and shutdown are recorded as events instead of being
+performed, and keyboard hooks go to a FakeKeyboardBackend (sim.keyboard).
+
+With real_tk=True the windows are real Tk widgets (run it under Xvfb on
+a headless machine) and only after() is moved onto the virtual clock, so
+widget and image lifetimes can be checked against the real toolkit.
+"""
+import atexit
+import collections
+import heapq
+import json
+import shutil
+import tempfile
+import time
+import tkinter
+import types
+
+import glyph_clock
+import notifications
+import screens
+import timer
+from keyboard_policy import FakeKeyboardBackend
+
+SCREEN_SIZE = (1920, 1080)
+# Height every stand-in widget reports; only the toast stacking uses it
+REQ_HEIGHT = 60
+
+
+class VirtualClock:
+    """Monotonic and wall clocks that only move when told to"""
+
+    def __init__(self, start=1000.0, wall_start=None):
+        self.now = start
+        self.wall_offset = (time.time() if wall_start is None else wall_start) - start
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now + self.wall_offset
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class EventLoop:
+    """The after() queue of the stand-in Tk, run on a VirtualClock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.queue = []
+        self.callbacks = {}
+        self.sequence = 0
+        self.executed = 0
+        self.widget_calls = 0
+        self.late = []
+
+    def after(self, ms, fn, *args):
+        self.sequence += 1
+        after_id = f"after#{self.sequence}"
+        due = self.clock.now + max(0, ms) / 1000.0
+        self.callbacks[after_id] = (fn, args)
+        heapq.heappush(self.queue, (due, self.sequence, after_id))
+        return after_id
+
+    def after_idle(self, fn, *args):
+        return self.after(0, fn, *args)
+
+    def after_cancel(self, after_id):
+        self.callbacks.pop(after_id, None)
+
+    @property
+    def pending(self):
+        return len(self.callbacks)
+
+    def stall(self, seconds):
+        """Block the loop: time passes, nothing runs (like a modal dialog)"""
+        self.clock.advance(seconds)
+
+    def run_until(self, until):
+        """Run every callback due up to virtual time `until`, in order"""
+        while self.queue and self.queue[0][0] <= until:
+            due, _, after_id = heapq.heappop(self.queue)
+            callback = self.callbacks.pop(after_id, None)
+            if callback is None:
+                continue
+            if due > self.clock.now:
+                self.clock.now = due
+            else:
+                # Behind schedule because a callback stalled the loop
+                self.late.append(self.clock.now - due)
+            fn, args = callback
+            self.executed += 1
+            fn(*args)
+        if until > self.clock.now:
+            self.clock.now = until
+
+    def run_for(self, seconds):
+        self.run_until(self.clock.now + seconds)
+
+
+class TclError(Exception):
+    pass
+
+
+class Widget:
+    """Accepts the tkinter calls the app makes and remembers the options"""
+
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.loop = master.loop if master is not None else None
+        self.options = options
+        self.children = []
+        self.bindings = {}
+        self.attrs = {}
+        self.packed = False
+        self.mapped = True
+        self.destroyed = False
+        if master is not None:
+            master.children.append(self)
+
+    def _call(self):
+        if self.loop is not None:
+            self.loop.widget_calls += 1
+
+    def config(self, **options):
+        self._call()
+        self.options.update(options)
+
+    configure = config
+
+    def cget(self, key):
+        return self.options.get(key)
+
+    def keys(self):
+        return list(self.options)
+
+    def pack(self, **options):
+        self._call()
+        self.packed = True
+
+    grid = place = pack
+
+    def pack_forget(self):
+        self._call()
+        self.packed = False
+
+    def attributes(self, *args):
+        self._call()
+        for name, value in zip(args[::2], args[1::2]):
+            self.attrs[name] = value
+
+    def bind(self, sequence, func=None, add=None):
+        handlers = self.bindings.setdefault(sequence, [])
+        if not add:
+            handlers.clear()
+        handlers.append(func)
+        return f"{id(self)}{sequence}{len(handlers)}"
+
+    def unbind(self, sequence, funcid=None):
+        self.bindings.pop(sequence, None)
+
+    def event_generate(self, sequence, when=None):
+        event = types.SimpleNamespace(widget=self)
+        for handler in list(self.bindings.get(sequence, ())):
+            if when == 'tail':
+                self.loop.after_idle(handler, event)
+            else:
+                handler(event)
+
+    def after(self, ms, fn, *args):
+        return self.loop.after(ms, fn, *args)
+
+    def after_idle(self, fn, *args):
+        return self.loop.after_idle(fn, *args)
+
+    def after_cancel(self, after_id):
+        self.loop.after_cancel(after_id)
+
+    def withdraw(self):
+        self._call()
+        if self.mapped:
+            self.mapped = False
+            self.event_generate('<Unmap>')
+
+    iconify = withdraw
+
+    def deiconify(self):
+        self._call()
+        if not self.mapped:
+            self.mapped = True
+            self.event_generate('<Map>')
+
+    def destroy(self):
+        if self.destroyed:
+            return
+        for child in list(self.children):
+            child.destroy()
+        self.destroyed = True
+        if self.master is not None and self in self.master.children:
+            self.master.children.remove(self)
+
+    def invoke(self):
+        command = self.options.get('command')
+        if command is not None:
+            return command()
+
+    def winfo_exists(self):
+        return 0 if self.destroyed else 1
+
+    def winfo_ismapped(self):
+        return int(self.packed and not self.destroyed)
+
+    def winfo_children(self):
+        return list(self.children)
+
+    def winfo_screenwidth(self):
+        return SCREEN_SIZE[0]
+
+    def winfo_screenheight(self):
+        return SCREEN_SIZE[1]
+
+    def winfo_reqheight(self):
+        return REQ_HEIGHT
+
+    def winfo_width(self):
+        return SCREEN_SIZE[0]
+
+    def winfo_height(self):
+        return SCREEN_SIZE[1]
+
+    def title(self, *args):
+        pass
+
+    def geometry(self, *args):
+        self._call()
+
+    def protocol(self, *args):
+        pass
+
+    def resizable(self, *args):
+        pass
+
+    def overrideredirect(self, *args):
+        pass
+
+    def eval(self, *args):
+        pass
+
+    def grab_set(self):
+        pass
+
+    def grab_release(self):
+        pass
+
+    def grab_current(self):
+        return None
+
+    def transient(self, *args):
+        pass
+
+    def lift(self):
+        pass
+
+    def focus_set(self):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+
+class Canvas(Widget):
+    """Canvas items are kept as option dicts"""
+
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.items = {}
+        self.last_item = 0
+
+    def _create(self, kind, coords, options):
+        self._call()
+        self.last_item += 1
+        self.items[self.last_item] = dict(options, kind=kind, coords=coords)
+        return self.last_item
+
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, options)
+
+    def create_image(self, *coords, **options):
+        return self._create('image', coords, options)
+
+    def itemconfigure(self, item, **options):
+        self._call()
+        self.items[item].update(options)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, item, key):
+        return self.items[item].get(key)
+
+    def coords(self, item, *coords):
+        self._call()
+        if coords:
+            self.items[item]['coords'] = coords
+        return self.items[item]['coords']
+
+    def delete(self, *items):
+        self._call()
+        for item in items:
+            if item == 'all':
+                self.items.clear()
+            else:
+                self.items.pop(item, None)
+
+
+class Toplevel(Widget):
+    """On screen while mapped, rather than while packed"""
+
+    def winfo_ismapped(self):
+        return int(self.mapped and not self.destroyed)
+
+
+class Font:
+    """Font stand-in; every character is 0.6 em wide"""
+
+    def __init__(self, root=None, font=None, **options):
+        self.size = abs(font[1]) if font else 12
+
+    def measure(self, text):
+        return len(text) * self.size * 6 // 10
+
+    def metrics(self, option):
+        return {'ascent': self.size, 'descent': self.size // 4, 'linespace': self.size * 5 // 4}[option]
+
+
+class PhotoImage:
+    """Image stand-in; counts the pixels it is asked to fill"""
+
+    def __init__(self, master=None, width=0, height=0, **options):
+        self._width = width
+        self._height = height
+        self.puts = 0
+
+    def put(self, data, to=None):
+        self.puts += 1
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+
+def tk_module(loop):
+    """A stand-in for the tkinter module whose windows share `loop`"""
+
+    class Tk(Widget):
+        def __init__(self):
+            super().__init__()
+            self.loop = loop
+
+        def mainloop(self):
+            while loop.queue:
+                loop.run_until(loop.queue[0][0])
+
+    return types.SimpleNamespace(
+        Tk=Tk,
+        Toplevel=Toplevel,
+        Frame=Widget,
+        Label=Widget,
+        Button=Widget,
+        Entry=Widget,
+        Canvas=Canvas,
+        PhotoImage=PhotoImage,
+        TclError=TclError,
+        font=types.SimpleNamespace(Font=Font),
+    )
+
+
+def find_widget(widget, text):
+    """First widget on screen under `widget` (depth first) whose text starts with `text`"""
+    for child in widget.winfo_children():
+        if not child.winfo_ismapped():
+            continue
+        if 'text' in child.keys() and str(child.cget('text') or '').startswith(text):
+            return child
+        found = find_widget(child, text)
+        if found is not None:
+            return found
+    return None
+
+
+class ScriptedDialogs:
+    """Stands in for simpledialog and messagebox, answering from a script
+
+    askstring() returns the next queued answer (None, i.e. Cancel, once the
+    queue is empty) after `typing_delay` seconds of blocked loop, which is
+    what a modal dialog does to the real Tk loop.
+    """
+
+    def __init__(self, loop, typing_delay=0.0):
+        self.loop = loop
+        self.typing_delay = typing_delay
+        self.answers = collections.deque()
+        self.confirm = True
+        self.shown = []
+
+    def askstring(self, title, prompt, **options):
+        self.shown.append(('askstring', title))
+        if self.typing_delay:
+            self.loop.stall(self.typing_delay)
+        return self.answers.popleft() if self.answers else None
+
+    def askyesno(self, title, message, **options):
+        self.shown.append(('askyesno', title))
+        return self.confirm
+
+    def showerror(self, title, message, **options):
+        self.shown.append(('error', title))
+
+    def showinfo(self, title, message, **options):
+        self.shown.append(('info', title))
+
+    showwarning = showinfo
+
+
+class SimulatedTimerApp(timer.FullscreenTimerApp):
+    """The timer app with sounds and shutdown recorded as events"""
+
+    def __init__(self, events, **kwargs):
+        self.events = events
+        super().__init__(**kwargs)
+
+    def record_event(self, kind, detail=None):
+        self.events.append((self.clock(), kind, detail))
+
+    def setup_sounds(self):
+        self.mark_startup('audio_ready')
+
+    def play_sound(self, sound_type):
+        if self.sound_enabled:
+            self.record_event('sound', sound_type)
+
+    def show_notification(self, message, bg_color='#ff9800', display_time=5000):
+        self.record_event('notification', message)
+        super().show_notification(message, bg_color, display_time)
+
+    def show_shutdown_warning(self):
+        was_locked = self.lock_screen.visible
+        super().show_shutdown_warning()
+        if not was_locked:
+            self.record_event('lock')
+
+    def shutdown_computer(self):
+        self.record_event('shutdown')
+
+
+class Simulation:
+    """One headless timer station on a virtual clock
+
+    The journal, ledger, config, member database, event log and state file
+    go to a throwaway directory unless `data_dir` is given. Use as a context
+    manager, or call close().
+    """
+
+    def __init__(self, data_dir=None, typing_delay=0.0, real_tk=False, **app_options):
+        self.clock = VirtualClock()
+        self.loop = EventLoop(self.clock)
+        self.dialogs = ScriptedDialogs(self.loop, typing_delay)
+        self.events = []
+        self.keyboard = FakeKeyboardBackend()
+        self.own_dir = data_dir is None
+        self.data_dir = tempfile.mkdtemp(prefix='timer-sim-') if data_dir is None else data_dir
+
+        self.real_tk = real_tk
+        self.saved = (timer.tk, timer.simpledialog, timer.messagebox, notifications.tk, glyph_clock.tk,
+                      screens.tk)
+        self.saved_after = (tkinter.Misc.after, tkinter.Misc.after_idle, tkinter.Misc.after_cancel)
+        if real_tk:
+            loop = self.loop
+            tkinter.Misc.after = lambda widget, ms, func=None, *args: loop.after(ms, func, *args)
+            tkinter.Misc.after_idle = lambda widget, func, *args: loop.after_idle(func, *args)
+            tkinter.Misc.after_cancel = lambda widget, after_id: loop.after_cancel(after_id)
+        else:
+            timer.tk = notifications.tk = glyph_clock.tk = screens.tk = tk_module(self.loop)
+        timer.simpledialog = timer.messagebox = self.dialogs
+        try:
+            app_options.setdefault('journal_path', f"{self.data_dir}/session.journal")
+            app_options.setdefault('ledger_dir', f"{self.data_dir}/ledger")
+            app_options.setdefault('config_path', f"{self.data_dir}/config.json")
+            app_options.setdefault('members_path', f"{self.data_dir}/members.db")
+            app_options.setdefault('event_dir', f"{self.data_dir}/events")
+            app_options.setdefault('state_path', f"{self.data_dir}/state.bin")
+            app_options.setdefault('station_id', 'SIM')
+            app_options.setdefault('keyboard_backend', lambda: self.keyboard)
+            app_options.setdefault('power_backend', 'dry-run')
+            # A cheap PIN hash; the harness waits for every check anyway
+            app_options.setdefault('pin_cost', 0.001)
+            self.app = SimulatedTimerApp(
+                self.events,
+                clock=self.clock.monotonic,
+                wall_clock=self.clock.time,
+                **app_options
+            )
+        except Exception:
+            self._restore()
+            raise
+        self.started = self.clock.now
+        self.app.main_window.event_generate('<Expose>')
+        self.settle()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.app.cleanup()
+        atexit.unregister(self.app.cleanup)
+        self._restore()
+        if self.own_dir:
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def _restore(self):
+        (timer.tk, timer.simpledialog, timer.messagebox, notifications.tk, glyph_clock.tk,
+         screens.tk) = self.saved
+        tkinter.Misc.after, tkinter.Misc.after_idle, tkinter.Misc.after_cancel = self.saved_after
+
+    @property
+    def elapsed(self):
+        """Virtual seconds since the station started"""
+        return self.clock.now - self.started
+
+    def advance(self, seconds):
+        """Let `seconds` of virtual time pass, running everything that falls due"""
+        if not self.real_tk:
+            self.loop.run_for(seconds)
+            return
+        # Let Tk redraw and deliver window events once per virtual second
+        until = self.clock.now + seconds
+        while self.clock.now < until:
+            self.loop.run_until(min(until, self.clock.now + 1.0))
+            self.app.main_window.update()
+
+    def settle(self):
+        """Run what is due now (and, with real Tk, pending window events)"""
+        self.loop.run_for(0)
+        if self.real_tk:
+            self.app.main_window.update()
+
+    def click(self, text, window=None):
+        """Press the button whose label starts with `text`"""
+        button = find_widget(window or self.app.main_window, text)
+        if button is None:
+            raise LookupError(f"no button labelled {text!r}")
+        button.invoke()
+        self.settle()
+
+    def enter_pin(self, pin=None):
+        """Enter a PIN (the configured one by default) on the keypad that is up, then OK
+
+        Takes `typing_delay` seconds, during which the loop keeps running.
+        The check runs on the PIN worker in real time; the harness waits
+        for it, so to the virtual clock it takes no time.
+        """
+        lock = self.app.lock_screen
+        if lock.visible and lock.pad_shown:
+            pad = lock.pad
+        elif self.app.pin_dialog.visible:
+            pad = self.app.pin_dialog.pad
+        else:
+            raise LookupError("no PIN keypad is up")
+        if self.dialogs.typing_delay:
+            self.loop.run_for(self.dialogs.typing_delay)
+        # Keys that are not on the keypad come from the keyboard
+        for char in self.app.config.pin if pin is None else pin:
+            pad.press(char)
+        pad.press('OK')
+        self.app.pin_service.join()
+        # Without a running mainloop the worker's wake-up event may not
+        # get through; the result is queued either way
+        self.app.dispatcher.drain()
+        self.settle()
+
+    def add_time(self, minutes=None, seconds=None, window=None, pin=None):
+        """Top up through the UI: Add Time, the PIN keypad and the custom amount"""
+        self.click("➕ Add Time", window)
+        self.enter_pin(pin)
+        self.dialogs.answers.append(str(minutes if minutes is not None else seconds))
+        self.click("Custom Minutes" if minutes is not None else "Custom Seconds")
+
+    def buy_package(self, label, window=None):
+        """Top up with a one-tap package from the Add Time menu"""
+        self.click("➕ Add Time", window)
+        self.enter_pin()
+        self.click(label)
+
+    def sign_in_member(self, member_id, window=None):
+        """Put a member's balance on the clock from the Add Time menu"""
+        self.click("➕ Add Time", window)
+        self.enter_pin()
+        self.dialogs.answers.append(member_id)
+        self.click("👤 Member")
+
+    def settings(self, label):
+        """Press a button in the PIN-protected Settings menu"""
+        self.click("⚙ Settings")
+        self.enter_pin()
+        self.click(label)
+
+    def write_config(self, settings):
+        """Replace the station's config file; the app picks it up on its next check"""
+        with open(self.app.config_source.path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f)
+
+    def extend_from_lock_screen(self, minutes=None, seconds=None):
+        """Top up from the TIME'S UP screen"""
+        if not self.app.lock_screen.visible:
+            raise LookupError("lock screen is not up")
+        self.add_time(minutes, seconds, window=self.app.lock_screen.window)
+
+    def minimize(self):
+        self.app.main_window.iconify()
+        self.settle()
+
+    def restore(self):
+        self.app.main_window.deiconify()
+        self.settle()
+
+    def first(self, kind, detail=None, after=None):
+        """Virtual time (seconds since start) of the first matching event, or None"""
+        for at, event_kind, event_detail in self.events:
+            at -= self.started
+            if event_kind == kind and (detail is None or event_detail == detail) \
+                    and (after is None or at >= after):
+                return at
+        return None
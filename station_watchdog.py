@@ -0,0 +1,293 @@
+"""Shared-memory snapshot of the timer's state, and a watchdog that relaunches it
+
+Killing timer.py (from Task Manager, say) must not mean free time. The
+app keeps a fixed 40-byte record in a memory-mapped file:
+
+    magic 'TMRS', version, flags (running, locked, paused, stopped), pid,
+    sequence, heartbeat counter, wall-clock deadline, time of the last beat
+
+StatePublisher rewrites it in place on the Tk thread: the state and the
+heartbeat whenever a clock tick publishes them, and the heartbeat on the
+config check every HEARTBEAT_MS besides, so a beat shows the Tk loop is
+alive without waking an idle station any more often than it already was. A file rather than an anonymous segment keeps
+the last state readable after the timer is gone, the same way on Windows
+and Linux. The sequence field makes updates atomic for readers: it is odd
+while a write is under way, and a read that saw it change is retried.
+
+The watchdog runs the timer as its child and reads the record every
+POLL_INTERVAL seconds with struct.unpack_from straight off the mapping
+(no read() call, no copy of the file). When the child exits, or its
+heartbeat stops for STALE_SECONDS, the timer is relaunched with the same
+deadline; if the time had run out (or the lock screen was up) the OS
+session is locked first through the power backend:
+
+    python station_watchdog.py -- python timer.py --audio dummy
+
+The timer is started with --state-file (and --deadline on a relaunch)
+appended to the command. Stopping the timer with Ctrl-C marks the record
+stopped, and the watchdog exits with it.
+"""
+import argparse
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+from paths import data_dir
+from power import PowerManager, make_backend
+
+MAGIC = b'TMRS'
+VERSION = 1
+# magic, version, flags, pid, sequence, heartbeat, deadline, time of the last beat
+LAYOUT = struct.Struct('<4sHHIIQdd')
+SEQUENCE = struct.Struct('<I')
+SEQUENCE_OFFSET = 12
+# Flags
+RUNNING = 1
+LOCKED = 2
+PAUSED = 4
+STOPPED = 8
+
+# The longest the timer goes between beats: its config check
+# (config.CHECK_INTERVAL_MS), which runs even when it is idle
+HEARTBEAT_MS = 5000
+POLL_INTERVAL = 0.25
+# Three missed heartbeats
+STALE_SECONDS = 3 * HEARTBEAT_MS / 1000
+# Time a fresh timer gets to import, draw and write its first beat
+STARTUP_GRACE = 30.0
+RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 30.0
+READ_RETRIES = 100
+
+Snapshot = namedtuple('Snapshot', 'flags pid heartbeat deadline beat_time')
+
+
+def default_state_path():
+    """Per-user location of the state file"""
+    return os.path.join(data_dir(), 'state.bin')
+
+
+class StatePublisher:
+    """Keeps the state record up to date; one writer (the Tk thread)"""
+
+    def __init__(self, path, pid=None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            if os.fstat(fd).st_size < LAYOUT.size:
+                os.ftruncate(fd, LAYOUT.size)
+            self.map = mmap.mmap(fd, LAYOUT.size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        self.pid = os.getpid() if pid is None else pid
+        self.flags = 0
+        self.deadline = 0.0
+        self.heartbeat = 0
+        self.beat_time = 0.0
+        # Carry on from the last run's sequence (made even) so readers see a change
+        self.sequence = SEQUENCE.unpack_from(self.map, SEQUENCE_OFFSET)[0] & ~1
+        self.write()
+
+    def update(self, deadline, running, locked, paused):
+        """Publish the session state; `deadline` is wall-clock time (0 for none)"""
+        flags = (RUNNING if running else 0) | (LOCKED if locked else 0) | (PAUSED if paused else 0)
+        if flags != self.flags or deadline != self.deadline:
+            self.flags = flags
+            self.deadline = deadline
+            self.write()
+
+    def beat(self, now):
+        self.heartbeat += 1
+        self.beat_time = now
+        self.write()
+
+    def mark_stopped(self):
+        """The timer is being shut down on purpose; the watchdog should not relaunch it"""
+        self.flags |= STOPPED
+        self.write()
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def write(self):
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        SEQUENCE.pack_into(self.map, SEQUENCE_OFFSET, self.sequence)
+        LAYOUT.pack_into(self.map, 0, MAGIC, VERSION, self.flags, self.pid, self.sequence,
+                         self.heartbeat, self.deadline, self.beat_time)
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        SEQUENCE.pack_into(self.map, SEQUENCE_OFFSET, self.sequence)
+
+
+class StateReader:
+    """Reads the state record off the mapping; None until a timer has written one"""
+
+    def __init__(self, path):
+        self.path = path
+        self.map = None
+
+    def read(self):
+        if self.map is None and not self._open():
+            return None
+        for _ in range(READ_RETRIES):
+            fields = LAYOUT.unpack_from(self.map)
+            if fields[0] != MAGIC or fields[1] != VERSION:
+                return None
+            if not fields[4] & 1 and SEQUENCE.unpack_from(self.map, SEQUENCE_OFFSET)[0] == fields[4]:
+                break
+        # Otherwise the writer was killed mid-update and the sequence stays
+        # odd; what it got to write is still the best there is
+        return Snapshot(fields[2], fields[3], fields[5], fields[6], fields[7])
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def _open(self):
+        try:
+            fd = os.open(self.path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        except FileNotFoundError:
+            return False
+        try:
+            if os.fstat(fd).st_size < LAYOUT.size:
+                return False
+            self.map = mmap.mmap(fd, LAYOUT.size, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        return True
+
+
+class Watchdog:
+    """Runs the timer and relaunches it when it exits or its heartbeat stops"""
+
+    def __init__(self, command, state_path, power, poll_interval=POLL_INTERVAL, stale=STALE_SECONDS,
+                 startup_grace=STARTUP_GRACE, clock=time.monotonic, wall_clock=time.time,
+                 launch=subprocess.Popen):
+        self.command = list(command)
+        self.state_path = state_path
+        self.power = power
+        self.poll_interval = poll_interval
+        self.stale = stale
+        self.startup_grace = startup_grace
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.launcher = launch
+        self.reader = StateReader(state_path)
+        self.process = None
+        # The latest snapshot written by the running timer, and when its
+        # heartbeat last moved; `state` outlives a relaunch, so a timer
+        # killed again before it has written anything keeps its deadline
+        self.current = None
+        self.state = None
+        self.beat_seen_at = None
+        self.old_pid = None
+        self.restart_delay = RESTART_DELAY
+        self.launches = 0
+        self.locks = 0
+
+    def arguments(self, snapshot):
+        """The timer's command line, holding it to `snapshot`'s deadline if time is left"""
+        args = self.command + ['--state-file', self.state_path]
+        if (snapshot is not None and snapshot.flags & RUNNING and not snapshot.flags & LOCKED
+                and snapshot.deadline > self.wall_clock()):
+            args += ['--deadline', repr(snapshot.deadline)]
+        return args
+
+    def launch(self, snapshot=None):
+        # Whatever is in the file now belongs to the previous run
+        previous = self.reader.read()
+        self.old_pid = previous.pid if previous is not None else None
+        self.current = None
+        self.process = self.launcher(self.arguments(snapshot))
+        self.beat_seen_at = self.clock()
+        self.launches += 1
+
+    def poll(self):
+        """One look at the timer; returns False once it has been stopped on purpose"""
+        now = self.clock()
+        snapshot = self.reader.read()
+        if snapshot is not None and snapshot.pid != self.old_pid:
+            if self.current is None or snapshot.heartbeat != self.current.heartbeat:
+                self.beat_seen_at = now
+            self.current = self.state = snapshot
+        exited = self.process.poll() is not None
+        if exited and self.current is not None and self.current.flags & STOPPED:
+            return False
+        limit = self.stale if self.current is not None else self.startup_grace
+        if not exited and now - self.beat_seen_at < limit:
+            return True
+        if exited:
+            print(f"Watchdog: timer exited with status {self.process.returncode}")
+        else:
+            print(f"Watchdog: no heartbeat for {now - self.beat_seen_at:.1f} s, restarting the timer")
+            self.process.kill()
+            self.process.wait()
+        self.recover()
+        return True
+
+    def recover(self):
+        """Lock the station if its time was up, then start the timer again"""
+        snapshot = self.state
+        if snapshot is not None and (snapshot.flags & LOCKED or
+                                     (snapshot.flags & RUNNING and snapshot.deadline <= self.wall_clock())):
+            ok, detail = self.power.run('lock')
+            self.locks += 1
+            print("Watchdog: time was up, locked the station" if ok else f"Watchdog: failed to lock: {detail}")
+        # A timer that dies before its first heartbeat (a broken install,
+        # say) is retried less and less often; one that was killed while
+        # up comes straight back
+        if self.current is None:
+            delay = self.restart_delay
+            self.restart_delay = min(MAX_RESTART_DELAY, delay * 2)
+        else:
+            delay = 0.0
+            self.restart_delay = RESTART_DELAY
+        time.sleep(delay)
+        self.launch(snapshot)
+
+    def run(self):
+        self.launch()
+        try:
+            while self.poll():
+                time.sleep(self.poll_interval)
+        finally:
+            self.reader.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Relaunch the timer if it is killed",
+                                     usage="%(prog)s [options] -- python timer.py [timer options]")
+    parser.add_argument('--state', default=None, help="state file (default: per-user data dir)")
+    parser.add_argument('--power', choices=('auto', 'windows', 'systemd', 'dry-run'), default='auto',
+                        help="how to lock the station when its time ran out")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help="seconds between checks")
+    parser.add_argument('--stale', type=float, default=STALE_SECONDS,
+                        help="seconds without a heartbeat before the timer counts as hung")
+    parser.add_argument('command', nargs=argparse.REMAINDER, help="the timer's command line")
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+    if not command:
+        parser.error("no timer command given")
+
+    watchdog = Watchdog(
+        command,
+        args.state or default_state_path(),
+        PowerManager(make_backend(args.power), lambda *result: None),
+        poll_interval=args.interval,
+        stale=args.stale
+    )
+    try:
+        watchdog.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,52 @@
+import time
+STARTUP_STARTED = time.perf_counter()
 import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox
-from datetime import datetime, timedelta
-import pygame
-from pygame import mixer
 import os
 import sys
-import keyboard
-import time
 import atexit
+import argparse
+import json
+import socket
+from scheduler import TickScheduler, next_tick_delay
+from session_engine import SessionEngine
+from tk_bridge import TkDispatcher
+from notifications import NotificationManager
+from metrics import EXPORT_INTERVAL_MS, LoopMonitor, MetricsExporter
+import journal
+import eventlog
+from ledger import MAX_PRICE, Ledger, default_ledger_dir, price_for_seconds
+from config import CHECK_INTERVAL_MS, ConfigSource, default_config_path
+from power import PowerManager, make_backend
+from pin_service import TARGET_SECONDS, PinService
+from station_watchdog import StatePublisher, default_state_path
+from viewmodel import ADDED_COLOR, WARNING_COLOR, DisplayBinder, compute_display_state
+from glyph_clock import GlyphClock
+from screens import LockScreen, MenuWindow, PinDialog
+from warning_schedule import load_warnings
+from keyboard_policy import KeyboardPolicy, default_backend as default_keyboard_backend
+IMPORTS_DONE = time.perf_counter()
+# pygame, keyboard and the fleet client are imported lazily, after the
+# clock is on screen, so a rebooted station shows the time as fast as possible.
+
+LOCAL_SESSION = 'local'
+JOURNAL_SYNC_MS = 250
 
 class FullscreenTimerApp:
-    def __init__(self):
-        # Initialize pygame mixer
-        pygame.init()
-        mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    def __init__(self, station_id=None, coordinator=None, fleet_key_file=None, startup_timing=False, journal_path=None,
+                 ledger_dir=None, metrics_file=None, metrics_port=None, warnings=None, config_path=None,
+                 members_path=None, event_dir=None, state_path=None, deadline=None,
+                 control=None, control_token_file=None, keyboard_backend=default_keyboard_backend,
+                 audio_backend='pygame', power_backend='auto', pin_cost=TARGET_SECONDS,
+                 clock=time.monotonic, wall_clock=time.time):
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.startup_timing = startup_timing
+        self.startup_marks = {'imports': IMPORTS_DONE - STARTUP_STARTED}
+        self.audio = None
+        self.audio_backend = audio_backend
+        self.keyboard_backend = keyboard_backend
+        self.keyboard_policy = None
         atexit.register(self.cleanup)
         
         # Main Window Setup
@@ -23,109 +56,253 @@ class FullscreenTimerApp:
         self.main_window.configure(bg='black')
         self.main_window.protocol("WM_DELETE_WINDOW", self.prevent_close)
         self.main_window.resizable(False, False)
+        self.dispatcher = TkDispatcher(self.main_window)
+        self.main_window.after_idle(self.dispatcher.drain)
         
-        # Block keyboard shortcuts
-        self.setup_keyboard_blocking()
+        # Shutdown and friends run on a worker thread and report back here
+        self.power = PowerManager(
+            make_backend(power_backend),
+            lambda *result: self.dispatcher.call(self.on_power_result, *result)
+        )
         
-        # Load sound files
-        self.setup_sounds()
+        # What happened and when, for diagnosing a station; written by a
+        # background thread so the Tk loop never waits on the disk. Started
+        # first so errors from everything below are kept.
+        self.station_id = station_id or socket.gethostname()
+        self.event_log = eventlog.EventLog(event_dir or eventlog.default_event_dir(), self.station_id,
+                                           clock=wall_clock)
+        self.event_log.start()
+        
+        # Shop settings, re-read whenever the file changes; a --warnings
+        # schedule takes precedence over the config's
+        self.config_source = ConfigSource(config_path or default_config_path(), on_error=self.log_error)
+        self.config = self.config_source.config
+        self.fixed_warnings = warnings
+        
+        # PINs are hashed and checked on a worker thread, so a deliberately
+        # slow hash never stalls the clock; wrong ones lock entry for a while
+        self.pin_service = PinService(self.dispatch_pin_result, clock=clock, target=pin_cost)
+        self.pin_service.set_pin(self.config)
+        self.pin_service.start()
         
         # Timer state
-        self.notification_time = None
-        self.timer_running = False
+        self.warnings = {warning.seconds: warning for warning in warnings or self.config.warnings}
+        self.engine = SessionEngine(clock=clock, thresholds=self.warnings)
+        self.session_id = LOCAL_SESSION
         self.sound_enabled = True
-        self.current_warning_window = None
         self.is_fullscreen = True
-        self.sound_playing = False
-        self.active_notifications = []
-        self.five_min_warning_played = False
-        self.timeout_sound_played = False
-        self.total_duration = 0
-        self.timeout_shown = False
+        # Seconds banked on this station by Pause, who is signed in, and
+        # the time added on top of their grant while they were
+        self.paused_remaining = None
+        self.member_id = None
+        self.member_extra = 0
+        self.display_visible = True
+        
+        # Crash-safe record of the session, replayed on launch
+        self.journal = journal.SessionJournal(journal_path or journal.default_journal_path(), clock=wall_clock)
+        self.journal_flush_id = None
+        
+        # Revenue and usage ledger of every top-up
+        self.ledger = Ledger(ledger_dir or default_ledger_dir())
+        
+        # Deadline, lock state and a heartbeat in a memory-mapped file, for
+        # the watchdog that relaunches a killed timer
+        self.state_board = None
+        try:
+            self.state_board = StatePublisher(state_path or default_state_path())
+        except (OSError, ValueError) as e:
+            self.log_error(f"State file error: {e}")
+        
+        # Prepaid member balances, opened on first use
+        self.members_path = members_path
+        self.members = None
+        
+        # Loop lag and handler time per subsystem (perf_counter is finer
+        # grained than monotonic on Windows; a simulated clock is used as is)
+        self.loop_monitor = LoopMonitor(self.station_id, time.perf_counter if clock is time.monotonic else clock)
+        self.display_timers = self.loop_monitor.scope(self.main_window, 'display')
+        self.metrics = None
+        if metrics_file or metrics_port is not None:
+            self.metrics = MetricsExporter(self.loop_monitor, metrics_file, metrics_port)
+            try:
+                self.metrics.start()
+            except OSError as e:
+                self.log_error(f"Metrics endpoint error: {e}")
+            self.main_window.after(EXPORT_INTERVAL_MS, self.export_metrics)
+        self.config_timers = self.loop_monitor.scope(self.main_window, 'config')
+        self.config_timers.after(CHECK_INTERVAL_MS, self.check_config)
         
         # UI Setup
         self.setup_ui()
+        self.notifications = NotificationManager(
+            self.main_window,
+            timers=self.loop_monitor.scope(self.main_window, 'notifications')
+        )
+        
+        # Dialogs and the lock screen are built withdrawn once the clock is up, then reused
+        self.pin_dialog = PinDialog(self.main_window,
+                                    lambda pin, done: self.check_pin(pin, 'main window', done),
+                                    self.loop_monitor)
+        self.time_menu = MenuWindow(self.main_window, 'time menu', "Add Time", "ADD TIME OPTIONS",
+                                    300, 15, self.loop_monitor)
+        self.settings_menu = MenuWindow(self.main_window, 'settings menu', "Settings", "SETTINGS",
+                                        250, 20, self.loop_monitor)
+        self.lock_screen = LockScreen(
+            self.main_window,
+            lambda pin, done: self.check_pin(pin, 'lock screen', done),
+            lambda: self.show_time_options(self.lock_screen.window),
+            self.shutdown_computer,
+            clock,
+            self.loop_monitor
+        )
+        
+        # Tick only when something on screen or in the session is due
+        self.ticker = TickScheduler(self.display_timers, self.check_schedule)
+        self.main_window.bind('<Map>', self.on_window_map)
+        self.main_window.bind('<Unmap>', self.on_window_unmap)
         
-        # Start checking the timer
+        # Keyboard hooks and audio wait until the first frame is drawn
+        self.first_frame_bind = self.main_window.bind('<Expose>', self.on_first_frame, '+')
+        # ...or after a short while if the window starts hidden and never draws
+        self.main_window.after(2000, self.on_first_frame)
+        
+        # Optional connection to the fleet coordinator
+        self.fleet = None
+        if coordinator:
+            from fleet import StationClient, default_station_key_path, load_token, parse_address
+            try:
+                host, port = parse_address(coordinator)
+                self.fleet = StationClient(
+                    self.station_id,
+                    host,
+                    port,
+                    lambda op, seconds: self.dispatcher.call(self.apply_remote_command, op, seconds),
+                    load_token(fleet_key_file or default_station_key_path()),
+                    clock=clock
+                )
+                self.fleet.start()
+            except (OSError, ValueError) as e:
+                self.log_error(f"Fleet error: {e}")
+                self.fleet = None
+        
+        # Optional local control socket, so a POS or script can top up
+        # without the PIN dialogs
+        self.control = None
+        if control:
+            from control import ControlServer, default_token_path, load_token
+            try:
+                self.control = ControlServer(
+                    lambda commands: self.dispatcher.call(self.run_control_commands, commands),
+                    load_token(control_token_file or default_token_path(), create=True),
+                    control
+                )
+                self.control.start_thread()
+            except Exception as e:  # the station runs on without remote control
+                self.log_error(f"Control socket error: {e}")
+                self.control = None
+        
+        # Pick up where a crash or power cut left off, then start checking the timer
+        self.restore_session()
+        if deadline is not None and not self.timer_running and self.paused_remaining is None:
+            self.hold_deadline(deadline)
+        remaining = self.engine.remaining(self.session_id)
+        self.event_log.emit(eventlog.STARTUP, remaining=None if remaining is None else round(remaining, 1),
+                            paused=self.paused_remaining)
         self.check_schedule()
 
+    def on_first_frame(self, event=None):
+        """Finish startup once the clock is on screen"""
+        if 'first_frame' in self.startup_marks:
+            return
+        self.main_window.unbind('<Expose>', self.first_frame_bind)
+        self.mark_startup('first_frame')
+        
+        # Load sound files
+        self.setup_sounds()
+        
+        # Block keyboard shortcuts while the station is locked
+        self.main_window.after_idle(self.setup_keyboard_blocking)
+        
+        # Build the dialogs and the lock screen withdrawn, one per idle
+        # moment, so none of them is built while a customer waits
+        self.main_window.after_idle(self.prebuild_windows,
+                                    [self.lock_screen, self.pin_dialog, self.time_menu, self.settings_menu])
+
+    def prebuild_windows(self, windows):
+        """Build the next window in `windows`, then the rest on later idle callbacks"""
+        windows[0].prebuild()
+        if len(windows) > 1:
+            self.main_window.after_idle(self.prebuild_windows, windows[1:])
+
+    def mark_startup(self, phase):
+        """Record a startup milestone and report once everything is up"""
+        self.startup_marks[phase] = time.perf_counter() - STARTUP_STARTED
+        if not self.startup_timing:
+            return
+        if all(name in self.startup_marks for name in ('first_frame', 'keyboard', 'audio_ready')):
+            print(json.dumps({
+                name: round(seconds * 1000, 1) for name, seconds in self.startup_marks.items()
+            }))
+            self.startup_timing = False
+
     def show_notification(self, message, bg_color='#ff9800', display_time=5000):
         """Show a notification popup"""
-        notif = tk.Toplevel(self.main_window)
-        notif.overrideredirect(True)
-        notif.attributes('-topmost', True)
-        notif.attributes('-alpha', 0.0)
-        notif.configure(bg='grey15')
-        
-        screen_width = self.main_window.winfo_screenwidth()
-        notif.geometry(f"+{screen_width-320}+20")
-        
-        shadow = tk.Frame(notif, bg='black')
-        shadow.pack(padx=5, pady=5)
-        
-        main_frame = tk.Frame(
-            shadow,
-            bg=bg_color,
-            padx=20,
-            pady=15,
-            highlightthickness=0
-        )
-        main_frame.pack()
-        
-        tk.Label(
-            main_frame,
-            text=message,
-            bg=bg_color,
-            fg='white',
-            font=('Segoe UI', 14, 'bold')
-        ).pack()
-        
-        for i in range(0, 11):
-            alpha = i/10
-            notif.attributes('-alpha', alpha)
-            notif.update()
-            time.sleep(0.02)
-        
-        self.active_notifications.append(notif)
-        notif.after(display_time, lambda: self.fade_out_notification(notif))
-
-    def fade_out_notification(self, notification):
-        """Fade out notification"""
-        if notification.winfo_exists():
-            for i in range(10, -1, -1):
-                alpha = i/10
-                notification.attributes('-alpha', alpha)
-                notification.update()
-                time.sleep(0.02)
-            notification.destroy()
-            if notification in self.active_notifications:
-                self.active_notifications.remove(notification)
+        self.notifications.show(message, bg_color=bg_color, display_time=display_time)
 
     def cleanup(self):
         """Cleanup resources"""
         try:
-            for notif in self.active_notifications[:]:
-                if notif.winfo_exists():
-                    notif.destroy()
-            mixer.quit()
-            pygame.quit()
-            keyboard.unhook_all()
+            self.notifications.destroy()
+            if self.metrics is not None:
+                self.metrics.close()
+            if self.fleet is not None:
+                self.fleet.stop()
+            if self.control is not None:
+                self.control.close()
+            self.journal.close()
+            self.ledger.close()
+            if self.members is not None:
+                self.members.close()
+            if self.audio is not None:
+                self.audio.close()
+            if self.keyboard_policy is not None:
+                self.keyboard_policy.close()
+            self.pin_service.close()
+            if self.state_board is not None:
+                self.state_board.close()
+            self.event_log.close()
         except Exception as e:
-            print(f"Cleanup error: {e}")
+            self.log_error(f"Cleanup error: {e}")
+    
+    def log_error(self, message):
+        """Print an error and keep it in the event log, which outlives the console"""
+        print(message)
+        self.event_log.emit(eventlog.ERROR, message=message)
+
+    def check_pin(self, pin, where, done):
+        """Check `pin` in the background, then call done(ok, lockout seconds left); wrong ones are logged"""
+        def checked(ok, wait):
+            if not ok:
+                self.event_log.emit(eventlog.PIN_FAILED, where=where, failures=self.pin_service.failures,
+                                    locked_for=round(wait))
+            done(ok, wait)
+        self.pin_service.verify(pin, checked)
+
+    def dispatch_pin_result(self, fn, *args):
+        """Hand a PIN check result from the worker to the Tk thread, as 'pin' loop time"""
+        monitor = self.loop_monitor
+        self.dispatcher.call(monitor.run, 'pin', monitor.clock(), fn, args)
 
     def setup_ui(self):
         """Initialize UI components"""
         content_frame = tk.Frame(self.main_window, bg='black')
         content_frame.pack(expand=True, fill='both')
         
-        # Time Display
-        self.time_label = tk.Label(
-            content_frame,
-            text="00:00",
-            fg='white',
-            bg='black',
-            font=('Arial', 80, 'bold')
-        )
+        # Time Display: one Arial text item per character on a fixed-size
+        # canvas, so a tick redraws only the digits that changed and never
+        # re-lays out
+        self.time_label = GlyphClock(content_frame, color='white', bg='black')
+        self.time_label.config(text="00:00")
         self.time_label.pack(expand=True, pady=(20, 10))
         
         # Status Display
@@ -192,6 +369,16 @@ class FullscreenTimerApp:
             pady=8
         )
         self.settings_btn.pack(side='left', padx=5)
+        
+        # Only the differences between ticks are pushed to these widgets
+        self.status_flash = None
+        self.status_flash_id = None
+        self.display = DisplayBinder(
+            self.time_label,
+            self.status_label,
+            self.extend_time_btn,
+            {'side': 'left', 'padx': 5}
+        )
 
     def set_fullscreen(self, fullscreen):
         """Toggle fullscreen mode"""
@@ -205,53 +392,55 @@ class FullscreenTimerApp:
             self.main_window.eval('tk::PlaceWindow . center')
 
     def setup_keyboard_blocking(self):
-        """Block keyboard shortcuts"""
-        try:
-            keyboard.block_key('windows')
-            keyboard.block_key('windows left')
-            keyboard.block_key('windows right')
-            keyboard.add_hotkey('alt+tab', lambda: None, suppress=True)
-            keyboard.add_hotkey('ctrl+esc', lambda: None, suppress=True)
-            keyboard.add_hotkey('alt+f4', lambda: None, suppress=True)
-        except Exception as e:
-            print(f"Keyboard blocking error: {e}")
+        """Start blocking keyboard shortcuts whenever the station is locked down"""
+        self.keyboard_policy = KeyboardPolicy(self.keyboard_backend, on_error=self.log_error)
+        self.update_keyboard_policy()
+        self.mark_startup('keyboard')
+
+    @property
+    def lockdown(self):
+        """Lock screen up, or fullscreen with no time running"""
+        if self.lock_screen.visible:
+            return True
+        return self.is_fullscreen and not self.timer_running
+
+    def update_keyboard_policy(self):
+        """Hook the keyboard only while locked down, so paid sessions type without hooks"""
+        if self.keyboard_policy is not None:
+            self.keyboard_policy.apply(self.lockdown)
 
     def setup_sounds(self):
-        """Load sound files"""
-        try:
-            base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
-            warning_path = os.path.join(base_path, "warning.mp3")
-            timeout_path = os.path.join(base_path, "timeout.mp3")
-            
-            self.warning_sound = warning_path if os.path.exists(warning_path) else None
-            self.timeout_sound = timeout_path if os.path.exists(timeout_path) else None
-            
-        except Exception as e:
-            print(f"Sound setup error: {e}")
-            self.warning_sound = None
-            self.timeout_sound = None
+        """Find sound files and start the audio thread that loads and plays them"""
+        base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+        warning_path = os.path.join(base_path, "warning.mp3")
+        timeout_path = os.path.join(base_path, "timeout.mp3")
+        
+        self.warning_sound = warning_path if os.path.exists(warning_path) else None
+        self.timeout_sound = timeout_path if os.path.exists(timeout_path) else None
+        
+        from audio import BACKENDS, AudioPlayer, default_cache_dir
+        monitor = self.loop_monitor
+        # Worker reports come in off the Tk thread, so they go through the
+        # dispatcher rather than after(); still counted as 'audio' loop time
+        self.audio = AudioPlayer(
+            BACKENDS[self.audio_backend],
+            {"warning": self.warning_sound, "timeout": self.timeout_sound},
+            lambda fn, *args: self.dispatcher.call(monitor.run, 'audio', monitor.clock(), fn, args),
+            cache_dir=default_cache_dir(),
+            on_ready=self.on_sounds_loaded,
+            on_error=self.log_error
+        )
+        self.audio.start()
+
+    def on_sounds_loaded(self, ok):
+        """The audio thread has its sounds decoded (or gave up)"""
+        self.mark_startup('audio_ready')
 
     def play_sound(self, sound_type):
-        """Play sounds"""
-        if not self.sound_enabled or self.sound_playing:
+        """Play an alert unless the same alert is still playing"""
+        if not self.sound_enabled or self.audio is None or self.audio.is_playing(sound_type):
             return
-            
-        try:
-            sound_file = self.warning_sound if sound_type == "warning" else self.timeout_sound
-            if sound_file:
-                self.sound_playing = True
-                mixer.music.stop()
-                mixer.music.load(sound_file)
-                mixer.music.play()
-                sound = mixer.Sound(sound_file)
-                self.main_window.after(int(sound.get_length() * 1000), self.reset_sound_flag)
-        except Exception as e:
-            print(f"Sound error: {e}")
-            self.sound_playing = False
-
-    def reset_sound_flag(self):
-        """Reset sound flag"""
-        self.sound_playing = False
+        self.audio.play(sound_type)
 
     def prevent_close(self):
         """Prevent closing"""
@@ -265,89 +454,42 @@ class FullscreenTimerApp:
             parent=self.main_window
         )
         if confirm:
-            self.notification_time = None
-            self.timer_running = False
-            self.five_min_warning_played = False
-            self.timeout_sound_played = False
-            self.timeout_shown = False
-            self.update_display()
-            self.status_label.config(text="Timer Reset", fg='#ff9800')
-            self.main_window.after(2000, lambda: self.status_label.config(
-                text="Ready", 
-                fg='#6c757d'
-            ))
+            self.end_session()
+            self.record_session(journal.RESET)
+            self.ticker.wake()
+            self.flash_status("Timer Reset", WARNING_COLOR)
             # Show the shutdown warning when resetting
             self.show_shutdown_warning()
 
     def verify_pin_for_add_time(self):
         """Verify PIN for adding time"""
-        pin = simpledialog.askstring(
-            "PIN Verification", 
-            "Enter PIN to add time:",
-            parent=self.main_window,
-            show='*'
-        )
-        if pin == "062100!":
-            self.show_time_options()
-        else:
-            messagebox.showerror("Access Denied", "Incorrect PIN!", parent=self.main_window)
+        self.pin_dialog.open("Enter PIN to add time:", self.show_time_options)
     
     def show_time_options(self, parent_window=None):
         """Show time options menu (works for both main window and lock screen)"""
         if parent_window is None:
             parent_window = self.main_window
         
-        time_menu = tk.Toplevel(parent_window)
-        time_menu.title("Add Time")
-        time_menu.geometry("300x200")
-        time_menu.resizable(False, False)
-        time_menu.configure(bg='#2d2d2d')
-        time_menu.attributes('-topmost', True)
-        time_menu.grab_set()
-        
-        tk.Label(
-            time_menu,
-            text="ADD TIME OPTIONS",
-            fg='white',
-            bg='#2d2d2d',
-            font=('Arial', 14, 'bold')
-        ).pack(pady=10)
-        
-        btn_frame = tk.Frame(time_menu, bg='#2d2d2d')
-        btn_frame.pack(pady=10)
-        
-        # Custom Minutes button
-        tk.Button(
-            btn_frame,
-            text="Custom Minutes",
-            command=lambda: [self.add_custom_time(parent_window, minutes=True), time_menu.destroy()],
-            bg='#4CAF50',
-            fg='white',
-            font=('Arial', 12),
-            width=15
-        ).pack(pady=5)
-        
-        # Custom Seconds button
-        tk.Button(
-            btn_frame,
-            text="Custom Seconds",
-            command=lambda: [self.add_custom_time(parent_window, minutes=False), time_menu.destroy()],
-            bg='#2196F3',
-            fg='white',
-            font=('Arial', 12),
-            width=15
-        ).pack(pady=5)
-        
-        # Cancel button
-        tk.Button(
-            btn_frame,
-            text="Cancel",
-            command=time_menu.destroy,
-            bg='#f44336',
-            fg='white',
-            font=('Arial', 12),
-            width=15
-        ).pack(pady=5)
+        config = self.config
+        buttons = []
+        # One tap per preset package
+        for package in config.packages:
+            buttons.append((
+                f"{package.label} - ₱{package.price / 100:g}",
+                '#FF9800',
+                ('Arial', 12, 'bold'),
+                lambda package=package: self.add_package(parent_window, package)
+            ))
+        if 'minutes' in config.custom_time:
+            buttons.append(("Custom Minutes", '#4CAF50', ('Arial', 12),
+                            lambda: self.add_custom_time(parent_window, minutes=True)))
+        if 'seconds' in config.custom_time:
+            buttons.append(("Custom Seconds", '#2196F3', ('Arial', 12),
+                            lambda: self.add_custom_time(parent_window, minutes=False)))
+        # Prepaid member balance
+        buttons.append(("👤 Member", '#9C27B0', ('Arial', 12), lambda: self.sign_in_member(parent_window)))
+        buttons.append(("Cancel", '#f44336', ('Arial', 12), None))
+        self.time_menu.open(buttons, parent_window)
 
     def add_custom_time(self, parent_window, minutes=True):
         """Add custom time (works for both main window and lock screen)"""
@@ -380,258 +522,576 @@ class FullscreenTimerApp:
                 return
         
         # Add the time and update the timer
-        self.notification_time = datetime.now() + timedelta(seconds=seconds_to_add)
-        self.total_duration = seconds_to_add
-        self.timer_running = True
-        self.timeout_shown = False
-        self.five_min_warning_played = False
-        self.timeout_sound_played = False
+        try:
+            self.grant_time(seconds_to_add, close_lock_screen=parent_window != self.main_window)
+        except ValueError as e:
+            messagebox.showerror("Invalid Input", str(e), parent=parent_window)
+            return
+        
+        # Show appropriate added time message
+        if minutes:
+            self.flash_status(f"Added {time_to_add} minutes", ADDED_COLOR)
+        else:
+            mins, secs = divmod(seconds_to_add, 60)
+            if mins > 0:
+                self.flash_status(f"Added {mins} minutes {secs} seconds", ADDED_COLOR)
+            else:
+                self.flash_status(f"Added {secs} seconds", ADDED_COLOR)
+
+    def add_package(self, parent_window, package):
+        """Add a preset package at its own price"""
+        try:
+            self.grant_time(package.seconds, close_lock_screen=parent_window != self.main_window,
+                            price=package.price)
+        except ValueError as e:
+            messagebox.showerror("Invalid Input", str(e), parent=parent_window)
+            return
+        self.flash_status(f"Added {package.label}", ADDED_COLOR)
+
+    def grant_room(self, extend=False):
+        """The most seconds grant_time can add before the session outgrows a journal record"""
+        if self.paused_remaining is not None:
+            total = self.paused_remaining
+        elif extend and self.engine.remaining(self.session_id):
+            total = self.engine.get(self.session_id).total_duration
+        else:
+            total = 0
+        return journal.MAX_SECONDS - int(total)
+
+    def grant_time(self, seconds, extend=False, close_lock_screen=True, price=None):
+        """Start (or extend) the session and leave the lock screen
+
+        Raises ValueError, with nothing changed, if the time or its price
+        would not fit the journal and ledger records.
+        """
+        if price is None:
+            price = price_for_seconds(seconds, self.config.centavos_per_minute)
+        room = self.grant_room(extend)
+        if seconds > room:
+            raise ValueError(f"At most {room} more seconds can be added to this session")
+        if not 0 <= price <= MAX_PRICE:
+            raise ValueError(f"A top-up must cost 0 to {MAX_PRICE} centavos")
+        if self.paused_remaining is not None:
+            # Time banked by Pause is kept, not replaced
+            self.resume_session()
+            extend = True
+        elif not extend:
+            self.bank_member_time()
+        if extend:
+            self.engine.extend(self.session_id, seconds)
+            self.record_session(journal.EXTEND, seconds)
+            if self.member_id is not None:
+                self.member_extra += seconds
+        else:
+            self.engine.start(self.session_id, seconds)
+            self.record_session(journal.START, seconds)
+        self.event_log.emit(eventlog.EXTEND if extend else eventlog.START, seconds=seconds)
+        self.record_topup(seconds, price)
         
         # Exit fullscreen when time is added
         if self.is_fullscreen:
             self.set_fullscreen(False)
         
         # If we're coming from the lock screen, close it
-        if parent_window != self.main_window and self.current_warning_window:
-            self.current_warning_window.destroy()
-            self.current_warning_window = None
+        if close_lock_screen:
+            self.lock_screen.close()
         
         self.update_display()
-        
-        # Show appropriate added time message
-        if minutes:
-            self.status_label.config(text=f"Added {time_to_add} minutes", fg='#4CAF50')
+        self.ticker.wake()
+
+    def member_store(self):
+        if self.members is None:
+            from members import MemberStore, default_members_path
+            self.members = MemberStore(self.members_path or default_members_path(), clock=self.wall_clock)
+        return self.members
+
+    def sign_in_member(self, parent_window):
+        """Put a member's whole prepaid balance on the clock"""
+        if self.paused_remaining is not None:
+            # Resuming the walk-in's time under the member would bank it to them
+            messagebox.showerror("Member", "Resume or end the paused session first", parent=parent_window)
+            return
+        member_id = simpledialog.askstring("Member", "Enter member ID:", parent=parent_window)
+        if not member_id or not member_id.strip():
+            return
+        member_id = member_id.strip()
+        try:
+            store = self.member_store()
+            balance = store.balance(member_id)
+            if balance < 1:
+                raise ValueError(f"{member_id} has no prepaid time left")
+            if balance > self.grant_room():
+                raise ValueError(f"{member_id}'s balance is too large for one session")
+            seconds = store.withdraw_all(member_id, self.station_id)
+        except Exception as e:
+            messagebox.showerror("Member", str(e), parent=parent_window)
+            return
+        # Usage only: the time was paid for when it was bought
+        self.grant_time(seconds, close_lock_screen=parent_window != self.main_window, price=0)
+        self.member_id = member_id
+        self.member_extra = 0
+        mins, secs = divmod(int(seconds), 60)
+        self.flash_status(f"Welcome {member_id}: {mins} minutes {secs} seconds", ADDED_COLOR)
+
+    def bank_member_time(self):
+        """Return what is left of a member's own grant to their balance; returns the seconds
+
+        Time extended on top of the grant was paid for separately: the
+        grant is used up first, and the extra stays on the clock.
+        """
+        member_id = self.member_id
+        remaining = self.engine.remaining(self.session_id) or 0
+        own = max(0, remaining - self.member_extra)
+        if member_id is None or not own:
+            self.member_id = None
+            self.member_extra = 0
+            return 0
+        try:
+            from members import BANK
+            self.member_store().credit(member_id, own, self.station_id, BANK)
+        except Exception as e:
+            # Leave the time on the station rather than lose it
+            self.log_error(f"Member balance error: {e}")
+            return 0
+        self.member_id = None
+        self.member_extra = 0
+        if remaining > own:
+            self.engine.start(self.session_id, remaining - own)
         else:
-            mins, secs = divmod(seconds_to_add, 60)
-            if mins > 0:
-                self.status_label.config(text=f"Added {mins} minutes {secs} seconds", fg='#4CAF50')
+            self.engine.reset(self.session_id)
+        return own
+
+    def end_session(self):
+        """Stop the session (reset or lock); a member's time goes back to their account"""
+        remaining = self.engine.remaining(self.session_id)
+        self.event_log.emit(eventlog.RESET, remaining=None if remaining is None else round(remaining, 1))
+        self.bank_member_time()
+        self.engine.reset(self.session_id)
+        self.paused_remaining = None
+
+    def pause_session(self):
+        """Stop the clock and bank the exact seconds left
+
+        A member's time goes back on their account (signing them out);
+        anyone else's stays on this station until Resume.
+        """
+        remaining = self.engine.remaining(self.session_id)
+        if not remaining:
+            return
+        member_id = self.member_id
+        banked = self.bank_member_time()
+        # Anything not banked (all of a walk-in's time, or what was added
+        # on top of a member's) is kept here
+        left = self.engine.remaining(self.session_id)
+        if left:
+            self.engine.reset(self.session_id)
+            self.paused_remaining = left
+            self.record_session(journal.PAUSE, left)
+        else:
+            self.record_session(journal.RESET)
+        if banked:
+            mins, secs = divmod(int(banked), 60)
+            status = f"Saved {mins} minutes {secs} seconds for {member_id}"
+        else:
+            status = "Session paused"
+        self.event_log.emit(eventlog.PAUSE, seconds=round(remaining, 1), member=member_id)
+        self.set_fullscreen(True)
+        self.update_keyboard_policy()
+        self.ticker.wake()
+        self.flash_status(status, WARNING_COLOR)
+
+    def resume_session(self):
+        """Put the time banked by Pause back on the clock"""
+        seconds = self.paused_remaining
+        if seconds is None:
+            return
+        self.paused_remaining = None
+        self.engine.start(self.session_id, seconds)
+        self.record_session(journal.START)
+        self.event_log.emit(eventlog.RESUME, seconds=round(seconds, 1))
+        self.set_fullscreen(False)
+        self.update_keyboard_policy()
+        self.ticker.wake()
+        self.flash_status("Session resumed", ADDED_COLOR)
+
+    def apply_remote_command(self, op, seconds=0):
+        """Run a command pushed by the fleet coordinator (on the Tk thread)"""
+        if op == 'add':
+            if seconds < 1:
+                return False
+            try:
+                self.grant_time(seconds, extend=True)
+            except ValueError as e:
+                self.log_error(f"Remote add refused: {e}")
+                return False
+            mins, secs = divmod(seconds, 60)
+            self.flash_status(f"Added {mins} minutes {secs} seconds", ADDED_COLOR)
+        elif op in ('reset', 'lock'):
+            self.end_session()
+            self.record_session(journal.RESET)
+            self.ticker.wake()
+            self.update_display()
+            self.show_shutdown_warning()
+        else:
+            return False
+        return True
+
+    def run_control_commands(self, commands):
+        """Run a batch from the control socket (on the Tk thread); one result per command"""
+        results = []
+        for command in commands:
+            op = command['op']
+            if op == 'status':
+                remaining = self.engine.remaining(self.session_id)
+                results.append({
+                    'ok': True,
+                    'station': self.station_id,
+                    'remaining': -1 if remaining is None else round(remaining, 1),
+                    'locked': int(self.lock_screen.visible),
+                })
+                continue
+            if op in ('add', 'extend'):
+                seconds = command['s']
+                try:
+                    self.grant_time(seconds, extend=op == 'extend')
+                except ValueError as e:
+                    results.append({'ok': False, 'error': str(e)})
+                    continue
+                mins, secs = divmod(seconds, 60)
+                self.flash_status(f"Added {mins} minutes {secs} seconds", ADDED_COLOR)
             else:
-                self.status_label.config(text=f"Added {secs} seconds", fg='#4CAF50')
-        
-        self.main_window.after(2000, lambda: self.status_label.config(
-            text="Timer running...", 
-            fg='#6c757d'
-        ) if self.timer_running else None)
+                self.apply_remote_command(op)
+            results.append({'ok': True})
+        return results
+
+    def record_topup(self, seconds, price):
+        """Book a top-up in the ledger and report it to the coordinator"""
+        try:
+            self.ledger.record(self.station_id, seconds, price, self.wall_clock())
+            self.ledger.flush()
+        except OSError as e:
+            self.log_error(f"Ledger error: {e}")
+        if self.fleet is not None:
+            self.fleet.report_topup(seconds, price)
+
+    def record_session(self, op, seconds=0):
+        """Append the session's new state to the journal; fsync follows in a batch"""
+        session = self.engine.get(self.session_id)
+        deadline = total = 0
+        if op == journal.PAUSE:
+            # Paused records carry the exact banked seconds in place of a deadline
+            deadline = seconds
+        elif op in journal.RUNNING_OPS and session is not None:
+            deadline = self.wall_clock() + self.engine.remaining(self.session_id)
+            total = session.total_duration
+        self.journal.append(op, seconds, deadline, total)
+        if self.journal_flush_id is None:
+            self.journal_flush_id = self.loop_monitor.scope(self.main_window, 'journal').after(
+                JOURNAL_SYNC_MS, self.flush_journal
+            )
+
+    def flush_journal(self):
+        """Write and fsync the batched journal records"""
+        self.journal_flush_id = None
+        try:
+            self.journal.flush()
+        except OSError as e:
+            self.log_error(f"Journal error: {e}")
+
+    def check_config(self):
+        """Pick up config file edits (one stat() unless it changed)"""
+        config = self.config_source.check()
+        if config is not None:
+            self.apply_config(config)
+        self.beat()
+        self.config_timers.after(CHECK_INTERVAL_MS, self.check_config)
+
+    def apply_config(self, config):
+        """Switch the running app to a new config
+
+        Everything reads settings through self.config, so swapping it is
+        atomic on the Tk thread; warning thresholds re-arm from now, so
+        ones the session has already passed are not announced again.
+        """
+        if (config.pin, config.pin_hash) != (self.config.pin, self.config.pin_hash):
+            self.pin_service.set_pin(config)
+        self.config = config
+        if self.fixed_warnings is None:
+            self.warnings = {warning.seconds: warning for warning in config.warnings}
+            self.engine.set_thresholds(self.warnings)
+        self.ticker.wake()
+        self.flash_status("Settings updated", ADDED_COLOR)
+
+    def export_metrics(self):
+        """Publish the loop lag histograms, then again every EXPORT_INTERVAL_MS"""
+        try:
+            self.metrics.export()
+        except OSError as e:
+            self.log_error(f"Metrics error: {e}")
+        self.main_window.after(EXPORT_INTERVAL_MS, self.export_metrics)
+
+    def restore_session(self):
+        """Resume the session that was running when the timer last stopped"""
+        record = self.journal.latest
+        if record is not None and record.banked is not None:
+            self.paused_remaining = record.banked
+            self.update_display()
+            return
+        if record is None or not record.running:
+            return
+        remaining = record.remaining(self.wall_clock())
+        if remaining <= 0:
+            # Ran out while the timer was down
+            self.record_session(journal.EXPIRE)
+            return
+        session = self.engine.start(self.session_id, remaining)
+        session.total_duration = record.total
+        self.set_fullscreen(False)
+        self.update_display()
+
+    def hold_deadline(self, deadline):
+        """Run until `deadline` (wall-clock time), as the watchdog last saw it before a kill
+
+        Only used when the journal has no session to restore, e.g. it
+        lost its last batch or was deleted.
+        """
+        remaining = deadline - self.wall_clock()
+        if remaining <= 0:
+            return
+        self.engine.start(self.session_id, remaining)
+        self.record_session(journal.START)
+        self.set_fullscreen(False)
+        self.update_display()
+
+    def beat(self):
+        """Tell the watchdog the Tk loop is alive
+
+        No timer of its own: clock ticks (publish_state) and the config
+        check, which runs even on an idle station, beat as they go.
+        """
+        if self.state_board is not None:
+            self.state_board.beat(self.wall_clock())
+
+    def publish_state(self):
+        """Let the watchdog and the coordinator know about the current deadline and lock state"""
+        self.beat()
+        if self.state_board is not None:
+            remaining = self.engine.remaining(self.session_id)
+            self.state_board.update(
+                self.wall_clock() + remaining if self.timer_running else 0.0,
+                self.timer_running,
+                self.lock_screen.visible,
+                self.paused_remaining is not None
+            )
+        if self.fleet is None:
+            return
+        session = self.engine.get(self.session_id)
+        deadline = session.deadline if self.timer_running else None
+        self.fleet.update(deadline, self.lock_screen.visible)
+
+    @property
+    def timer_running(self):
+        """Whether the station's session still has time left"""
+        return self.engine.is_running(self.session_id)
 
     def verify_pin_for_settings(self):
         """Verify PIN for settings"""
-        pin = simpledialog.askstring(
-            "PIN Verification", 
-            "Enter your PIN:",
-            parent=self.main_window,
-            show='*'
-        )
-        if pin == "062100!":
-            self.show_settings_menu()
-        else:
-            messagebox.showerror("Access Denied", "Incorrect PIN!", parent=self.main_window)
+        self.pin_dialog.open("Enter your PIN:", self.show_settings_menu)
     
     def show_settings_menu(self):
         """Show settings menu"""
-        settings_menu = tk.Toplevel(self.main_window)
-        settings_menu.title("Settings")
-        settings_menu.geometry("250x200")
-        settings_menu.resizable(False, False)
-        settings_menu.configure(bg='#2d2d2d')
-        settings_menu.attributes('-topmost', True)
-        settings_menu.grab_set()
-        
-        tk.Label(
-            settings_menu,
-            text="SETTINGS",
-            fg='white',
-            bg='#2d2d2d',
-            font=('Arial', 14, 'bold')
-        ).pack(pady=10)
-        
-        options_frame = tk.Frame(settings_menu, bg='#2d2d2d')
-        options_frame.pack(pady=10)
-        
-        sound_text = "🔊 Disable Sound" if self.sound_enabled else "🔇 Enable Sound"
-        tk.Button(
-            options_frame,
-            text=sound_text,
-            command=lambda: [self.toggle_sound(), settings_menu.destroy()],
-            bg='#6c757d',
-            fg='white',
-            font=('Arial', 12),
-            width=20
-        ).pack(pady=5)
-        
-        fs_text = "⬜ Windowed Mode" if self.is_fullscreen else "🟩 Fullscreen Mode"
-        tk.Button(
-            options_frame,
-            text=fs_text,
-            command=lambda: [self.toggle_fullscreen(), settings_menu.destroy()],
-            bg='#6c757d',
-            fg='white',
-            font=('Arial', 12),
-            width=20
-        ).pack(pady=5)
-        
-        tk.Button(
-            options_frame,
-            text="Close",
-            command=settings_menu.destroy,
-            bg='#f44336',
-            fg='white',
-            font=('Arial', 12),
-            width=20
-        ).pack(pady=5)
+        buttons = [
+            ("🔊 Disable Sound" if self.sound_enabled else "🔇 Enable Sound", '#6c757d', ('Arial', 12),
+             self.toggle_sound),
+            ("⬜ Windowed Mode" if self.is_fullscreen else "🟩 Fullscreen Mode", '#6c757d', ('Arial', 12),
+             self.toggle_fullscreen),
+        ]
+        if self.timer_running:
+            buttons.append(("👤 Sign Out (save time)" if self.member_id else "⏸ Pause Session", '#ff9800',
+                            ('Arial', 12), self.pause_session))
+        elif self.paused_remaining is not None:
+            buttons.append(("▶ Resume Session", '#4CAF50', ('Arial', 12), self.resume_session))
+        buttons.append(("Close", '#f44336', ('Arial', 12), None))
+        self.settings_menu.open(buttons)
 
     def toggle_fullscreen(self):
         """Toggle fullscreen"""
         self.set_fullscreen(not self.is_fullscreen)
+        self.update_keyboard_policy()
 
     def toggle_sound(self):
         """Toggle sound"""
         self.sound_enabled = not self.sound_enabled
-        if not self.sound_enabled:
-            mixer.music.stop()
+        if not self.sound_enabled and self.audio is not None:
+            self.audio.stop()
+
+    def on_window_map(self, event):
+        """Resume per-second display ticks when the window is shown"""
+        if event.widget is self.main_window and not self.display_visible:
+            self.display_visible = True
+            self.ticker.wake()
+
+    def on_window_unmap(self, event):
+        """Only wake for warnings and expiry while minimized"""
+        if event.widget is self.main_window and self.display_visible:
+            self.display_visible = False
+            self.ticker.wake()
 
     def check_schedule(self):
-        """Check timer schedule"""
-        if self.timer_running and self.notification_time:
-            remaining = (self.notification_time - datetime.now()).total_seconds()
-            
-            if 299 < remaining <= 300 and not self.five_min_warning_played:
-                self.play_sound("warning")
-                self.show_notification("5 MINUTES REMAINING!", bg_color='#ff9800')
-                self.five_min_warning_played = True
-                
-            if remaining <= 0:
-                if not self.timeout_sound_played:
-                    self.play_sound("timeout")
-                    self.show_notification("TIME'S UP!", bg_color='#ff5252')
-                    self.timeout_sound_played = True
-                
-                if not self.timeout_shown:
-                    self.timer_running = False
-                    self.timeout_shown = True
-                    self.show_shutdown_warning()
+        """Check timer schedule and sleep until the next event that matters"""
+        # The engine reports each threshold crossing and expiry exactly once
+        crossed = self.engine.warnings_due(self.session_id)
+        expired = [s for s in self.engine.expire_due() if s.session_id == self.session_id]
         
-        self.update_display()
-        self.main_window.after(100, self.check_schedule)
+        # A late tick can cross several thresholds at once: each still gets its
+        # notification, but only the most urgent sound plays (none if time is up)
+        for seconds in crossed:
+            warning = self.warnings[seconds]
+            self.event_log.emit(eventlog.WARNING, seconds=seconds)
+            self.show_notification(warning.message, bg_color=warning.color)
+        if crossed and not expired and self.warnings[crossed[-1]].sound:
+            self.play_sound(self.warnings[crossed[-1]].sound)
+        
+        if expired:
+            self.member_id = None
+            self.member_extra = 0
+            self.record_session(journal.EXPIRE)
+            self.event_log.emit(eventlog.TIMEOUT)
+            self.play_sound("timeout")
+            self.show_notification("TIME'S UP!", bg_color='#ff5252')
+            self.show_shutdown_warning()
+        
+        if self.display_visible:
+            self.update_display()
+        
+        self.publish_state()
+        self.update_keyboard_policy()
+        remaining = self.engine.remaining(self.session_id)
+        self.ticker.schedule(next_tick_delay(remaining, self.engine.thresholds, self.display_visible))
 
     def update_display(self):
-        """Update timer display"""
-        if self.timer_running and self.notification_time:
-            remaining = self.notification_time - datetime.now()
-            total_seconds = max(0, remaining.total_seconds())
-            
-            minutes, seconds = divmod(int(total_seconds), 60)
-            self.time_label.config(text=f"{minutes:02d}:{seconds:02d}")
-            
-            if total_seconds > 300:
-                self.status_label.config(text="Timer running...", fg='#6c757d')
-                if self.current_warning_window:
-                    self.current_warning_window.destroy()
-                    self.current_warning_window = None
-                
-                if not self.extend_time_btn.winfo_ismapped():
-                    self.extend_time_btn.pack(side='left', padx=5)
-            elif total_seconds > 0:
-                self.status_label.config(text="Almost done!", fg='#ff9800')
-            else:
-                self.status_label.config(text="TIME'S UP!", fg='#ff5252')
-        else:
-            self.time_label.config(text="00:00")
-            self.status_label.config(text="Ready", fg='#6c757d')
-            
-            if self.extend_time_btn.winfo_ismapped():
-                self.extend_time_btn.pack_forget()
+        """Update timer display, touching only widgets whose state changed"""
+        remaining = self.engine.remaining(self.session_id)
+        if remaining is not None and remaining > self.config.warning_seconds:
+            self.lock_screen.close()
+        
+        state = compute_display_state(remaining, self.config.warning_seconds, self.status_flash,
+                                      self.display.applied, self.paused_remaining)
+        self.display.apply(state)
+
+    def flash_status(self, text, color, duration=2000):
+        """Show a status message for `duration` ms, then go back to the live status"""
+        if self.status_flash_id is not None:
+            self.display_timers.after_cancel(self.status_flash_id)
+        self.status_flash = (text, color)
+        self.status_flash_id = self.display_timers.after(duration, self.clear_status_flash)
+        self.update_display()
+
+    def clear_status_flash(self):
+        """End the current status message"""
+        self.status_flash = None
+        self.status_flash_id = None
+        self.update_display()
 
     def show_shutdown_warning(self):
         """Show shutdown warning"""
-        if self.current_warning_window and self.current_warning_window.winfo_exists():
+        if self.lock_screen.visible:
             return
             
         self.set_fullscreen(True)
-        
-        warning = tk.Toplevel(self.main_window)
-        self.current_warning_window = warning
-        warning.attributes('-fullscreen', True)
-        warning.configure(bg='black')
-        warning.attributes('-topmost', True)
-        warning.grab_set()
-        
-        warning.protocol("WM_DELETE_WINDOW", lambda: None)
-        warning.bind('<Alt-F4>', lambda e: "break")
-        warning.bind('<Escape>', lambda e: "break")
-        warning.bind('<Control-q>', lambda e: "break")
-        
-        tk.Label(
-            warning,
-            text="TIME'S UP!",
-            fg='white',
-            bg='black',
-            font=('Arial', 48, 'bold')
-        ).pack(pady=50)
-        
-        tk.Label(
-            warning,
-            text="Please add more time to continue",
-            fg='white',
-            bg='black',
-            font=('Arial', 24)
-        ).pack(pady=20)
-        
-        countdown_label = tk.Label(
-            warning,
-            text="This computer will shutdown after 30 seconds",
-            fg='red',
-            bg='black',
-            font=('Arial', 18, 'bold')
-        )
-        countdown_label.pack(pady=30)
-        
-        tk.Button(
-            warning,
-            text="➕ Add Time",
-            command=lambda: self.verify_pin_for_add_time_warning(warning),
-            bg='#4CAF50',
-            fg='white',
-            font=('Arial', 18, 'bold'),
-            padx=20,
-            pady=10
-        ).pack(pady=20)
-        
-        self.shutdown_countdown(30, warning, countdown_label)
-    
-    def verify_pin_for_add_time_warning(self, warning_window):
-        """Verify PIN from warning and show time options"""
-        pin = simpledialog.askstring(
-            "PIN Verification", 
-            "Enter PIN to add time:",
-            parent=warning_window,
-            show='*'
-        )
-        if pin == "062100!":
-            self.show_time_options(warning_window)
-        else:
-            messagebox.showerror("Access Denied", "Incorrect PIN!", parent=warning_window)
+        self.event_log.emit(eventlog.LOCK, seconds=self.config.shutdown_seconds)
+        # Prebuilt after the first frame; counts down from the configured
+        # seconds and takes the PIN on its own keypad
+        self.lock_screen.open(self.config.shutdown_seconds)
     
-    def shutdown_countdown(self, seconds, window, label):
-        """Shutdown countdown"""
-        if seconds > 0 and window.winfo_exists():
-            label.config(text=f"This computer will shutdown after {seconds} seconds")
-            window.after(1000, self.shutdown_countdown, seconds-1, window, label)
-        elif window.winfo_exists():
-            try:
-                os.system("shutdown /s /t 1")
-            except Exception as e:
-                messagebox.showerror("Shutdown Error", f"Failed to shutdown: {str(e)}")
+    def shutdown_computer(self):
+        """Power off the station once the lock screen countdown runs out"""
+        self.event_log.emit(eventlog.SHUTDOWN)
+        self.power.request('shutdown')
+
+    def on_power_result(self, action, ok, detail):
+        """A power action finished (Tk thread)"""
+        if not ok:
+            self.log_error(f"Failed to {action}: {detail}")
+            parent = self.lock_screen.window if self.lock_screen.visible else self.main_window
+            messagebox.showerror("Shutdown Error", f"Failed to {action}: {detail}", parent=parent)
+        elif detail:
+            print(detail)
 
     def run(self):
         """Run application"""
         try:
             self.main_window.mainloop()
         except KeyboardInterrupt:
+            # Stopped on purpose, so the watchdog should not bring it back
+            if self.state_board is not None:
+                self.state_board.mark_stopped()
             self.cleanup()
         except Exception as e:
-            print(f"Unexpected error: {e}")
+            self.log_error(f"Unexpected error: {e}")
             self.cleanup()
 
 if __name__ == "__main__":
-    app = FullscreenTimerApp()
+    parser = argparse.ArgumentParser(description="Fullscreen rental timer")
+    parser.add_argument('--station-id', help="name reported to the coordinator (default: hostname)")
+    parser.add_argument('--coordinator', metavar='HOST:PORT', help="connect to a fleet coordinator")
+    parser.add_argument('--fleet-key-file', metavar='PATH',
+                        help="station key copied from the coordinator (default: per-user data dir)")
+    parser.add_argument('--journal', metavar='PATH', help="session journal file (default: per-user data dir)")
+    parser.add_argument('--ledger', metavar='DIR', help="top-up ledger directory (default: per-user data dir)")
+    parser.add_argument('--config', metavar='PATH',
+                        help="JSON shop settings, reloaded on change (default: per-user config dir)")
+    parser.add_argument('--event-log', metavar='DIR',
+                        help="diagnostic event log directory (default: per-user data dir)")
+    parser.add_argument('--members', metavar='PATH',
+                        help="member balance database (default: per-user data dir)")
+    parser.add_argument('--warnings', metavar='PATH',
+                        help="JSON warning schedule (overrides the config's)")
+    parser.add_argument('--control', metavar='ADDRESS',
+                        help="serve the control socket on HOST:PORT or a socket path (see control.py)")
+    parser.add_argument('--control-token-file', metavar='PATH',
+                        help="control token, created if missing (default: per-user data dir)")
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help="rewrite loop lag histograms to this file (Prometheus text format)")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help="serve loop lag histograms on http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--audio', choices=('pygame', 'dummy'), default='pygame',
+                        help="sound backend; dummy plays nothing (machines without sound)")
+    parser.add_argument('--power', choices=('auto', 'windows', 'systemd', 'dry-run'), default='auto',
+                        help="how to shut the station down; dry-run only logs it")
+    parser.add_argument('--state-file', metavar='PATH',
+                        help="shared state file read by station_watchdog.py (default: per-user data dir)")
+    parser.add_argument('--deadline', type=float, metavar='TIMESTAMP',
+                        help="hold a session to this POSIX time if none is restored (set by the watchdog)")
+    parser.add_argument('--startup-timing', action='store_true',
+                        help="print import, first-frame, keyboard and audio-ready times in ms")
+    args = parser.parse_args()
+    
+    warnings = None
+    if args.warnings:
+        try:
+            warnings = load_warnings(args.warnings)
+        except (OSError, ValueError) as e:
+            print(f"Warning schedule error: {e}; using the defaults")
+    
+    app = FullscreenTimerApp(
+        station_id=args.station_id,
+        coordinator=args.coordinator,
+        fleet_key_file=args.fleet_key_file,
+        startup_timing=args.startup_timing,
+        journal_path=args.journal,
+        ledger_dir=args.ledger,
+        metrics_file=args.metrics_file,
+        metrics_port=args.metrics_port,
+        warnings=warnings,
+        config_path=args.config,
+        members_path=args.members,
+        event_dir=args.event_log,
+        state_path=args.state_file,
+        deadline=args.deadline,
+        control=args.control,
+        control_token_file=args.control_token_file,
+        audio_backend=args.audio,
+        power_backend=args.power
+    )
     app.run()
@@ -0,0 +1,45 @@
+"""Thread-safe hand-off of work onto the Tk thread"""
+import concurrent.futures
+import queue
+import tkinter as tk
+
+
+class TkDispatcher:
+    """Runs callables on the Tk thread on behalf of background threads
+
+    Work is queued and a virtual event wakes the Tk loop, so nothing polls
+    while the queue is empty.
+    """
+
+    EVENT = '<<TkDispatch>>'
+
+    def __init__(self, root):
+        self.root = root
+        self.queue = queue.Queue()
+        root.bind(self.EVENT, self.drain)
+
+    def call(self, fn, *args):
+        """Queue fn(*args) for the Tk thread and return a Future for its result"""
+        future = concurrent.futures.Future()
+        self.queue.put((future, fn, args))
+        try:
+            self.root.event_generate(self.EVENT, when='tail')
+        except (RuntimeError, tk.TclError):
+            # Main loop not running yet (or shutting down); the item stays
+            # queued and is picked up by the next drain.
+            pass
+        return future
+
+    def drain(self, event=None):
+        """Run everything queued so far"""
+        while True:
+            try:
+                future, fn, args = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
@@ -0,0 +1,101 @@
+"""View-model for the main timer screen
+
+compute_display_state() works out what the screen should show from the
+session alone; DisplayBinder applies only what changed since the last
+tick, so a steady-state tick costs one Tk call (the clock text).
+"""
+from collections import namedtuple
+
+IDLE_COLOR = '#6c757d'
+WARNING_COLOR = '#ff9800'
+EXPIRED_COLOR = '#ff5252'
+ADDED_COLOR = '#4CAF50'
+
+DisplayState = namedtuple('DisplayState', 'clock_text status_text status_color extend_visible')
+
+
+def format_clock(seconds):
+    """MM:SS for a number of seconds left, HH:MM:SS from an hour up"""
+    minutes, seconds = divmod(int(seconds), 60)
+    if minutes >= 60:
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def compute_display_state(remaining, warning_seconds, flash=None, previous=None, paused=None):
+    """Desired state of the main screen
+
+    `remaining` is None when no session is running. `flash` is an optional
+    (text, color) pair that temporarily replaces the status line. `paused`
+    is the time banked on a paused session, if there is one.
+    """
+    if remaining is None and paused is not None:
+        clock_text = format_clock(paused)
+        status = ("Paused", WARNING_COLOR)
+        extend_visible = False
+    elif remaining is None:
+        clock_text = "00:00"
+        status = ("Ready", IDLE_COLOR)
+        extend_visible = False
+    else:
+        clock_text = format_clock(remaining)
+        if remaining > warning_seconds:
+            status = ("Timer running...", IDLE_COLOR)
+            extend_visible = True
+        else:
+            status = ("Almost done!", WARNING_COLOR) if remaining > 0 else ("TIME'S UP!", EXPIRED_COLOR)
+            # The button stays up once shown; short sessions never get it
+            extend_visible = previous is not None and previous.extend_visible
+
+    if flash is not None:
+        status = flash
+    return DisplayState(clock_text, status[0], status[1], extend_visible)
+
+
+class DisplayBinder:
+    """Applies DisplayState differences to the Tk widgets and counts the calls"""
+
+    def __init__(self, time_label, status_label, extend_button, extend_pack_options):
+        self.time_label = time_label
+        self.status_label = status_label
+        self.extend_button = extend_button
+        self.extend_pack_options = extend_pack_options
+        self.applied = None
+        self.ticks = 0
+        self.tk_calls = 0
+        self.last_tick_calls = 0
+
+    def apply(self, state):
+        """Push only the changed parts of `state`; returns the Tk calls made"""
+        previous = self.applied
+        calls = 0
+        if previous is None or state.clock_text != previous.clock_text:
+            self.time_label.config(text=state.clock_text)
+            calls += 1
+        if (previous is None or state.status_text != previous.status_text
+                or state.status_color != previous.status_color):
+            self.status_label.config(text=state.status_text, fg=state.status_color)
+            calls += 1
+        if previous is None or state.extend_visible != previous.extend_visible:
+            if state.extend_visible:
+                self.extend_button.pack(**self.extend_pack_options)
+            else:
+                self.extend_button.pack_forget()
+            calls += 1
+
+        self.applied = state
+        self.ticks += 1
+        self.tk_calls += calls
+        self.last_tick_calls = calls
+        return calls
+
+    @property
+    def stats(self):
+        """Tick and Tk call counters since startup"""
+        return {
+            'ticks': self.ticks,
+            'tk_calls': self.tk_calls,
+            'last_tick_calls': self.last_tick_calls,
+            'calls_per_tick': self.tk_calls / self.ticks if self.ticks else 0.0,
+        }
@@ -0,0 +1,75 @@
+"""Which remaining-time warnings the timer gives, and how
+
+A warning schedule is a list of thresholds, each with the message shown
+in the notification, the alert sound played and the notification color.
+It can be loaded from a JSON file:
+
+    [
+        {"minutes": 10, "message": "10 MINUTES REMAINING!"},
+        {"minutes": 5},
+        {"seconds": 30, "sound": "timeout", "color": "#ff5252"}
+    ]
+
+"sound" is one of the bank's alerts ("warning" or "timeout") or null for a
+silent warning; the message defaults to "<n> MINUTES REMAINING!".
+"""
+import json
+from collections import namedtuple
+
+from viewmodel import EXPIRED_COLOR, WARNING_COLOR
+
+SOUNDS = ('warning', 'timeout')
+
+Threshold = namedtuple('Threshold', 'seconds message sound color')
+
+DEFAULT_WARNINGS = (
+    Threshold(600, "10 MINUTES REMAINING!", 'warning', WARNING_COLOR),
+    Threshold(300, "5 MINUTES REMAINING!", 'warning', WARNING_COLOR),
+    Threshold(60, "1 MINUTE REMAINING!", 'warning', EXPIRED_COLOR),
+)
+
+
+def default_message(seconds):
+    if seconds % 60:
+        return f"{seconds} SECONDS REMAINING!"
+    minutes = seconds // 60
+    return f"{minutes} MINUTE REMAINING!" if minutes == 1 else f"{minutes} MINUTES REMAINING!"
+
+
+def parse_warnings(entries):
+    """Build a schedule, largest threshold first, from a list of dicts
+
+    Raises ValueError describing the first bad entry.
+    """
+    warnings = {}
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"warning {number}: expected an object")
+        try:
+            if 'seconds' in entry:
+                seconds = int(entry['seconds'])
+            else:
+                seconds = int(entry['minutes']) * 60
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"warning {number}: needs a whole number of 'minutes' or 'seconds'")
+        if seconds < 1:
+            raise ValueError(f"warning {number}: threshold must be at least one second")
+        sound = entry.get('sound', 'warning')
+        if sound is not None and sound not in SOUNDS:
+            raise ValueError(f"warning {number}: sound must be one of {', '.join(SOUNDS)} or null")
+        warnings[seconds] = Threshold(
+            seconds,
+            str(entry.get('message') or default_message(seconds)),
+            sound,
+            str(entry.get('color', WARNING_COLOR))
+        )
+    return tuple(warnings[seconds] for seconds in sorted(warnings, reverse=True))
+
+
+def load_warnings(path):
+    """Read a warning schedule from a JSON file"""
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError("warning schedule must be a JSON list")
+    return parse_warnings(entries)